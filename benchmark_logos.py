@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Benchmark stahování a vykreslování log - lokální náhrada Clearbit/Favicon/
+DuckDuckGo s nastavitelnou latencí, chybovostí, 304 a vadnými těly; výsledky
+(firmy/s, p50/p99 latence na firmu, u vykreslování na dávku, přenesené bajty,
+špičková RSS) jako JSON
+"""
+
+import argparse
+import asyncio
+import hashlib
+import http.server
+import io
+import json
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from erp_customers import SAMPLE_SOURCE, iter_customer_names
+from logo_names import sanitize_filename_js_style
+from logo_validate import MAX_LOGO_BYTES
+
+# 2: stahování přes download_all, vykreslování s latencí dávek místo firem
+BENCHMARK_VERSION = 2
+
+DEFAULT_SIZES = (43, 1000, 10000)
+SCENARIOS = ('download', 'refresh', 'render')
+
+# Výchozí chování náhradního serveru (pravděpodobnosti na jeden požadavek)
+DEFAULT_LATENCY = 0.02
+DEFAULT_JITTER = 0.01
+DEFAULT_ERROR_RATE = 0.02
+DEFAULT_HIT_RATES = {'clearbit': 0.3, 'favicon': 0.6, 'duckduckgo': 0.8}
+DEFAULT_HTML_RATE = 0.05
+DEFAULT_OVERSIZED_RATE = 0.02
+DEFAULT_NOT_MODIFIED_RATE = 0.9
+
+def make_png(size=128, seed=0):
+    """Šumové PNG - nekomprimovatelné, takže projde minimální velikostí u všech zdrojů"""
+    from PIL import Image
+    noise = random.Random(seed).randbytes(size * size * 4)
+    buffer = io.BytesIO()
+    Image.frombytes('RGBA', (size, size), noise).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+HTML_BODY = b'<!DOCTYPE html><html><head><title>Parked</title></head><body>' + b'x' * 4096 + b'</body></html>'
+
+class MockLogoHandler(http.server.BaseHTTPRequestHandler):
+    """Odpovědi jsou deterministické podle URL a seedu, takže běhy jsou srovnatelné"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        source = parts.path.strip('/').split('/')[0]
+        rnd = random.Random(f"{server.seed}:{self.path}")
+        time.sleep(server.latency + server.jitter * rnd.random())
+
+        if rnd.random() < server.error_rate:
+            self.respond(500, b'', 'text/plain')
+        elif rnd.random() >= server.hit_rates.get(source, 0.0):
+            self.respond(404, b'', 'text/plain')
+        elif rnd.random() < server.html_rate:
+            self.respond(200, HTML_BODY, 'text/html; charset=utf-8')
+        elif rnd.random() < server.oversized_rate:
+            self.respond(200, server.oversized_body, 'image/png')
+        elif (self.headers.get('If-None-Match') == server.etag
+              and rnd.random() < server.not_modified_rate):
+            self.respond(304, b'', None)
+        else:
+            self.respond(200, server.png_body, 'image/png', {'ETag': server.etag})
+
+    def respond(self, status, body, content_type, headers=None):
+        try:
+            self.send_response(status)
+            if content_type:
+                self.send_header('Content-Type', content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Klient velké tělo po hlavičkách zahodil (limit velikosti)
+            self.close_connection = True
+            return
+        self.server.count(status, len(body))
+
+class MockLogoServer(http.server.ThreadingHTTPServer):
+    """Lokální náhrada zdrojů log na 127.0.0.1 s počítadly požadavků a bajtů"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=DEFAULT_LATENCY, jitter=DEFAULT_JITTER, error_rate=DEFAULT_ERROR_RATE,
+                 hit_rates=None, html_rate=DEFAULT_HTML_RATE, oversized_rate=DEFAULT_OVERSIZED_RATE,
+                 not_modified_rate=DEFAULT_NOT_MODIFIED_RATE, seed=0):
+        super().__init__(('127.0.0.1', 0), MockLogoHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hit_rates = dict(DEFAULT_HIT_RATES if hit_rates is None else hit_rates)
+        self.html_rate = html_rate
+        self.oversized_rate = oversized_rate
+        self.not_modified_rate = not_modified_rate
+        self.seed = seed
+        self.png_body = make_png(seed=seed)
+        self.oversized_body = self.png_body + b'\0' * MAX_LOGO_BYTES
+        self.etag = f'"{hashlib.sha256(self.png_body).hexdigest()[:16]}"'
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'bytes': 0, 'statuses': {}}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, status, size):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += size
+            statuses = self.stats['statuses']
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': self.stats['requests'], 'bytes': self.stats['bytes'],
+                    'statuses': dict(self.stats['statuses'])}
+
+    def handle_error(self, request, client_address):
+        # Klient zavřel keep-alive spojení z poolu - u benchmarku běžné, netisknout
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def config(self):
+        return {
+            'latency': self.latency, 'jitter': self.jitter, 'error_rate': self.error_rate,
+            'hit_rates': self.hit_rates, 'html_rate': self.html_rate,
+            'oversized_rate': self.oversized_rate, 'not_modified_rate': self.not_modified_rate,
+            'seed': self.seed,
+        }
+
+def benchmark_names(count):
+    """Názvy firem pro benchmark - vzorový ERP feed, dál s pořadovým číslem"""
+    base = list(iter_customer_names(SAMPLE_SOURCE))
+    names = []
+    for i in range(count):
+        name = base[i % len(base)]
+        if i >= len(base):
+            name = f"{i // len(base)} {name}"
+        names.append(name)
+    return names
+
+def percentile(values, q):
+    """Percentil metodou nejbližšího pořadí (values nemusí být seřazené)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def peak_rss_kb():
+    """Špičková RSS tohoto procesu a jeho potomků (worker procesy vykreslování)"""
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+def benchmark_dns(hostname):
+    """DNS bez sítě - "živé" jsou jen .cz kandidáti"""
+    return hostname.endswith('.cz')
+
+def point_sources_to(base_url):
+    """Přesměruje šablony zdrojů v download_real_logos na náhradní server"""
+    import download_real_logos
+    download_real_logos.CLEARBIT_URL = base_url + "/clearbit/{domain}"
+    download_real_logos.FAVICON_URL = base_url + "/favicon?domain={domain}&sz=128"
+    download_real_logos.DUCKDUCKGO_URL = base_url + "/duckduckgo/{domain}.ico"
+    download_real_logos.CUSTOM_SOURCES = {}
+    return download_real_logos
+
+def benchmark_client():
+    """HTTP klient bez rate limitu - měří se pipeline, ne limity zdrojů"""
+    from logo_http import LogoHttpClient
+    return LogoHttpClient(default_rate=(1e9, 1e9))
+
+def placeholder_blocklist():
+    """Blocklist s jedním placeholderem, který šumová loga nepotká - kontrola
+    placeholderů se tak provede (a měří) u každého loga jako v produkci"""
+    from PIL import Image
+    from logo_phash import PlaceholderDetector, placeholder_entry
+    buffer = io.BytesIO()
+    Image.new('RGBA', (128, 128), (200, 200, 200, 255)).save(buffer, 'PNG')
+    return PlaceholderDetector([placeholder_entry('benchmark-blank', buffer.getvalue())])
+
+def run_download(names, base_url, logos_dir, concurrency):
+    """Stáhne loga všech firem produkční cestou download_all (journal, kontrola
+    placeholderů, metadata), vrací (latence firem z metrik, úspěšné)"""
+    from logo_cache import LogoMetaStore, default_meta_path
+    from logo_domains import DomainResolver
+    from logo_journal import LogoJournal, default_journal_path
+    from logo_metrics import RunMetrics
+    from logo_store import LogoStore
+
+    fetch = point_sources_to(base_url)
+    metrics = RunMetrics('benchmark_download')
+    store = LogoMetaStore(default_meta_path(logos_dir))
+    resolver = DomainResolver(resolver=benchmark_dns, metrics=metrics)
+    with benchmark_client() as client, LogoJournal(default_journal_path(logos_dir)) as journal:
+        ctx = fetch.FetchContext(client, store, LogoStore(logos_dir), resolver, journal, placeholder_blocklist(),
+                                 max_concurrency=concurrency, metrics=metrics)
+        found, _ = asyncio.run(fetch.download_all(ctx, names, logos_dir))
+    store.save()
+    resolver.close()
+    return [record['seconds'] for record in metrics.records], found
+
+def run_refresh(base_url, logos_dir, concurrency):
+    """Revaliduje všechna stažená loga (podmíněné požadavky, 304)"""
+    from logo_cache import LogoMetaStore, default_meta_path, refresh_logo
+    from logo_store import LogoStore
+
+    point_sources_to(base_url)
+    store = LogoMetaStore(default_meta_path(logos_dir))
+    blobs = LogoStore(logos_dir)
+    keys = sorted(blobs.published())
+
+    def one(key):
+        start = time.perf_counter()
+        outcome = refresh_logo(client, store, blobs, key)
+        return time.perf_counter() - start, outcome
+
+    with benchmark_client() as client, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, keys))
+    store.save()
+    return [t for t, _ in results], sum(1 for _, outcome in results if outcome in ('not-modified', 'updated'))
+
+def run_render(names, logos_dir, jobs):
+    """Vykreslí a publikuje defaultní loga, vrací (latence dávek, počet firem, úspěšné, bajty PNG).
+
+    render_many vykresluje po dávkách CHUNK_SIZE firem a výsledky dávky vydá
+    najednou - latence jednotlivých firem měřit nejde, měří se interval mezi
+    dokončenými dávkami (včetně publikace).
+    """
+    from logo_render import CHUNK_SIZE, render_many
+    from logo_store import LogoStore
+
+    blobs = LogoStore(logos_dir)
+    latencies = []
+    count = 0
+    ok = 0
+    size = 0
+    last = time.perf_counter()
+    for name, png, error in render_many(names, jobs=jobs):
+        count += 1
+        if png is not None:
+            blobs.put_and_publish(sanitize_filename_js_style(name), png)
+            ok += 1
+            size += len(png)
+        if count % CHUNK_SIZE == 0 or count == len(names):
+            now = time.perf_counter()
+            latencies.append(now - last)
+            last = now
+    return latencies, count, ok, size
+
+def run_scenario(scenario, count, base_url, workdir, concurrency, jobs):
+    """Jeden scénář v samostatném procesu (kvůli měření špičkové RSS)"""
+    logos_dir = os.path.join(workdir, 'logos')
+    os.makedirs(logos_dir, exist_ok=True)
+    names = benchmark_names(count)
+    rendered_bytes = None
+
+    start = time.perf_counter()
+    if scenario == 'download':
+        latencies, ok = run_download(names, base_url, logos_dir, concurrency)
+        companies = len(latencies)
+    elif scenario == 'refresh':
+        latencies, ok = run_refresh(base_url, logos_dir, concurrency)
+        companies = len(latencies)
+    else:
+        latencies, companies, ok, rendered_bytes = run_render(names, os.path.join(workdir, 'rendered'), jobs)
+    seconds = time.perf_counter() - start
+
+    result = {
+        'companies': companies,
+        'ok': ok,
+        'seconds': round(seconds, 4),
+        'companies_per_s': round(companies / seconds, 2) if seconds else None,
+        # U vykreslování latence dávky (CHUNK_SIZE firem), jinak jedné firmy
+        'latency_unit': 'chunk' if scenario == 'render' else 'company',
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+            'p99': round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        },
+        'peak_rss_kb': peak_rss_kb(),
+    }
+    if rendered_bytes is not None:
+        result['bytes'] = rendered_bytes
+    return result
+
+def spawn_scenario(scenario, count, base_url, workdir, concurrency, jobs):
+    """Spustí scénář v novém interpretu a vrátí jeho výsledek"""
+    result_path = os.path.join(workdir, f'{scenario}.json')
+    command = [sys.executable, os.path.abspath(__file__), '--run-one', scenario, str(count),
+               '--base-url', base_url, '--workdir', workdir, '--result', result_path,
+               '--concurrency', str(concurrency), '--jobs', str(jobs)]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    with open(result_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare(results, baseline_path):
+    """Vypíše změny proti předchozímu výsledku (propustnost a p99)"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['scenario'], r['size']): r for r in json.load(f).get('results', [])}
+    print(f"\n📐 Srovnání s {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['scenario'], result['size']))
+        if not previous or not previous.get('companies_per_s') or not result.get('companies_per_s'):
+            continue
+        speed = (result['companies_per_s'] / previous['companies_per_s'] - 1) * 100
+        line = f"{result['scenario']:<8} {result['size']:>6}: {speed:+.1f} % firem/s"
+        old_p99, new_p99 = previous['latency_ms']['p99'], result['latency_ms']['p99']
+        # Starší výsledky (verze 1) měřily vykreslování jinak - p99 srovnat jen se stejnou jednotkou
+        same_unit = previous.get('latency_unit') == result.get('latency_unit')
+        if old_p99 and new_p99 and same_unit:
+            line += f", p99 {(new_p99 / old_p99 - 1) * 100:+.1f} %"
+        print(("⚠️  " if speed < -10 else "   ") + line)
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='počty firem oddělené čárkou')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"scénáře oddělené čárkou ({', '.join(SCENARIOS)})")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='souběžné HTTP požadavky')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='počet procesů pro vykreslování')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY,
+                        help='latence náhradního serveru v sekundách')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER,
+                        help='náhodná přidaná latence v sekundách (0 až jitter)')
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_ERROR_RATE,
+                        help='podíl odpovědí 500')
+    parser.add_argument('--hit-rates', default=','.join(f'{k}={v}' for k, v in DEFAULT_HIT_RATES.items()),
+                        help='podíl nalezených log po zdrojích (zdroj=podíl,...)')
+    parser.add_argument('--html-rate', type=float, default=DEFAULT_HTML_RATE,
+                        help='podíl HTML stránek místo obrázku')
+    parser.add_argument('--oversized-rate', type=float, default=DEFAULT_OVERSIZED_RATE,
+                        help='podíl odpovědí nad limitem velikosti loga')
+    parser.add_argument('--not-modified-rate', type=float, default=DEFAULT_NOT_MODIFIED_RATE,
+                        help='podíl podmíněných požadavků odpovězených 304')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='výstupní JSON soubor')
+    parser.add_argument('--baseline',
+                        help='předchozí výsledky pro srovnání')
+    # Interní režim - jeden scénář v podprocesu
+    parser.add_argument('--run-one', nargs=2, metavar=('SCENAR', 'POCET'), help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        scenario, count = args.run_one
+        result = run_scenario(scenario, int(count), args.base_url, args.workdir, args.concurrency, args.jobs)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"neznámé scénáře: {', '.join(sorted(unknown))}")
+    hit_rates = {k: float(v) for k, v in (item.split('=') for item in args.hit_rates.split(',') if item)}
+
+    server = MockLogoServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            hit_rates=hit_rates, html_rate=args.html_rate,
+                            oversized_rate=args.oversized_rate,
+                            not_modified_rate=args.not_modified_rate, seed=args.seed).start()
+    print(f"🧪 Benchmark log, náhradní server {server.base_url}")
+    print("-" * 60)
+
+    results = []
+    try:
+        for size in sizes:
+            workdir = tempfile.mkdtemp(prefix='logo-bench-')
+            try:
+                for scenario in scenarios:
+                    before = server.snapshot()
+                    result = spawn_scenario(scenario, size, server.base_url, workdir, args.concurrency, args.jobs)
+                    after = server.snapshot()
+                    if scenario != 'render':
+                        result['requests'] = after['requests'] - before['requests']
+                        result['bytes'] = after['bytes'] - before['bytes']
+                        result['statuses'] = {k: v - before['statuses'].get(k, 0)
+                                              for k, v in after['statuses'].items()
+                                              if v - before['statuses'].get(k, 0)}
+                    result = {'scenario': scenario, 'size': size, **result}
+                    results.append(result)
+                    unit = ' na dávku' if result['latency_unit'] == 'chunk' else ''
+                    print(f"⏱️  {scenario:<8} {size:>6} firem: {result['companies_per_s']} firem/s, "
+                          f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms{unit}, "
+                          f"{result.get('bytes', 0) / 1024:.0f} KiB, RSS {result['peak_rss_kb'] / 1024:.0f} MiB")
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        'version': BENCHMARK_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': {'concurrency': args.concurrency, 'jobs': args.jobs, 'server': server.config()},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Výsledky uloženy do {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Skript pro sestavení sprite sheetu (texture atlasu) ze všech log zákazníků
+a JSON indexu název -> (x, y, w, h) pro CSS background offsety na mapě
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+from PIL import Image
+
+from create_fixed_logos import render_default_logo
+from erp_customers import DEFAULT_SOURCE, iter_customer_names
+from logo_layout import ATLAS_DIRNAME, find_sources, logo_key
+from logo_names import sanitize_filename_js_style
+from logo_pack import LogoPack, default_pack_path
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+from normalize_logos import load_logo, trim
+
+# Maximální rozměr dlaždice (logo se vejde do čtverce, poměr stran zůstává)
+TILE_SIZE = 80
+# Mezera mezi dlaždicemi, aby se sousední loga při škálování nepřelévala
+PADDING = 2
+
+def fit_tile(image, tile_size=TILE_SIZE):
+    """Zmenší oříznuté logo tak, aby se vešlo do čtverce tile_size"""
+    image = trim(image)
+    scale = min(tile_size / image.size[0], tile_size / image.size[1])
+    size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+    return image.resize(size, Image.LANCZOS)
+
+def pack_shelves(sizes, padding=PADDING):
+    """Rozmístí obdélníky algoritmem shelf first-fit decreasing height.
+
+    `sizes` je slovník název -> (w, h), vrací (šířka, výška, název -> (x, y)).
+    """
+    if not sizes:
+        return 0, 0, {}
+
+    area = sum((w + padding) * (h + padding) for w, h in sizes.values())
+    widest = max(w for w, _ in sizes.values()) + padding
+    atlas_width = max(widest, math.ceil(math.sqrt(area)))
+
+    # Police: [y, výška, obsazená šířka]
+    shelves = []
+    positions = {}
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+
+    for name in order:
+        w, h = sizes[name]
+        w += padding
+        h += padding
+        for shelf in shelves:
+            if shelf[1] >= h and atlas_width - shelf[2] >= w:
+                positions[name] = (shelf[2], shelf[0])
+                shelf[2] += w
+                break
+        else:
+            y = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            shelves.append([y, h, w])
+            positions[name] = (0, y)
+
+    atlas_height = shelves[-1][0] + shelves[-1][1]
+    return atlas_width, atlas_height, positions
+
+def collect_tiles(logos_dir, companies, tile_size=TILE_SIZE, pack=None):
+    """Načte loga z adresáře (nebo z balíku LogoPack) a doplní generované iniciály pro firmy bez loga"""
+    tiles = {}
+    if pack is not None:
+        for index, name in enumerate(pack.filenames()):
+            tiles[name] = fit_tile(pack.image_at(index), tile_size)
+    else:
+        for path in find_sources(logos_dir):
+            name = logo_key(path)
+            try:
+                tiles[name] = fit_tile(load_logo(path), tile_size)
+            except Exception as e:
+                print(f"❌ {os.path.basename(path)}: {e}")
+
+    for company in companies:
+        name = sanitize_filename_js_style(company)
+        if name not in tiles:
+            tiles[name] = fit_tile(render_default_logo(company), tile_size)
+    return tiles
+
+def build_atlas(tiles, padding=PADDING):
+    """Sestaví obrázek atlasu a index sprite pozic"""
+    width, height, positions = pack_shelves({name: tile.size for name, tile in tiles.items()}, padding)
+    atlas = Image.new('RGBA', (max(width, 1), max(height, 1)), (255, 255, 255, 0))
+    sprites = {}
+    for name in sorted(tiles):
+        x, y = positions[name]
+        tile = tiles[name]
+        atlas.paste(tile, (x, y))
+        sprites[name] = {'x': x, 'y': y, 'w': tile.size[0], 'h': tile.size[1]}
+    return atlas, sprites
+
+def write_atlas(atlas, sprites, atlas_dir, tile_size=TILE_SIZE):
+    """Uloží atlas.png a atlas.json, URL obrázku nese hash obsahu kvůli cache"""
+    buffer = io.BytesIO()
+    atlas.save(buffer, 'PNG', optimize=True)
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+
+    write_atomic(os.path.join(atlas_dir, 'atlas.png'), data)
+
+    index = {
+        'image': f"/logos/{ATLAS_DIRNAME}/atlas.png?v={digest[:12]}",
+        'hash': digest,
+        'width': atlas.size[0],
+        'height': atlas.size[1],
+        'tileSize': tile_size,
+        'sprites': sprites,
+    }
+    write_atomic(os.path.join(atlas_dir, 'atlas.json'),
+                 json.dumps(index, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+    return len(data)
+
+def load_atlas(atlas_dir):
+    """Načte existující atlas (obrázek, sprite pozice, velikost dlaždice), nebo None"""
+    index_path = os.path.join(atlas_dir, 'atlas.json')
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    with Image.open(os.path.join(atlas_dir, 'atlas.png')) as image:
+        atlas = image.convert('RGBA')
+    return atlas, index['sprites'], index.get('tileSize', TILE_SIZE)
+
+def update_atlas(atlas, sprites, tiles, padding=PADDING):
+    """Vymění jednotlivé dlaždice bez přeskládání zbytku atlasu.
+
+    `tiles` je název -> obrázek (None dlaždici odebere). Dlaždice, která se
+    vejde na místo původní, se vloží na něj; ostatní přibudou v nové řadě
+    pod atlasem. Vrací (nový atlas, sprite pozice).
+    """
+    clear = (255, 255, 255, 0)
+    appended = []
+    for name in sorted(tiles):
+        tile = tiles[name]
+        old = sprites.pop(name, None)
+        if old is not None:
+            atlas.paste(clear, (old['x'], old['y'], old['x'] + old['w'], old['y'] + old['h']))
+        if tile is None:
+            continue
+        if old is not None and tile.size[0] <= old['w'] and tile.size[1] <= old['h']:
+            atlas.paste(tile, (old['x'], old['y']))
+            sprites[name] = {'x': old['x'], 'y': old['y'], 'w': tile.size[0], 'h': tile.size[1]}
+        else:
+            appended.append(name)
+
+    if appended:
+        row_height = max(tiles[name].size[1] for name in appended) + padding
+        row_width = sum(tiles[name].size[0] + padding for name in appended)
+        grown = Image.new('RGBA', (max(atlas.size[0], row_width), atlas.size[1] + row_height), clear)
+        grown.paste(atlas, (0, 0))
+        x, y = 0, atlas.size[1]
+        for name in appended:
+            tile = tiles[name]
+            grown.paste(tile, (x, y))
+            sprites[name] = {'x': x, 'y': y, 'w': tile.size[0], 'h': tile.size[1]}
+            x += tile.size[0] + padding
+        atlas = grown
+    return atlas, dict(sorted(sprites.items()))
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--pack', action='store_true',
+                        help='číst loga z balíku logo_pack.py místo jednotlivých souborů')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    logos_dir = args.logos_dir
+    atlas_dir = os.path.join(logos_dir, ATLAS_DIRNAME)
+    os.makedirs(atlas_dir, exist_ok=True)
+
+    print(f"🧩 Skládám atlas log (dlaždice max {TILE_SIZE} px)...")
+
+    if args.pack:
+        with LogoPack(default_pack_path(logos_dir, TILE_SIZE)) as pack:
+            tiles = collect_tiles(logos_dir, iter_customer_names(args.source), pack=pack)
+    else:
+        tiles = collect_tiles(logos_dir, iter_customer_names(args.source))
+    atlas, sprites = build_atlas(tiles)
+    size = write_atlas(atlas, sprites, atlas_dir)
+
+    used = sum(s['w'] * s['h'] for s in sprites.values())
+    fill = used / (atlas.size[0] * atlas.size[1]) * 100 if sprites else 0
+
+    print(f"✅ {len(sprites)} log v atlasu {atlas.size[0]}x{atlas.size[1]} px ({size / 1024:.1f} kB, zaplnění {fill:.1f}%)")
+    print(f"📁 Atlas uložen v: {atlas_dir}")
+
+    # Mapa bere sprity z manifestu - nové pozice a hash obrázku do něj hned propsat
+    from build_logo_manifest import attach_atlas, load_atlas_index, load_manifest, write_manifest
+    manifest = load_manifest(logos_dir)
+    if manifest is not None:
+        write_manifest(attach_atlas(manifest, load_atlas_index(logos_dir)), logos_dir)
+        print(f"📋 Manifest aktualizován ({sum(1 for e in manifest['logos'].values() if 'sprite' in e)} log v atlasu)")
+
+if __name__ == "__main__":
+    main()
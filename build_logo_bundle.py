@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Skript pro vygenerování balíčku data URI log pro mapu - minifikované SVG
+s iniciálkami a malé překomprimované PNG/WebP skutečných log v rozpočtu
+velikosti, pojmenovaný hashem obsahu a předkomprimovaný (gzip, brotli)
+"""
+
+import argparse
+import base64
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:  # brotli je volitelný, bez něj vznikne jen .gz
+    brotli = None
+
+from erp_customers import DEFAULT_SOURCE, iter_customer_names
+from logo_names import sanitize_filename_js_style
+from logo_render import CIRCLE_COLOR, get_initials
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+from normalize_logos import normalize_logo
+
+BUNDLE_VERSION = 1
+BUNDLE_INDEX_FILENAME = 'bundle-index.json'
+BUNDLE_FILENAME = 'bundle.{hash}.json'
+# Kolik posledních balíčků nechat na disku (klienti s dříve načteným indexem)
+BUNDLE_KEEP = 3
+
+# Velikost vložených log - marker na mapě má 36 px
+BUNDLE_LOGO_SIZE = 40
+# Rozpočet na jedno skutečné logo (bajty obrázku) a na celý balíček (znaky data URI)
+LOGO_BUDGET_BYTES = 2048
+BUNDLE_BUDGET_BYTES = 512 * 1024
+
+# Varianty kódování zkoušené pro skutečná loga, vítězí nejmenší
+ENCODINGS = (
+    ('image/webp', {'format': 'WEBP', 'quality': 80, 'method': 6}),
+    ('image/webp', {'format': 'WEBP', 'quality': 50, 'method': 6}),
+    ('image/png', {'format': 'PNG', 'optimize': True}),
+)
+
+SVG_TEMPLATE = (
+    "<svg xmlns='http://www.w3.org/2000/svg' width='80' height='80'>"
+    "<circle cx='40' cy='40' r='38' fill='{color}'/>"
+    "<text x='40' y='40' text-anchor='middle' dominant-baseline='middle' fill='#fff' "
+    "font-family='Arial,sans-serif' font-size='24' font-weight='bold'>{initials}</text></svg>"
+)
+
+def initials_svg(company_name):
+    """Minifikované SVG s iniciálkami (stejný vzhled jako generateLogoBase64 v route.ts)"""
+    color = '#%02x%02x%02x' % CIRCLE_COLOR
+    return SVG_TEMPLATE.format(color=color, initials=escape(get_initials(company_name)))
+
+def svg_data_uri(svg):
+    """SVG jako URL-encoded data URI - kratší než base64"""
+    return 'data:image/svg+xml,' + quote(svg, safe=" '=/:;,.-()")
+
+def tiny_logo(path, size=BUNDLE_LOGO_SIZE, budget=LOGO_BUDGET_BYTES):
+    """Zmenšené logo jako nejmenší z variant kódování, nebo None nad rozpočtem"""
+    image = normalize_logo(path).resize((size, size), Image.LANCZOS)
+    best = None
+    for mime, options in ENCODINGS:
+        buffer = io.BytesIO()
+        image.save(buffer, **options)
+        if best is None or buffer.tell() < len(best[1]):
+            best = mime, buffer.getvalue()
+    if len(best[1]) > budget:
+        return None
+    mime, data = best
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+def build_bundle(logos_dir, companies, size=BUNDLE_LOGO_SIZE,
+                 logo_budget=LOGO_BUDGET_BYTES, bundle_budget=BUNDLE_BUDGET_BYTES):
+    """Sestaví balíček firma -> data URI.
+
+    Firmy bez loga dostanou SVG s iniciálkami. Skutečná loga se přidávají od
+    nejmenšího, dokud se vejdou do rozpočtu; vynechané firmy v balíčku nejsou,
+    API pro ně použije URL z manifestu. Vrací (balíček, vynechané firmy).
+    """
+    entries = {}
+    real = []
+    by_content = {}
+    omitted = []
+    for name in dict.fromkeys(companies):
+        path = os.path.join(logos_dir, sanitize_filename_js_style(name))
+        if not os.path.exists(path):
+            entries[name] = svg_data_uri(initials_svg(name))
+            continue
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if digest not in by_content:
+            try:
+                by_content[digest] = tiny_logo(path, size, logo_budget)
+            except Exception as e:
+                print(f"❌ {os.path.basename(path)}: {e}")
+                by_content[digest] = None
+        if by_content[digest] is None:
+            omitted.append(name)
+        else:
+            real.append((len(by_content[digest]), name, by_content[digest]))
+
+    total = sum(len(uri) for uri in entries.values())
+    for length, name, uri in sorted(real):
+        if total + length > bundle_budget:
+            omitted.append(name)
+            continue
+        entries[name] = uri
+        total += length
+
+    bundle = {'version': BUNDLE_VERSION, 'companies': dict(sorted(entries.items()))}
+    return bundle, sorted(omitted)
+
+def write_bundle(bundle, logos_dir, keep=BUNDLE_KEEP):
+    """Zapíše balíček pod hashem obsahu (+ .gz/.br) a nakonec atomicky index"""
+    data = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    filename = BUNDLE_FILENAME.format(hash=digest[:12])
+    path = os.path.join(logos_dir, filename)
+
+    encodings = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings['br'] = brotli.compress(data, quality=11)
+    write_atomic(path, data)
+    for encoding, compressed in encodings.items():
+        write_atomic(path + ('.gz' if encoding == 'gzip' else '.br'), compressed)
+
+    index = {
+        'version': BUNDLE_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'hash': digest,
+        'file': filename,
+        'bytes': len(data),
+        'encodings': {encoding: len(compressed) for encoding, compressed in encodings.items()},
+        'companies': len(bundle['companies']),
+    }
+    write_atomic(os.path.join(logos_dir, BUNDLE_INDEX_FILENAME),
+                 json.dumps(index, indent=2).encode('utf-8'))
+
+    # Starší balíčky (kromě několika posledních) smazat
+    old = sorted(glob.glob(os.path.join(logos_dir, BUNDLE_FILENAME.format(hash='*'))),
+                 key=os.path.getmtime, reverse=True)
+    for old_path in [p for p in old if p != path][keep - 1:]:
+        for suffix in ('', '.gz', '.br'):
+            if os.path.exists(old_path + suffix):
+                os.remove(old_path + suffix)
+    return index
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--size', type=int, default=BUNDLE_LOGO_SIZE,
+                        help='velikost vložených log v px')
+    parser.add_argument('--logo-budget', type=int, default=LOGO_BUDGET_BYTES,
+                        help='maximální velikost jednoho loga v bajtech')
+    parser.add_argument('--budget', type=int, default=BUNDLE_BUDGET_BYTES,
+                        help='maximální velikost balíčku v bajtech')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    logos_dir = args.logos_dir
+    os.makedirs(logos_dir, exist_ok=True)
+
+    bundle, omitted = build_bundle(logos_dir, iter_customer_names(args.source),
+                                   args.size, args.logo_budget, args.budget)
+    index = write_bundle(bundle, logos_dir)
+
+    svgs = sum(1 for uri in bundle['companies'].values() if uri.startswith('data:image/svg'))
+    sizes = ', '.join(f"{encoding} {size / 1024:.1f} kB" for encoding, size in index['encodings'].items())
+    print(f"📦 Balíček {index['file']}: {index['companies']} firem ({svgs} SVG), "
+          f"{index['bytes'] / 1024:.1f} kB ({sizes})")
+    if omitted:
+        print(f"⚠️  Mimo rozpočet (použije se URL loga): {len(omitted)}")
+    print(f"📁 Index uložen v: {os.path.join(logos_dir, BUNDLE_INDEX_FILENAME)}")
+
+if __name__ == "__main__":
+    main()
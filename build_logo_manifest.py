@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Skript pro vygenerování manifestu log (public/logos/manifest.json) -
+URL s hashem obsahu, rozměry, u malých log rovnou data URI, URL variant
+40/80 px (normalize_logos.py) a pozice v atlasu (build_logo_atlas.py)
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from erp_customers import DEFAULT_SOURCE, iter_customer_names
+from logo_cache import LogoMetaStore, default_meta_path
+from logo_names import sanitize_filename_js_style
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+# Jen lehké moduly - `logos manifest` nenačítá NumPy, PIL až při dekódování loga
+from logo_layout import ATLAS_DIRNAME, VARIANT_FORMATS, VARIANT_SIZES, VARIANTS_DIRNAME, find_sources, logo_key
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+
+# Loga do této velikosti se vloží přímo jako data URI
+INLINE_MAX_BYTES = 2048
+
+MIME_TYPES = {
+    'PNG': 'image/png',
+    'ICO': 'image/x-icon',
+    'JPEG': 'image/jpeg',
+}
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def variant_urls(logos_dir, filename):
+    """URL existujících variant loga - {'40': {'png': ..., 'webp': ...}, '80': ...}"""
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    for size in VARIANT_SIZES:
+        urls = {}
+        for ext in VARIANT_FORMATS:
+            name = f"{stem}-{size}.{ext}"
+            path = os.path.join(logos_dir, VARIANTS_DIRNAME, name)
+            if os.path.isfile(path):
+                urls[ext] = f"/logos/{VARIANTS_DIRNAME}/{name}?v={file_digest(path)[:12]}"
+        if urls:
+            variants[str(size)] = urls
+    return variants
+
+def load_atlas_index(logos_dir):
+    """Index atlasu (atlas.json), nebo None když atlas není sestavený"""
+    path = os.path.join(logos_dir, ATLAS_DIRNAME, 'atlas.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def attach_atlas(manifest, atlas_index):
+    """Doplní do manifestu obrázek atlasu a ke každému logu jeho sprite [x, y, w, h].
+
+    Atlas klíčuje dlaždice názvem .png souboru i pro zdroje .ico/.jpg.
+    """
+    manifest.pop('atlas', None)
+    for entry in manifest['logos'].values():
+        entry.pop('sprite', None)
+    if atlas_index is None:
+        return manifest
+    manifest['atlas'] = {key: atlas_index[key] for key in ('image', 'width', 'height', 'tileSize')}
+    sprites = atlas_index['sprites']
+    for filename, entry in manifest['logos'].items():
+        sprite = sprites.get(logo_key(filename))
+        if sprite is not None:
+            entry['sprite'] = [sprite['x'], sprite['y'], sprite['w'], sprite['h']]
+    return manifest
+
+def logo_entry(path, inline_max_bytes=INLINE_MAX_BYTES):
+    """Popis jednoho loga pro manifest"""
+    from PIL import Image
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    with Image.open(path) as image:
+        width, height = image.size
+        mime = MIME_TYPES.get(image.format, 'application/octet-stream')
+
+    filename = os.path.basename(path)
+    entry = {
+        'url': f"/logos/{filename}?v={digest[:12]}",
+        'hash': digest,
+        'width': width,
+        'height': height,
+        'bytes': len(data),
+    }
+    variants = variant_urls(os.path.dirname(path), filename)
+    if variants:
+        entry['variants'] = variants
+    if len(data) <= inline_max_bytes:
+        entry['dataUri'] = f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+    return entry
+
+def build_manifest(logos_dir, companies, meta_store=None):
+    """Sestaví manifest - `logos` podle názvu souboru, `companies` název firmy -> soubor"""
+    logos = {}
+    for path in find_sources(logos_dir):
+        try:
+            logos[os.path.basename(path)] = logo_entry(path)
+        except Exception as e:
+            print(f"❌ {os.path.basename(path)}: {e}")
+
+    # Názvy firem ze seznamu zákazníků a z metadat stažených log
+    names = set(companies)
+    if meta_store is not None:
+        names.update(e['company'] for e in meta_store.entries.values() if e.get('company'))
+
+    company_files = {}
+    for name in sorted(names):
+        filename = sanitize_filename_js_style(name)
+        if filename in logos:
+            company_files[name] = filename
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'logos': logos,
+        'companies': company_files,
+    }
+    return attach_atlas(manifest, load_atlas_index(logos_dir))
+
+def load_manifest(logos_dir):
+    """Načte existující manifest podporované verze, nebo None"""
+    path = os.path.join(logos_dir, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+def update_manifest(manifest, logos_dir, filenames, meta_store=None):
+    """Přepočítá záznamy jen pro dané soubory, smazané soubory z manifestu odebere"""
+    for filename in filenames:
+        path = os.path.join(logos_dir, filename)
+        if os.path.isfile(path):
+            manifest['logos'][filename] = logo_entry(path)
+            entry = meta_store.get(filename) if meta_store is not None else None
+            if entry and entry.get('company'):
+                manifest['companies'][entry['company']] = filename
+        else:
+            manifest['logos'].pop(filename, None)
+            for company in [c for c, f in manifest['companies'].items() if f == filename]:
+                del manifest['companies'][company]
+    manifest['generatedAt'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    # Atlas se mohl přeskládat (nový hash obrázku) - sprity se berou vždy z aktuálního indexu
+    return attach_atlas(manifest, load_atlas_index(logos_dir))
+
+def write_manifest(manifest, logos_dir):
+    """Atomicky zapíše manifest, aby API nikdy nenačetlo rozepsaný soubor"""
+    path = os.path.join(logos_dir, MANIFEST_FILENAME)
+    write_atomic(path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+    return path
+
+def run(logos_dir, source=DEFAULT_SOURCE, companies=None):
+    """Sestaví a zapíše manifest, vrací cestu k němu"""
+    os.makedirs(logos_dir, exist_ok=True)
+    if companies is None:
+        companies = iter_customer_names(source)
+
+    meta_path = default_meta_path(logos_dir)
+    meta_store = LogoMetaStore(meta_path) if os.path.exists(meta_path) else None
+
+    manifest = build_manifest(logos_dir, companies, meta_store)
+    path = write_manifest(manifest, logos_dir)
+
+    inlined = sum(1 for e in manifest['logos'].values() if 'dataUri' in e)
+    with_variants = sum(1 for e in manifest['logos'].values() if 'variants' in e)
+    with_sprite = sum(1 for e in manifest['logos'].values() if 'sprite' in e)
+    print(f"📋 Manifest v{MANIFEST_VERSION}: {len(manifest['logos'])} log, {inlined} vloženo jako data URI")
+    print(f"🖼️  S variantami: {with_variants}, v atlasu: {with_sprite}")
+    print(f"🏢 Namapováno firem: {len(manifest['companies'])}")
+    print(f"📁 Manifest uložen v: {path}")
+    return path
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    run(args.logos_dir, args.source)
+
+if __name__ == "__main__":
+    main()
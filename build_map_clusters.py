@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Skript pro předpočítání shluků markerů mapy - GPS zákazníků se naparsují
+a ověří jednou, mřížka ve Web Mercatoru tvoří quadtree přes zoomy 2-18
+a pro každý zoom vznikne kompaktní JSON se shluky (počet, těžiště, rozsah,
+reprezentativní firma s logem)
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+from erp_customers import DEFAULT_SOURCE, iter_projects
+from erp_gps import default_gps_path, load_table, update_table, write_table
+from logo_names import sanitize_filename_js_style
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+
+CLUSTERS_VERSION = 1
+CLUSTERS_DIRNAME = 'map-clusters'
+CLUSTERS_INDEX_FILENAME = 'index.json'
+ZOOM_FILENAME = 'z{zoom}.json'
+
+MIN_ZOOM = 2
+MAX_ZOOM = 18
+# Mapové dlaždice mají 256 px, buňka shluku 64 px (zhruba dva markery vedle sebe).
+# Obojí jsou mocniny dvou, buňka na zoomu z je proto rodičem čtyř buněk na z + 1.
+TILE_BITS = 8
+CELL_BITS = 6
+
+# Mercator je definovaný jen do této zeměpisné šířky
+MAX_LATITUDE = 85.05112878
+# Přesnost souřadnic ve výstupu (5 desetinných míst ~ 1 m)
+COORD_DIGITS = 5
+# Zákazník bez platné GPS - API mapy (map-data/route.ts) ho umístí do Prahy, shluky stejně
+DEFAULT_POSITION = (50.0755, 14.4378)
+
+def mercator(lat, lng):
+    """Normalizované souřadnice Web Mercatoru (x, y) v intervalu <0, 1)"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    sin_lat = math.sin(math.radians(lat))
+    x = (lng + 180) / 360
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+def cell_key(x, y, zoom):
+    """Buňka mřížky (sloupec, řádek) na daném zoomu"""
+    n = 1 << (zoom + TILE_BITS - CELL_BITS)
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+def logo_url(logos_dir, company_name):
+    """URL staženého loga s hashem obsahu (jako v manifestu), nebo None"""
+    filename = sanitize_filename_js_style(company_name)
+    path = os.path.join(logos_dir, filename)
+    try:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    return f"/logos/{filename}?v={digest[:12]}"
+
+def load_points(source, logos_dir):
+    """Všichni zákazníci jako seznam (název, lat, lng, URL loga) a počet bez platné GPS.
+
+    Souřadnice zákazníků bere z tabulky erp_gps (nejčastější platná GPS ze všech
+    projektů zákazníka), kterou zároveň aktualizuje - API mapy pak firmy umístí stejně.
+    Zákazník bez platné GPS dostane DEFAULT_POSITION jako v API, aby index obsahoval
+    stejnou množinu zákazníků jako mapa (jinak klient předpočítané shluky nepoužije).
+    """
+    projects = list(iter_projects(source))
+    gps_path = default_gps_path(logos_dir)
+    table, _ = update_table(load_table(gps_path), projects)
+    write_table(table, gps_path)
+
+    names = {name for name in ((project.get('nazev_par') or '').strip() for project in projects) if name}
+    customers = table['customers']
+    points = sorted((name, *customers.get(name, DEFAULT_POSITION), logo_url(logos_dir, name)) for name in names)
+    return points, sum(1 for name in names if name not in customers)
+
+def representative_key(points, index):
+    # Přednost má firma se staženým logem, pak abecední pořadí (stabilní mezi běhy)
+    return points[index][3] is None, index
+
+def merge(points, target, cluster):
+    """Přičte shluk `cluster` k `target` (na místě)"""
+    target[0] += cluster[0]
+    target[1] += cluster[1]
+    target[2] += cluster[2]
+    target[3] = min(target[3], cluster[3])
+    target[4] = min(target[4], cluster[4])
+    target[5] = max(target[5], cluster[5])
+    target[6] = max(target[6], cluster[6])
+    if representative_key(points, cluster[7]) < representative_key(points, target[7]):
+        target[7] = cluster[7]
+
+def build_levels(points, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+    """Shluky pro každý zoom: zoom -> seznam [počet, součet lat, součet lng, jih, západ, sever, východ, zástupce].
+
+    Na nejvyšším zoomu se body seskupí podle buňky, nižší zoomy vznikají
+    slučováním čtyř sousedních buněk (posun klíče o bit), ne znovu z bodů.
+    """
+    cells = {}
+    for index, (_, lat, lng, _) in enumerate(points):
+        key = cell_key(*mercator(lat, lng), max_zoom)
+        cluster = cells.get(key)
+        if cluster is None:
+            cells[key] = [1, lat, lng, lat, lng, lat, lng, index]
+        else:
+            merge(points, cluster, [1, lat, lng, lat, lng, lat, lng, index])
+
+    levels = {}
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        levels[zoom] = [cells[key] for key in sorted(cells)]
+        if zoom == min_zoom:
+            break
+        parents = {}
+        for (x, y), cluster in cells.items():
+            parent_key = (x >> 1, y >> 1)
+            parent = parents.get(parent_key)
+            if parent is None:
+                parents[parent_key] = list(cluster)
+            else:
+                merge(points, parent, cluster)
+        cells = parents
+    return levels
+
+def zoom_document(zoom, clusters):
+    """Kompaktní JSON jednoho zoomu.
+
+    Shluk je pole [lat, lng, počet, index zástupce] - u shluků s více firmami
+    následuje rozsah [jih, západ, sever, východ] pro přiblížení po kliknutí.
+    """
+    rows = []
+    for count, sum_lat, sum_lng, south, west, north, east, rep in clusters:
+        row = [round(sum_lat / count, COORD_DIGITS), round(sum_lng / count, COORD_DIGITS), count, rep]
+        if count > 1:
+            row += [round(south, COORD_DIGITS), round(west, COORD_DIGITS),
+                    round(north, COORD_DIGITS), round(east, COORD_DIGITS)]
+        rows.append(row)
+    return {'version': CLUSTERS_VERSION, 'zoom': zoom, 'clusters': rows}
+
+def dump(document):
+    return json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def write_clusters(points, levels, clusters_dir, invalid=0):
+    """Zapíše soubory zoomů a nakonec atomicky index, URL nesou hash obsahu kvůli cache"""
+    companies = [[name, round(lat, COORD_DIGITS), round(lng, COORD_DIGITS), logo]
+                 for name, lat, lng, logo in points]
+    files = {zoom: dump(zoom_document(zoom, clusters)) for zoom, clusters in levels.items()}
+
+    digest = hashlib.sha256(dump(companies))
+    for zoom in sorted(files):
+        digest.update(files[zoom])
+    digest = digest.hexdigest()
+
+    for zoom, data in files.items():
+        write_atomic(os.path.join(clusters_dir, ZOOM_FILENAME.format(zoom=zoom)), data)
+
+    index = {
+        'version': CLUSTERS_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'hash': digest,
+        'minZoom': min(levels),
+        'maxZoom': max(levels),
+        'cellSize': 1 << CELL_BITS,
+        'invalid': invalid,
+        'companies': companies,
+        'zooms': {str(zoom): f"/{CLUSTERS_DIRNAME}/{ZOOM_FILENAME.format(zoom=zoom)}?v={digest[:12]}"
+                  for zoom in sorted(files)},
+    }
+    write_atomic(os.path.join(clusters_dir, CLUSTERS_INDEX_FILENAME), dump(index))
+    return index, sum(len(data) for data in files.values())
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--min-zoom', type=int, default=MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM)
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    logos_dir = args.logos_dir
+    clusters_dir = os.path.join(os.path.dirname(logos_dir), CLUSTERS_DIRNAME)
+    os.makedirs(clusters_dir, exist_ok=True)
+
+    print(f"🗺️  Počítám shluky markerů pro zoomy {args.min_zoom}-{args.max_zoom}...")
+
+    points, invalid = load_points(args.source, logos_dir)
+    levels = build_levels(points, args.min_zoom, args.max_zoom)
+    index, size = write_clusters(points, levels, clusters_dir, invalid)
+
+    print(f"✅ {len(points)} firem, shluků na zoomu {index['minZoom']}: {len(levels[index['minZoom']])}, "
+          f"na zoomu {index['maxZoom']}: {len(levels[index['maxZoom']])} ({size / 1024:.1f} kB)")
+    if invalid:
+        print(f"⚠️  Bez platné GPS (umístěno na výchozí pozici jako v API mapy): {invalid}")
+    print(f"📁 Shluky uloženy v: {clusters_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+// Checks src/lib/logo-names.ts against the golden vectors generated by logo_names.py
+// Usage: npm run check:logo-names
+import { readFileSync } from 'fs'
+import path from 'path'
+import { sanitizeFilename } from './src/lib/logo-names'
+
+interface GoldenVector {
+  input: string
+  filename: string
+}
+
+const goldenPath = path.join(__dirname, 'logo-names.golden.json')
+const golden = JSON.parse(readFileSync(goldenPath, 'utf-8')) as { version: number; vectors: GoldenVector[] }
+
+let failures = 0
+for (const vector of golden.vectors) {
+  const actual = sanitizeFilename(vector.input)
+  if (actual !== vector.filename) {
+    failures++
+    console.log(`❌ ${JSON.stringify(vector.input)}: ${actual} !== ${vector.filename}`)
+  }
+}
+
+console.log(`${failures ? '❌' : '✅'} ${golden.vectors.length - failures}/${golden.vectors.length} golden vectors match`)
+process.exit(failures ? 1 : 0)
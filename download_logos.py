@@ -3,24 +3,27 @@
 Skript pro stažení log zákazníků z Google Images
 """
 
-import requests
+import argparse
 import os
-import time
-import re
-from urllib.parse import quote
 
-def sanitize_filename(company_name):
-    """Převede název firmy na validní název souboru"""
-    return re.sub(r'[^a-z0-9]', '_', company_name.lower()) + '.png'
+from erp_customers import DEFAULT_SOURCE, iter_customer_names
+from logo_cache import LogoMetaStore, default_meta_path, refresh_logo
+from logo_http import LogoHttpClient
+from logo_names import sanitize_filename_js_style
+from logo_store import DEFAULT_LOGOS_DIR, LogoStore
+from logo_validate import LogoRejected, read_logo, to_png
 
-def download_logo(company_name, max_retries=3):
+def download_logo(client, store, blobs, company_name, max_retries=3, refresh=False):
     """Stáhne logo pro danou společnost"""
-    filename = sanitize_filename(company_name)
-    filepath = f'/home/oak/firma-portal/public/logos/{filename}'
+    filename = sanitize_filename_js_style(company_name)
+    filepath = os.path.join(blobs.logos_dir, filename)
     
     # Přeskočit pokud soubor již existuje
     if os.path.exists(filepath):
-        print(f"✅ Logo pro {company_name} již existuje: {filename}")
+        if refresh and refresh_logo(client, store, blobs, filename, min_size=1000) == 'updated':
+            print(f"🔄 Aktualizováno logo pro {company_name}: {filename}")
+        else:
+            print(f"✅ Logo pro {company_name} již existuje: {filename}")
         return True
     
     # Hledat logo přes Google Images (použijeme jednoduchý přístup)
@@ -36,88 +39,54 @@ def download_logo(company_name, max_retries=3):
         try:
             print(f"🔍 Pokus {i+1}/{len(logo_sources)} pro {company_name}: {logo_url}")
             
-            response = requests.get(logo_url, timeout=10)
+            response = client.get(logo_url, stream=True)
+            content = to_png(*read_logo(response, min_size=1000))  # Minimální velikost obrázku
             
-            if response.status_code == 200 and len(response.content) > 1000:  # Minimální velikost obrázku
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                print(f"✅ Staženo logo pro {company_name}: {filename}")
-                return True
-            else:
-                print(f"❌ Neúspěšný pokus pro {company_name}: status {response.status_code}")
+            blobs.put_and_publish(filename, content)
+            store.record(filename, company_name, logo_url, response)
+            print(f"✅ Staženo logo pro {company_name}: {filename}")
+            return True
                 
+        except LogoRejected as e:
+            store.reject(filename, logo_url, e.reason)
+            print(f"❌ Neúspěšný pokus pro {company_name}: {e.reason}")
         except Exception as e:
             print(f"❌ Chyba při stahování pro {company_name}: {e}")
-        
-        time.sleep(1)  # Počkat mezi pokusy
     
     print(f"⚠️  Nepodařilo se stáhnout logo pro {company_name}")
     return False
 
 def main():
     """Hlavní funkce"""
-    # Seznam zákazníků
-    companies = [
-        "ABS Jets, a.s.",
-        "agriKomp Bohemia s.r.o.",
-        "ATALIAN CZ s.r.o.",
-        "ATALIAN SK s. r. o.",
-        "Aviation composite solution s.r.o.",
-        "BBH Tsuchiya s.r.o.",
-        "BeF Home, s.r.o.",
-        "Chládek zahradnické centrum s.r.o.",
-        "ČKD Blansko Holding, a.s.",
-        "CONSULTEST s.r.o.",
-        "CONTEG, spol. s r.o.",
-        "CZ-AEROMOTIVE a.s.",
-        "CZ-SKD Solutions a.s.",
-        "Dopravní podnik města České Budějovice, a.s.",
-        "EGE Power System, s.r.o.",
-        "EGE, spol. s r.o.",
-        "EVEKTOR, spol. s r.o.",
-        "Falcon security, s.r.o.",
-        "Geomine a.s.",
-        "HGS, a.s.",
-        "ITMAN Czech, s.r.o.",
-        "KAMÍR a Co spol. s r. o.",
-        "KARAT Software a.s.",
-        "KRAB BRNO, s.r.o.",
-        "Lašek Transport s.r.o.",
-        "LINEA NIVNICE, a.s.",
-        "Mark2 Corporation Czech a.s.",
-        "MEDICA FILTER spol. s r.o.",
-        "MODELÁRNA LIAZ spol. s r. o.",
-        "NN STEEL s.r.o.",
-        "NPK Europe Mfg. s.r.o.",
-        "NYTRON s.r.o.",
-        "PAPOS Trade s.r.o.",
-        "PCV Computers, s. r. o.",
-        "POLAK CZ s.r.o.",
-        "PRODOMOS s.r.o.",
-        "SAGITTA Ltd., spol. s r.o.",
-        "SENSIT s.r.o.",
-        "SIGNUM spol. s r.o.",
-        "SILROC CZ,a.s.",
-        "SINOP SMP s.r.o.",
-        "TVD-Technická výroba, a.s.",
-        "ZAMET, spol. s r.o."
-    ]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--refresh', action='store_true',
+                        help='revalidovat existující loga přes ETag/Last-Modified')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+    
     
     # Vytvořit adresář pro loga pokud neexistuje
-    logos_dir = '/home/oak/firma-portal/public/logos'
+    logos_dir = args.logos_dir
     os.makedirs(logos_dir, exist_ok=True)
     
-    print(f"🚀 Začínám stahovat {len(companies)} log...")
+    print(f"🚀 Začínám stahovat loga zákazníků (zdroj: {args.source})...")
     
     successful = 0
     failed = 0
     
-    for company in companies:
-        if download_logo(company):
-            successful += 1
-        else:
-            failed += 1
-        time.sleep(2)  # Počkat mezi stahováním
+    # Rate limit řeší klient pro každý host zvlášť, fixní pauzy nejsou potřeba
+    store = LogoMetaStore(default_meta_path(logos_dir))
+    blobs = LogoStore(logos_dir)
+    with LogoHttpClient() as client:
+        for company in iter_customer_names(args.source):
+            if download_logo(client, store, blobs, company, refresh=args.refresh):
+                successful += 1
+            else:
+                failed += 1
+    store.save()
     
     print(f"\n📊 Statistika:")
     print(f"✅ Úspěšně staženo: {successful}")
@@ -3,183 +3,342 @@
 Skript pro stažení skutečných log zákazníků z internetu
 """
 
+import argparse
+import asyncio
 import os
-import requests
-import time
-import re
-import unicodedata
-from urllib.parse import quote
-
-def sanitize_filename_js_style(company_name):
-    """JavaScript styl generování názvů souborů"""
-    filename = company_name.lower()
-    filename = unicodedata.normalize('NFD', filename)  # Normalize diacritics
-    filename = ''.join(c for c in filename if unicodedata.category(c) != 'Mn')  # Remove diacritic marks
-    filename = ''.join(c if c.isalnum() else '_' for c in filename)  # Replace non-alnum with _
-    filename = '_'.join(filter(None, filename.split('_')))  # Remove multiple underscores
-    filename = filename.strip('_')  # Remove leading/trailing underscores
-    filename += '.png'
-    
-    return filename
-
-def download_logo_from_various_sources(company_name, filename):
-    """Stáhne logo z různých zdrojů"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from erp_customers import DEFAULT_SOURCE, iter_customer_names
+from logo_cache import LogoMetaStore, default_meta_path, refresh_logo
+from logo_domains import DomainResolver, default_domains_path
+from logo_http import LogoHttpClient
+from logo_journal import LogoJournal, default_journal_path
+from logo_metrics import NO_METRICS, RunMetrics, default_metrics_dir
+from logo_names import sanitize_filename_js_style
+from logo_phash import PlaceholderDetector, add_placeholders, placeholder_entry
+from logo_store import DEFAULT_LOGOS_DIR, LogoStore
+from logo_validate import LogoCancelled, LogoRejected, read_logo, to_png
+
+# Globální limit souběžných HTTP požadavků (napříč všemi firmami)
+MAX_CONCURRENCY = 16
+
+# Šablony URL zdrojů log v pořadí priority
+CLEARBIT_URL = "https://logo.clearbit.com/{domain}"
+FAVICON_URL = "https://www.google.com/s2/favicons?domain={domain}&sz=128"
+DUCKDUCKGO_URL = "https://icons.duckduckgo.com/ip3/{domain}.ico"
+
+# Doména, která nikdy neexistuje (RFC 2606) - co na ni zdroj vrátí, je jeho placeholder
+PROBE_DOMAIN = 'logo-placeholder-probe.invalid'
+PROBE_SOURCES = (
+    ('clearbit-default', CLEARBIT_URL),
+    ('google-s2-default-globe', FAVICON_URL),
+    ('duckduckgo-default', DUCKDUCKGO_URL),
+)
+
+# Kolik nejlépe seřazených živých domén se zkouší přes HTTP
+MAX_DOMAINS = 3
+
+# Výsledky firmy, které se počítají jako úspěch
+OK_OUTCOMES = ('exists', 'not-modified', 'updated', 'downloaded')
+
+# Custom logo sources pro známé české firmy
+CUSTOM_SOURCES = {
+    "ČKD Blansko Holding, a.s.": "https://www.ckdblansko.cz/wp-content/uploads/2021/03/CKD-Blansko-logo.png",
+    "Dopravní podnik města České Budějovice, a.s.": "https://www.dpb.cz/images/logo-dpb.png",
+    "EVEKTOR, spol. s r.o.": "https://www.evektor.cz/images/evektor-logo.png",
+    "KARAT Software a.s.": "https://www.karat.cz/wp-content/uploads/2020/09/karat-logo.png",
+    "LINEA NIVNICE, a.s.": "https://www.linea-nivnice.cz/images/logo.png",
+}
+
+def logo_candidates(company_name, domains):
+    """Vrátí seznam kandidátů (zdroj, doména/popis, url, minimální velikost) v pořadí priority"""
+    candidates = []
+    domains = domains[:MAX_DOMAINS]
     
     # 1. Clearbit Logo API
-    clearbit_domains = [
-        company_name.lower().replace(' ', '').replace(',', '').replace('.', '').replace('s.r.o.', '').replace('a.s.', '').replace('spol.', ''),
-        company_name.lower().replace(' ', '').split(',')[0].replace('.', ''),
-    ]
-    
-    for domain in clearbit_domains:
-        if len(domain) > 3:  # Minimální délka domény
-            try:
-                clearbit_url = f"https://logo.clearbit.com/{domain}.com"
-                response = requests.get(clearbit_url, timeout=10)
-                if response.status_code == 200 and len(response.content) > 1000:
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-                    print(f"✅ Clearbit: {company_name} -> {domain}.com")
-                    return True
-            except:
-                continue
+    for domain in domains:
+        candidates.append(("Clearbit", domain, CLEARBIT_URL.format(domain=domain), 1000))
     
     # 2. Google Favicon API
-    for domain in clearbit_domains:
-        if len(domain) > 3:
-            try:
-                favicon_url = f"https://www.google.com/s2/favicons?domain={domain}.com&sz=128"
-                response = requests.get(favicon_url, timeout=10)
-                if response.status_code == 200 and len(response.content) > 500:
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-                    print(f"✅ Favicon: {company_name} -> {domain}.com")
-                    return True
-            except:
-                continue
+    for domain in domains:
+        candidates.append(("Favicon", domain, FAVICON_URL.format(domain=domain), 500))
     
     # 3. DuckDuckGo Icon API
+    for domain in domains:
+        candidates.append(("DuckDuckGo", domain, DUCKDUCKGO_URL.format(domain=domain), 500))
+    
+    # 4. Custom logo sources
+    if company_name in CUSTOM_SOURCES:
+        candidates.append(("Custom", CUSTOM_SOURCES[company_name], CUSTOM_SOURCES[company_name], 500))
+    
+    return candidates
+
+def probe_placeholders(client):
+    """Záznamy blocklistu pro placeholdery, které zdroje vrací pro neznámou doménu.
+
+    Jen odpovědi, které by prošly validací (200, obrázek) - ostatní by se
+    jako logo stejně neuložily.
+    """
+    entries = []
+    for name, template in PROBE_SOURCES:
+        try:
+            response = client.get(template.format(domain=PROBE_DOMAIN), stream=True)
+            entry = placeholder_entry(name, to_png(*read_logo(response, min_size=0)))
+        except Exception:
+            continue
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+class FetchContext:
+    """Sdílené objekty jednoho běhu stahování"""
+
+    def __init__(self, client, store, blobs, resolver, journal=None, placeholders=None,
+                 max_concurrency=MAX_CONCURRENCY, metrics=NO_METRICS):
+        self.client = client
+        self.store = store
+        self.blobs = blobs
+        self.resolver = resolver
+        self.journal = journal
+        self.placeholders = placeholders
+        self.metrics = metrics
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+def fetch_candidate(ctx, key, source, url, min_size, cancelled=None):
+    """Stáhne a ověří jednoho kandidáta (blokující volání, běží ve vlákně).
+
+    Vrací (odpověď, obsah) nebo None; odmítnuté odpovědi se zapíší do metadat
+    a každý pokus do journalu. Po nastavení `cancelled` (jiný kandidát vyhrál)
+    se požadavek nezačne, resp. čtení těla skončí u dalšího bloku - přerušený
+    pokus se do journalu nepočítá jako neúspěch zdroje.
+    """
+    if cancelled is not None and cancelled.is_set():
+        return None
+    outcome, reason, result = 'error', None, None
+    size = 0
     try:
-        search_query = quote(company_name + " logo")
-        duckduckgo_url = f"https://icons.duckduckgo.com/ip3/{company_name.lower().replace(' ', '')}.com.ico"
-        response = requests.get(duckduckgo_url, timeout=10)
-        if response.status_code == 200 and len(response.content) > 500:
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            print(f"✅ DuckDuckGo: {company_name}")
+        with ctx.metrics.stage('connect', source):
+            response = ctx.client.get(url, stream=True)
+        with ctx.metrics.stage('transfer', source):
+            content = to_png(*read_logo(response, min_size, cancelled=cancelled))
+        size = len(content)
+        # Generické ikony (glóbus, parkovaná doména) nejsou logo firmy
+        with ctx.metrics.stage('validate', source):
+            placeholder = ctx.placeholders.check(content) if ctx.placeholders else None
+        if placeholder:
+            raise LogoRejected(f'placeholder {placeholder}')
+        result = response, content
+        outcome = 'hit'
+    except LogoCancelled:
+        ctx.metrics.source_attempt(source, 'cancelled')
+        return None
+    except LogoRejected as e:
+        ctx.store.reject(key, url, e.reason)
+        outcome, reason = 'reject', e.reason
+    except Exception as e:
+        reason = type(e).__name__
+    ctx.metrics.source_attempt(source, outcome, size)
+    if ctx.journal:
+        ctx.journal.attempt(key, source, url, outcome, reason)
+    return result
+
+async def fetch_limited(ctx, key, source, url, min_size, cancelled):
+    """Stáhne kandidáta s respektováním globálního limitu souběžnosti"""
+    async with ctx.semaphore:
+        return await asyncio.to_thread(fetch_candidate, ctx, key, source, url, min_size, cancelled)
+
+async def download_logo_from_various_sources(ctx, company_name, filename):
+    """Stáhne logo z různých zdrojů - všechny zdroje se dotazují paralelně,
+    vítězí první platný výsledek v pořadí priority"""
+    key = os.path.basename(filename)
+    # DNS ověření kandidátních domén ještě před HTTP požadavky
+    domains = await asyncio.to_thread(ctx.resolver.domains_for, company_name)
+    candidates = logo_candidates(company_name, domains)
+    if ctx.journal:
+        # Zdroje, které pro firmu opakovaně selhávají, jsou v back-off
+        candidates = [c for c in candidates if ctx.journal.source_allowed(key, c[2])]
+    # task.cancel() nezastaví vlákno, které už stahuje - to sleduje tuto událost
+    cancelled = threading.Event()
+    tasks = [asyncio.create_task(fetch_limited(ctx, key, source, url, min_size, cancelled))
+             for source, _, url, min_size in candidates]
+    
+    try:
+        for (source, label, url, _), task in zip(candidates, tasks):
+            result = await task
+            if result is None:
+                continue
+            response, content = result
+            with ctx.metrics.stage('write', source):
+                ctx.blobs.put_and_publish(key, content)
+                ctx.store.record(key, company_name, url, response)
+            if source == "Custom":
+                print(f"✅ {source}: {company_name}")
+            else:
+                ctx.resolver.confirm(company_name, label)
+                print(f"✅ {source}: {company_name} -> {label}")
             return True
-    except:
-        pass
-    
-    # 4. Custom logo sources pro známé české firmy
-    custom_sources = {
-        "ČKD Blansko Holding, a.s.": "https://www.ckdblansko.cz/wp-content/uploads/2021/03/CKD-Blansko-logo.png",
-        "Dopravní podnik města České Budějovice, a.s.": "https://www.dpb.cz/images/logo-dpb.png",
-        "EVEKTOR, spol. s r.o.": "https://www.evektor.cz/images/evektor-logo.png",
-        "KARAT Software a.s.": "https://www.karat.cz/wp-content/uploads/2020/09/karat-logo.png",
-        "LINEA NIVNICE, a.s.": "https://www.linea-nivnice.cz/images/logo.png",
-    }
-    
-    if company_name in custom_sources:
-        try:
-            custom_url = custom_sources[company_name]
-            response = requests.get(custom_url, timeout=10)
-            if response.status_code == 200 and len(response.content) > 500:
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"✅ Custom: {company_name}")
-                return True
-        except:
-            pass
+    finally:
+        # Zrušit kandidáty s nižší prioritou, které už nepotřebujeme - čekající
+        # i ty, jejichž vlákno právě stahuje tělo odpovědi
+        cancelled.set()
+        for task in tasks:
+            task.cancel()
     
     return False
 
-def main():
-    """Hlavní funkce"""
-    # Seznam zákazníků
-    companies = [
-        "ABS Jets, a.s.",
-        "agriKomp Bohemia s.r.o.",
-        "ATALIAN CZ s.r.o.",
-        "ATALIAN SK s. r. o.",
-        "Aviation composite solution s.r.o.",
-        "BBH Tsuchiya s.r.o.",
-        "BeF Home, s.r.o.",
-        "Chládek zahradnické centrum s.r.o.",
-        "ČKD Blansko Holding, a.s.",
-        "CONSULTEST s.r.o.",
-        "CONTEG, spol. s r.o.",
-        "CZ-AEROMOTIVE a.s.",
-        "CZ-SKD Solutions a.s.",
-        "Dopravní podnik města České Budějovice, a.s.",
-        "EGE Power System, s.r.o.",
-        "EGE, spol. s r.o.",
-        "EVEKTOR, spol. s r.o.",
-        "Falcon security, s.r.o.",
-        "Geomine a.s.",
-        "HGS, a.s.",
-        "ITMAN Czech, s.r.o.",
-        "KAMÍR a Co spol. s r. o.",
-        "KARAT Software a.s.",
-        "KRAB BRNO, s.r.o.",
-        "Lašek Transport s.r.o.",
-        "LINEA NIVNICE, a.s.",
-        "Mark2 Corporation Czech a.s.",
-        "MEDICA FILTER spol. s r.o.",
-        "MODELÁRNA LIAZ spol. s r. o.",
-        "NN STEEL s.r.o.",
-        "NPK Europe Mfg. s.r.o.",
-        "NYTRON s.r.o.",
-        "PAPOS Trade s.r.o.",
-        "PCV Computers, s. r. o.",
-        "POLAK CZ s.r.o.",
-        "PRODOMOS s.r.o.",
-        "SAGITTA Ltd., spol. s r.o.",
-        "SENSIT s.r.o.",
-        "SIGNUM spol. s r.o.",
-        "SILROC CZ,a.s.",
-        "SINOP SMP s.r.o.",
-        "TVD-Technická výroba, a.s.",
-        "ZAMET, spol. s r.o."
-    ]
+async def download_all(ctx, companies, logos_dir, refresh=False):
+    """Stáhne loga všech firem souběžně, vrací (úspěšné, neúspěšné).
+
+    V režimu `refresh` se existující loga revalidují podmíněným požadavkem.
+    S journalem se zpracují jen nové, změněné a zastaralé firmy.
+    """
+    # Omezení rozpracovaných firem - seznam se čte průběžně v konstantní paměti
+    pending = asyncio.Semaphore(ctx.max_concurrency * 4)
+    # Výchozí executor musí mít dost vláken, jinak by omezoval souběžnost místo semaforu
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=ctx.max_concurrency + 1))
+    counts = {True: 0, False: 0}
     
+    async def process(i, company, filename):
+        """Zpracuje jednu firmu, vrací výsledek (viz OK_OUTCOMES)"""
+        filepath = os.path.join(logos_dir, filename)
+        exists = os.path.exists(filepath)
+        status = ctx.journal.status(filename, exists) if ctx.journal else ('fresh' if exists else 'new')
+        
+        # Přeskočit pokud soubor již existuje (případně jen levně revalidovat)
+        if exists:
+            if status in ('fresh', 'backoff') and not refresh:
+                print(f"⏭️  [{i}] {company} - již existuje")
+                return 'exists'
+            async with ctx.semaphore:
+                with ctx.metrics.stage('revalidate'):
+                    outcome = await asyncio.to_thread(refresh_logo, ctx.client, ctx.store, ctx.blobs, filename)
+            if outcome == 'updated':
+                print(f"🔄 [{i}] {company} - aktualizováno")
+            elif outcome == 'not-modified':
+                print(f"⏭️  [{i}] {company} - beze změny (304)")
+            else:
+                print(f"⏭️  [{i}] {company} - již existuje")
+            # I neúspěšná revalidace ('unknown', 'failed') - jinak by se opakovala v každém běhu
+            if ctx.journal:
+                ctx.journal.result(filename, company, outcome)
+            return outcome if outcome in ('updated', 'not-modified') else 'exists'
+        
+        if status == 'backoff':
+            print(f"⏸️  [{i}] {company} - opakovaně nenalezeno, další pokus později")
+            return 'backoff'
+        
+        print(f"🔍 [{i}] {company}")
+        
+        found = await download_logo_from_various_sources(ctx, company, filepath)
+        outcome = 'downloaded' if found else 'missing'
+        if ctx.journal:
+            ctx.journal.result(filename, company, outcome)
+        if not found:
+            print(f"❌ [{i}] {company} - nenalezeno")
+        return outcome
+    
+    async def run(i, company):
+        try:
+            filename = sanitize_filename_js_style(company)
+            with ctx.metrics.company(filename, company):
+                outcome = await process(i, company, filename)
+                ctx.metrics.outcome(outcome)
+            counts[outcome in OK_OUTCOMES] += 1
+        finally:
+            pending.release()
+    
+    # Zdroj (soubor nebo HTTP stream) se čte ve vlákně, aby neblokoval smyčku
+    companies = iter(companies)
+    tasks = set()
+    i = 0
+    while True:
+        await pending.acquire()
+        company = await asyncio.to_thread(next, companies, None)
+        if company is None:
+            pending.release()
+            break
+        i += 1
+        task = asyncio.create_task(run(i, company))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    
+    if tasks:
+        await asyncio.gather(*tasks)
+    return counts[True], counts[False]
+
+def run(logos_dir, source=DEFAULT_SOURCE, refresh=False, metrics_dir=None, client=None, companies=None):
+    """Stáhne loga zákazníků a vypíše statistiku, vrací (úspěšné, neúspěšné).
+
+    `client` je sdílený LogoHttpClient (pool spojení zůstane otevřený pro
+    další kroky), `companies` předem načtený seznam firem místo čtení `source`.
+    """
     # Vytvořit adresář pro loga pokud neexistuje
-    logos_dir = '/home/oak/firma-portal/public/logos'
     os.makedirs(logos_dir, exist_ok=True)
     
-    print(f"🌐 Stahuji {len(companies)} log z internetu...")
+    print(f"🌐 Stahuji loga zákazníků z internetu (zdroj: {source})...")
     print("🔄 Zdroje: Clearbit, Google Favicon, DuckDuckGo, Custom sources")
     print("-" * 60)
     
-    successful = 0
-    failed = 0
-    
-    for i, company in enumerate(companies, 1):
-        filename = sanitize_filename_js_style(company)
-        filepath = os.path.join(logos_dir, filename)
-        
-        # Přeskočit pokud soubor již existuje
-        if os.path.exists(filepath):
-            print(f"⏭️  [{i}/{len(companies)}] {company} - již existuje")
-            successful += 1
-            continue
-        
-        print(f"🔍 [{i}/{len(companies)}] {company}")
-        
-        if download_logo_from_various_sources(company, filepath):
-            successful += 1
-        else:
-            failed += 1
-            print(f"❌ [{i}/{len(companies)}] {company} - nenalezeno")
-        
-        time.sleep(1)  # Počkat mezi stahováním
+    metrics = RunMetrics('download_real_logos')
+    store = LogoMetaStore(default_meta_path(logos_dir))
+    blobs = LogoStore(logos_dir)
+    resolver = DomainResolver(default_domains_path(logos_dir), metrics=metrics)
+    with (nullcontext(client) if client else LogoHttpClient()) as client, \
+            LogoJournal(default_journal_path(logos_dir)) as journal:
+        if companies is None:
+            companies = iter_customer_names(source, client.session)
+        # Aktuální placeholdery zdrojů - blocklist v repozitáři nemusí odpovídat jejich dnešní podobě
+        placeholders = PlaceholderDetector()
+        probed = probe_placeholders(client)
+        placeholders.extend(probed)
+        if probed:
+            print(f"🚫 Placeholdery zdrojů: {', '.join(entry['name'] for entry in probed)}")
+        ctx = FetchContext(client, store, blobs, resolver, journal, placeholders, metrics=metrics)
+        successful, failed = asyncio.run(download_all(ctx, companies, logos_dir, refresh=refresh))
+    store.save()
+    resolver.save()
+    resolver.close()
+    metrics_paths = metrics.export(metrics_dir or default_metrics_dir(logos_dir))
     
     print("-" * 60)
     print(f"📊 Statistika:")
     print(f"✅ Úspěšně staženo: {successful}")
     print(f"❌ Neúspěšných: {failed}")
     print(f"📁 Loga uložena v: {logos_dir}")
-    print(f"📈 Úspěšnost: {successful/(successful+failed)*100:.1f}%")
+    total = successful + failed
+    if total:
+        print(f"📈 Úspěšnost: {successful / total * 100:.1f}%")
+    for name, rate in sorted(metrics.hit_rates().items()):
+        print(f"   {name}: úspěšnost {rate * 100:.1f}%, {metrics.sources[name]['bytes'] / 1024:.1f} kB")
+    print(f"📏 Metriky: {', '.join(metrics_paths)}")
+    return successful, failed
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--refresh', action='store_true',
+                        help='revalidovat existující loga přes ETag/Last-Modified')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--metrics-dir',
+                        help='adresář pro metriky (JSONL a Prometheus textfile, výchozí .logos-state/metrics)')
+    parser.add_argument('--seed-placeholders', action='store_true',
+                        help='stáhnout placeholdery zdrojů pro neznámou doménu do logo-placeholders.json a skončit')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+    
+    if args.seed_placeholders:
+        with LogoHttpClient() as client:
+            entries = probe_placeholders(client)
+        add_placeholders(entries)
+        print(f"✅ Placeholdery v blocklistu: {', '.join(e['name'] for e in entries) or 'žádné (zdroje nevrátily obrázek)'}")
+        return
+    
+    run(args.logos_dir, args.source, refresh=args.refresh, metrics_dir=args.metrics_dir)
 
 if __name__ == "__main__":
     main()
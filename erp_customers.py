@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Načítání zákazníků z ERP feedu projektů (/web/projects) - z URL nebo
+uloženého JSON souboru, streamovaně a s průběžnou deduplikací
+"""
+
+import codecs
+import json
+import os
+
+# Výchozí zdroj - lze přepsat proměnnou prostředí (URL nebo cesta k JSON)
+SAMPLE_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'erp-projects.sample.json')
+DEFAULT_SOURCE = os.environ.get('ERP_PROJECTS_SOURCE', SAMPLE_SOURCE)
+
+CHUNK_SIZE = 64 * 1024
+HTTP_TIMEOUT = 30
+
+_decoder = json.JSONDecoder()
+# Znaky, které mohou následovat po prvku pole - u čísla cokoli jiného (".", "e")
+# znamená, že raw_decode vrátil jen prefix a číslo pokračuje v dalším bloku
+ITEM_DELIMITERS = ' \t\r\n,]'
+
+def iter_json_array(chunks):
+    """Postupně parsuje JSON pole z proudu bajtových bloků a vrací jeho prvky.
+
+    V paměti drží jen rozpracovaný prvek, ne celý dokument.
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[pos:] + text_decoder.decode(b'', final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+    while True:
+        # Přeskočit bílé znaky a oddělovače mezi prvky
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n' + (',' if started else ''):
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError('Neočekávaný konec JSON dokumentu')
+            fill()
+            continue
+
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError('Očekáváno JSON pole projektů')
+            started = True
+            pos += 1
+            continue
+
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+
+        # Skalár na konci bufferu (nebo jeho prefix, např. "1500" z "1500.0")
+        # může pokračovat v dalším bloku
+        if not eof and (end == len(buffer) or buffer[end] not in ITEM_DELIMITERS):
+            fill()
+            continue
+
+        pos = end
+        yield item
+
+def iter_source_chunks(source, chunk_size=CHUNK_SIZE, session=None):
+    """Bajtové bloky z URL (streamovaně přes HTTP) nebo ze souboru.
+
+    `session` (requests.Session) umožní použít už otevřený pool spojení.
+    """
+    if source.startswith(('http://', 'https://')):
+        if session is None:
+            import requests
+            session = requests
+        with session.get(source, stream=True, timeout=HTTP_TIMEOUT) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+    else:
+        with open(source, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+def iter_projects(source=DEFAULT_SOURCE, session=None):
+    """Projekty z ERP feedu jako slovníky"""
+    for project in iter_json_array(iter_source_chunks(source, session=session)):
+        if isinstance(project, dict):
+            yield project
+
+def iter_customers(source=DEFAULT_SOURCE, session=None):
+    """Unikátní zákazníci (nazev_par, gps, logo) v pořadí prvního výskytu"""
+    seen = set()
+    for project in iter_projects(source, session):
+        name = (project.get('nazev_par') or '').strip()
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        yield {
+            'nazev_par': name,
+            'gps': project.get('gps') or '',
+            'logo': project.get('logo') or '',
+        }
+
+def iter_customer_names(source=DEFAULT_SOURCE, session=None):
+    """Jen názvy unikátních zákazníků"""
+    for customer in iter_customers(source, session):
+        yield customer['nazev_par']
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Předzpracování GPS souřadnic z ERP feedu projektů - všechny řetězce gps se
+naparsují a ověří jednou dávkou v NumPy (desetinný i DMS formát), výsledek
+se uloží jako tabulka podle hashe řetězce a souřadnice zákazníků pro API mapy
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+
+from erp_customers import DEFAULT_SOURCE, iter_projects
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+
+GPS_FILENAME = 'gps-coordinates.json'
+GPS_TABLE_VERSION = 1
+# Zvýšit při změně parseru - uložené výsledky se pak naparsují znovu
+PARSER_VERSION = 1
+
+# Výsledky parsování - index odpovídá hodnotě ve sloupci status
+STATUSES = ('ok', 'empty', 'malformed', 'range', 'swapped')
+OK, EMPTY, MALFORMED, RANGE, SWAPPED = range(len(STATUSES))
+
+# Oblast, kde leží zákazníci (jih, sever, západ, východ) - bod mimo ni, jehož
+# prohozená varianta v ní leží, má nejspíš prohozenou šířku a délku
+EXPECTED_REGION = (34.0, 72.0, -25.0, 45.0)
+# Přesnost uložených souřadnic (6 desetinných míst ~ 0,1 m)
+COORD_DIGITS = 6
+
+# Čísla včetně desetinné čárky, světové strany jako samostatná písmena
+NUMBER = re.compile(r'-?\d+(?:[.,]\d+)?')
+HEMISPHERE = re.compile(r'(?<![A-Z])[NSEW](?![A-Z])')
+
+def default_gps_path(logos_dir):
+    """Tabulka souřadnic leží vedle adresáře s logy v public/ - čte ji API mapy (src/lib/gps.ts)"""
+    return os.path.join(os.path.dirname(os.path.abspath(logos_dir)), GPS_FILENAME)
+
+def gps_hash(raw):
+    """Klíč tabulky - stejný výpočet dělá src/lib/gps.ts"""
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+def in_region(lat, lng, region=EXPECTED_REGION):
+    south, north, west, east = region
+    return (lat >= south) & (lat <= north) & (lng >= west) & (lng <= east)
+
+def split_numbers(text):
+    """Čísla z řetězce - jediné číslo s čárkou je dvojice celých stupňů ('50,14', '0,0')"""
+    tokens = NUMBER.findall(text)
+    if len(tokens) == 1 and ',' in tokens[0]:
+        return tokens[0].split(',')
+    return tokens
+
+def parse_batch(raws, region=EXPECTED_REGION):
+    """Naparsuje seznam řetězců gps, vrací pole (lat, lng, status).
+
+    Regulární výrazy jen rozdělí řetězce na čísla a světové strany, převod
+    čísel, DMS na stupně, znaménka podle N/S/E/W a všechny kontroly běží
+    nad celými poli najednou. Podporované tvary: '50.0755,14.4378',
+    '50,0755; 14,4378', '50°4'31.8"N 14°26'16.1"E', 'E 14 26.3, N 50 4.5'.
+    """
+    count = len(raws)
+    texts = [raw.upper() for raw in raws]
+    numbers = [split_numbers(text) for text in texts]
+    letters = [''.join(HEMISPHERE.findall(text)[:3]) for text in texts]
+
+    counts = np.fromiter((len(tokens) for tokens in numbers), dtype=np.int64, count=count)
+    flat = [token for tokens in numbers for token in tokens]
+    values = np.char.replace(np.array(flat or ['0']), ',', '.').astype(np.float64)
+
+    # Složky (stupně, minuty, sekundy) pro obě osy, chybějící zůstávají 0
+    shaped = np.isin(counts, (2, 4, 6))
+    per_axis = counts // 2
+    starts = np.cumsum(counts) - counts
+    parts = np.zeros((count, 2, 3))
+    for axis in range(2):
+        for component in range(3):
+            mask = shaped & (component < per_axis)
+            parts[mask, axis, component] = values[starts[mask] + axis * per_axis[mask] + component]
+
+    degrees, minutes, seconds = parts[:, :, 0], parts[:, :, 1], parts[:, :, 2]
+    coords = np.copysign(np.abs(degrees) + minutes / 60 + seconds / 3600, degrees)
+    dms_ok = ((per_axis == 1) | (degrees == np.floor(degrees)).all(axis=1)) & \
+             ((minutes >= 0) & (minutes < 60) & (seconds >= 0) & (seconds < 60)).all(axis=1)
+
+    # Světové strany: první E/W znamená pořadí délka, šířka
+    codes = np.array(letters, dtype='U3').view('U1').reshape(count, 3) if count else np.empty((0, 3), 'U1')
+    lng_first = np.isin(codes[:, 0], ('E', 'W'))
+    lat = np.where(lng_first, coords[:, 1], coords[:, 0])
+    lng = np.where(lng_first, coords[:, 0], coords[:, 1])
+    lat_letter = np.where(lng_first, codes[:, 1], codes[:, 0])
+    lng_letter = np.where(lng_first, codes[:, 0], codes[:, 1])
+    letters_ok = (codes[:, 2] == '') & np.isin(lat_letter, ('', 'N', 'S')) & np.isin(lng_letter, ('', 'E', 'W'))
+    lat = np.where(lat_letter == 'S', -np.abs(lat), np.where(lat_letter == 'N', np.abs(lat), lat))
+    lng = np.where(lng_letter == 'W', -np.abs(lng), np.where(lng_letter == 'E', np.abs(lng), lng))
+
+    blank = np.array([not text.strip() for text in texts], dtype=bool)
+    in_range = (np.abs(lat) <= 90) & (np.abs(lng) <= 180)
+    unlabeled = codes[:, 0] == ''
+    swapped = unlabeled & (
+        (~in_range & (np.abs(lng) <= 90) & (np.abs(lat) <= 180)) |
+        (in_range & ~in_region(lat, lng, region) & in_region(lng, lat, region)))
+
+    status = np.full(count, OK, dtype=np.int8)
+    status[swapped] = SWAPPED
+    status[~in_range & ~swapped] = RANGE
+    status[~(shaped & dms_ok & letters_ok & np.isfinite(lat) & np.isfinite(lng))] = MALFORMED
+    # 0,0 je v ERP nevyplněná hodnota
+    status[blank | (shaped & (lat == 0) & (lng == 0))] = EMPTY
+    return lat, lng, status
+
+def load_table(path):
+    """Uložená tabulka, nebo prázdná (i při jiné verzi parseru)"""
+    empty = {'version': GPS_TABLE_VERSION, 'parser': PARSER_VERSION, 'entries': {}, 'customers': {}}
+    if not os.path.exists(path):
+        return empty
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get('version') != GPS_TABLE_VERSION or table.get('parser') != PARSER_VERSION:
+        return empty
+    return table
+
+def update_table(table, projects):
+    """Doplní tabulku o nové řetězce gps a přepočítá souřadnice zákazníků.
+
+    Znovu se parsují jen řetězce, jejichž hash v tabulce chybí; záznamy
+    řetězců, které už ve feedu nejsou, se zahodí. Vrací (tabulka, statistika).
+    """
+    pairs = [((project.get('nazev_par') or '').strip(), project.get('gps') or '') for project in projects]
+    keys = {raw: gps_hash(raw) for raw in dict.fromkeys(raw for _, raw in pairs)}
+
+    old_entries = table['entries']
+    missing = [raw for raw, key in keys.items() if key not in old_entries]
+    lat, lng, status = parse_batch(missing)
+
+    entries = {key: old_entries[key] for key in keys.values() if key in old_entries}
+    for raw, la, ln, st in zip(missing, lat.tolist(), lng.tolist(), status.tolist()):
+        entries[keys[raw]] = [round(la, COORD_DIGITS), round(ln, COORD_DIGITS)] if st == OK else STATUSES[st]
+
+    # Projekty jednoho zákazníka opakují souřadnice - vybere se nejčastější platná
+    votes = {}
+    for name, raw in pairs:
+        entry = entries[keys[raw]]
+        if name and isinstance(entry, list):
+            votes.setdefault(name, Counter())[tuple(entry)] += 1
+    customers = {name: list(counter.most_common(1)[0][0]) for name, counter in sorted(votes.items())}
+
+    statuses = Counter(entry if isinstance(entry, str) else 'ok' for entry in entries.values())
+    stats = {
+        'projects': len(pairs),
+        'distinct': len(keys),
+        'parsed': len(missing),
+        'reused': len(keys) - len(missing),
+        'statuses': dict(statuses),
+        'conflicts': sum(1 for counter in votes.values() if len(counter) > 1),
+    }
+    table = {
+        'version': GPS_TABLE_VERSION,
+        'parser': PARSER_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'entries': entries,
+        'customers': customers,
+    }
+    return table, stats
+
+def write_table(table, path):
+    write_atomic(path, json.dumps(table, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+
+def run(logos_dir, source=DEFAULT_SOURCE, path=None):
+    """Aktualizuje tabulku souřadnic ze zdroje, vrací statistiku"""
+    path = path or default_gps_path(logos_dir)
+    table, stats = update_table(load_table(path), iter_projects(source))
+    write_table(table, path)
+
+    print(f"🧭 GPS: {stats['projects']} projektů, {stats['distinct']} různých řetězců "
+          f"(naparsováno {stats['parsed']}, z cache {stats['reused']})")
+    print(f"📍 Zákazníků se souřadnicemi: {len(table['customers'])}")
+    rejected = {status: count for status, count in stats['statuses'].items() if status != 'ok'}
+    if rejected:
+        print(f"⚠️  Odmítnuto: {', '.join(f'{status} {count}' for status, count in sorted(rejected.items()))}")
+    if stats['conflicts']:
+        print(f"⚠️  Zákazníků s různými souřadnicemi v projektech: {stats['conflicts']}")
+    print(f"📁 Tabulka uložena v: {path}")
+    return stats
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    run(args.logos_dir, args.source)
+
+if __name__ == "__main__":
+    main()
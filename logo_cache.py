@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Metadata stažených log (ETag, Last-Modified, zdroj, čas stažení) pro
+podmíněné obnovování přes If-None-Match / If-Modified-Since
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from logo_store import state_path, write_atomic
+from logo_validate import LogoRejected, read_logo, to_png
+
+META_FILENAME = 'logos-meta.json'
+
+def default_meta_path(logos_dir):
+    """Soubor s metadaty leží v adresáři stavu (mimo public/)"""
+    return state_path(logos_dir, META_FILENAME)
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class LogoMetaStore:
+    """Jednoduché JSON úložiště metadat klíčované názvem souboru loga"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.rejects = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('logos', {})
+            self.rejects = data.get('rejects', {})
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, key, company_name, source_url, response):
+        """Uloží validátory z odpovědi úspěšného stažení"""
+        with self.lock:
+            self.entries[key] = {
+                'company': company_name,
+                'url': source_url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': now_iso(),
+            }
+
+    def reject(self, key, source_url, reason):
+        """Zaznamená odmítnutou odpověď zdroje i s důvodem"""
+        with self.lock:
+            self.rejects.setdefault(key, {})[source_url] = {
+                'reason': reason,
+                'at': now_iso(),
+            }
+
+    def touch(self, key):
+        """Zaznamená úspěšnou revalidaci (304) bez změny obsahu"""
+        with self.lock:
+            self.entries[key]['fetched_at'] = now_iso()
+
+    def save(self):
+        """Atomicky zapíše metadata na disk"""
+        with self.lock:
+            data = {'logos': self.entries, 'rejects': self.rejects}
+            write_atomic(self.path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+
+def conditional_headers(entry):
+    """Sestaví hlavičky podmíněného požadavku z uložených validátorů"""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def refresh_logo(client, store, blobs, key, min_size=500):
+    """Revaliduje uložené logo u původního zdroje.
+
+    Vrací 'not-modified', 'updated', 'unknown' (bez metadat) nebo 'failed'.
+    """
+    entry = store.get(key)
+    if not entry or not entry.get('url'):
+        return 'unknown'
+
+    try:
+        response = client.get(entry['url'], headers=conditional_headers(entry), stream=True)
+    except Exception:
+        return 'failed'
+
+    if response.status_code == 304:
+        response.close()
+        store.touch(key)
+        return 'not-modified'
+
+    try:
+        content = to_png(*read_logo(response, min_size))
+    except LogoRejected as e:
+        store.reject(key, entry['url'], e.reason)
+        return 'failed'
+    except Exception:
+        return 'failed'
+
+    blobs.put_and_publish(key, content)
+    store.record(key, entry.get('company'), entry['url'], response)
+    return 'updated'
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Odhad domén firem pro zdroje log - odstranění právní formy, seřazení
+kandidátů přes .cz/.sk/.com/.eu, souběžné DNS ověření a perzistentní cache
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from logo_metrics import NO_METRICS
+from logo_store import state_path, write_atomic
+
+DOMAINS_FILENAME = 'logos-domains.json'
+
+TLDS = ('cz', 'sk', 'com', 'eu')
+COUNTRY_WORDS = ('cz', 'sk', 'czech', 'slovakia')
+
+# Ověřené (DNS) kandidáty se znovu zkouší až po této době
+RESOLVED_TTL = 30 * 24 * 3600
+DNS_WORKERS = 32
+
+# Právní forma na konci názvu (po odstranění diakritiky, malými písmeny) - jen jako
+# samostatné slovo, jinak by "Atlas" přišel o "as" a "Zinc" o "inc"
+LEGAL_FORM_RE = re.compile(
+    r'(?:^|[\s,])(?:'
+    r'spol\.?\s*s\s*r\.?\s*o\.?|s\.?\s*r\.?\s*o\.?|a\.?\s*s\.?|k\.?\s*s\.?|v\.?\s*o\.?\s*s\.?|'
+    r'spol\.?|ltd\.?|gmbh|inc\.?|s\.?\s*p\.?\s*a\.?'
+    r')\s*$'
+)
+
+def default_domains_path(logos_dir):
+    """Cache domén leží v adresáři stavu (mimo public/)"""
+    return state_path(logos_dir, DOMAINS_FILENAME)
+
+def strip_legal_form(company_name):
+    """Název firmy bez diakritiky a bez právní formy ("EGE, spol. s r.o." -> "ege")"""
+    name = unicodedata.normalize('NFD', company_name.lower())
+    name = ''.join(c for c in name if unicodedata.category(c) != 'Mn')
+    return LEGAL_FORM_RE.sub('', name.strip(), count=1).strip(' ,.-')
+
+def domain_candidates(company_name, tlds=TLDS):
+    """Kandidátní domény seřazené od nejpravděpodobnější"""
+    base = strip_legal_form(company_name)
+    words = [w for w in re.split(r'[^a-z0-9]+', base) if w]
+    if not words:
+        return []
+
+    labels = [''.join(words)]
+    # "ATALIAN CZ", "ITMAN Czech" - doména bývá bez označení země
+    if len(words) > 1 and words[-1] in COUNTRY_WORDS:
+        labels.append(''.join(words[:-1]))
+    labels.append('-'.join(words))
+    if len(words) > 1 and len(words[0]) >= 3:
+        labels.append(words[0])
+    if len(words) >= 3:
+        labels.append(''.join(w[0] for w in words))
+
+    # Slovenské firmy ("ATALIAN SK") zkusit nejdřív na .sk
+    if 'sk' in words and 'sk' in tlds:
+        tlds = ('sk',) + tuple(t for t in tlds if t != 'sk')
+
+    candidates = []
+    for label in labels:
+        if len(label) < 2 or len(label) > 63 or label.startswith('-'):
+            continue
+        for tld in tlds:
+            domain = f"{label}.{tld}"
+            if domain not in candidates:
+                candidates.append(domain)
+    return candidates
+
+def ranked_domains(entry):
+    """Domény ze záznamu cache - potvrzená (ze které se logo stáhlo) první"""
+    confirmed = entry.get('confirmed')
+    resolved = [domain for domain in entry.get('resolved', []) if domain != confirmed]
+    return ([confirmed] if confirmed else []) + resolved
+
+def dns_resolves(hostname):
+    """Výchozí resolver - True, pokud má host DNS záznam"""
+    try:
+        socket.getaddrinfo(hostname, 443, proto=socket.IPPROTO_TCP)
+        return True
+    except (socket.gaierror, UnicodeError):
+        return False
+
+class DomainResolver:
+    """Převod název firmy -> živé domény s perzistentní cache.
+
+    `resolver` je volatelný objekt host -> bool, v testech lze podstrčit stub.
+    """
+
+    def __init__(self, path=None, resolver=dns_resolves, max_workers=DNS_WORKERS, metrics=NO_METRICS):
+        self.path = path
+        self.resolver = resolver
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('domains', {})
+
+    def domains_for(self, company_name):
+        """Živé domény firmy v pořadí priority (blokující, volat z vlákna)"""
+        with self.lock:
+            entry = dict(self.entries.get(company_name, {}))
+        if time.time() - entry.get('resolved_at', 0) < RESOLVED_TTL:
+            return ranked_domains(entry)
+
+        # Potvrzená doména se po TTL ověřuje znovu spolu s ostatními kandidáty
+        confirmed = entry.get('confirmed')
+        with self.metrics.stage('domain_guess'):
+            candidates = domain_candidates(company_name)
+            if confirmed and confirmed not in candidates:
+                candidates.insert(0, confirmed)
+        with self.metrics.stage('dns'):
+            alive = list(self.executor.map(self.resolver, candidates))
+        resolved = [domain for domain, ok in zip(candidates, alive) if ok]
+
+        entry = {'resolved': resolved, 'resolved_at': round(time.time())}
+        if confirmed in resolved:
+            entry['confirmed'] = confirmed
+        with self.lock:
+            self.entries[company_name] = entry
+        return ranked_domains(entry)
+
+    def confirm(self, company_name, domain):
+        """Zapamatuje si doménu, ze které se logo skutečně stáhlo - příště se zkusí první"""
+        with self.lock:
+            entry = self.entries.setdefault(company_name, {})
+            entry['confirmed'] = domain
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps({'domains': self.entries}, ensure_ascii=False, indent=2, sort_keys=True)
+        write_atomic(self.path, data.encode('utf-8'))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
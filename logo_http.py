@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Sdílená HTTP vrstva pro stahování log - keep-alive pooly spojení a
+token-bucket rate limiter pro každý host zvlášť
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Výchozí limity (požadavků za sekundu, velikost burstu) pro známé zdroje
+DEFAULT_RATE_LIMITS = {
+    "logo.clearbit.com": (5.0, 5),
+    "www.google.com": (5.0, 5),
+    "icons.duckduckgo.com": (5.0, 5),
+}
+
+# Limit pro hosty, které nejsou v tabulce (custom zdroje, weby firem)
+DEFAULT_HOST_RATE = (2.0, 2)
+
+# Počet hostů s udržovaným poolem a velikost poolu na jeden host
+POOL_HOSTS = 32
+POOL_SIZE = 16
+
+DEFAULT_TIMEOUT = 10
+
+class TokenBucket:
+    """Token bucket - `rate` tokenů za sekundu, maximálně `capacity` najednou"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Rezervuje token a vrátí, kolik sekund je potřeba počkat"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Blokuje, dokud není token k dispozici"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+class LogoHttpClient:
+    """HTTP klient se sdíleným poolem spojení a rate limitem pro každý host"""
+
+    def __init__(self, rate_limits=None, default_rate=DEFAULT_HOST_RATE,
+                 pool_hosts=POOL_HOSTS, pool_size=POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+        self.default_rate = default_rate
+        self.timeout = timeout
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+        # Jedna session = pool keep-alive spojení pro každý host zvlášť
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def bucket(self, host):
+        """Vrátí (případně vytvoří) token bucket pro daný host"""
+        with self.buckets_lock:
+            if host not in self.buckets:
+                rate, capacity = self.rate_limits.get(host, self.default_rate)
+                self.buckets[host] = TokenBucket(rate, capacity)
+            return self.buckets[host]
+
+    def get(self, url, **kwargs):
+        """GET s čekáním jen na rozpočet konkrétního hostu"""
+        self.bucket(urlsplit(url).hostname or "").acquire()
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Append-only journal stahování log (JSONL) - pokusy po zdrojích a výsledky
+po firmách, aby další běh zpracoval jen nové, změněné nebo zastaralé firmy
+a zdroje, které opakovaně selhávají, dočasně přeskakoval (exponenciální back-off).
+Při načtení a zavření se journal zkompaktuje na jeden záznam stavu na klíč.
+"""
+
+import json
+import os
+import threading
+import time
+
+from logo_store import open_atomic, state_path
+
+JOURNAL_FILENAME = 'logos-journal.jsonl'
+
+# Logo starší než tato doba se revaliduje u zdroje
+STALE_AFTER = 30 * 24 * 3600
+# Back-off po neúspěchu: BACKOFF_BASE * 2^(n-1), nejvýše BACKOFF_MAX
+BACKOFF_BASE = 3600
+BACKOFF_MAX = 7 * 24 * 3600
+# Výsledky revalidace existujícího loga, které nic neověřily - další pokus až po back-off
+REVALIDATE_FAILURES = ('unknown', 'failed')
+
+def default_journal_path(logos_dir):
+    """Journal leží v adresáři stavu (mimo public/), stejně jako metadata"""
+    return state_path(logos_dir, JOURNAL_FILENAME)
+
+def backoff_delay(failures):
+    if failures <= 0:
+        return 0
+    return min(BACKOFF_BASE * 2 ** (failures - 1), BACKOFF_MAX)
+
+class LogoJournal:
+    """Journal s přehrávaným stavem - zápisy jen připojuje na konec souboru"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # klíč -> {'success': ts, 'failures': n, 'last_failure': ts,
+        #          'stale_failures': n, 'last_stale': ts}
+        self.companies = {}
+        # (klíč, url) -> {'failures': n, 'last_failure': ts}
+        self.sources = {}
+        # Počet řádků v souboru - víc než záznamů stavu znamená, že je co kompaktovat
+        self.lines = 0
+        self._replay()
+        self._compact()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        """Obnoví stav z existujícího journalu, poškozený poslední řádek ignoruje"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.lines += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(record)
+
+    def _snapshot(self):
+        """Záznamy, jejichž přehrání obnoví současný stav"""
+        for key, company in self.companies.items():
+            yield {'type': 'company', 'key': key, **company}
+        for (key, url), source in self.sources.items():
+            # Zdroj bez neúspěchů se chová stejně jako neznámý
+            if source['failures']:
+                yield {'type': 'source', 'key': key, 'url': url, **source}
+
+    def _compact(self):
+        """Přepíše journal na snímek stavu (atomicky), pokud obsahuje přebytečné řádky"""
+        snapshot = list(self._snapshot())
+        if self.lines <= len(snapshot):
+            return
+        with open_atomic(self.path) as f:
+            for record in snapshot:
+                f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.lines = len(snapshot)
+
+    def _company(self, key):
+        return self.companies.setdefault(key, {'success': 0, 'failures': 0, 'last_failure': 0,
+                                               'stale_failures': 0, 'last_stale': 0})
+
+    def _apply(self, record):
+        key = record.get('key')
+        ts = record.get('ts', 0)
+        if record.get('type') == 'company':
+            self._company(key).update({field: record[field] for field in
+                                       ('success', 'failures', 'last_failure', 'stale_failures', 'last_stale')
+                                       if field in record})
+        elif record.get('type') == 'source':
+            self.sources[(key, record.get('url'))] = {'failures': record.get('failures', 0),
+                                                      'last_failure': record.get('last_failure', 0)}
+        elif record.get('type') == 'attempt':
+            source = self.sources.setdefault((key, record.get('url')), {'failures': 0, 'last_failure': 0})
+            if record.get('outcome') == 'hit':
+                source['failures'] = 0
+            else:
+                source['failures'] += 1
+                source['last_failure'] = ts
+        elif record.get('type') == 'result':
+            company = self._company(key)
+            if record.get('outcome') == 'missing':
+                company['failures'] += 1
+                company['last_failure'] = ts
+            elif record.get('outcome') in REVALIDATE_FAILURES:
+                company['stale_failures'] += 1
+                company['last_stale'] = ts
+            else:
+                company['success'] = ts
+                company['failures'] = 0
+                company['stale_failures'] = 0
+
+    def _append(self, record):
+        record['ts'] = round(time.time(), 3)
+        with self.lock:
+            self._apply(record)
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.file.flush()
+            self.lines += 1
+
+    def attempt(self, key, source, url, outcome, reason=None):
+        """Zaznamená pokus o stažení z jednoho zdroje ('hit', 'reject', 'error')"""
+        record = {'type': 'attempt', 'key': key, 'source': source, 'url': url, 'outcome': outcome}
+        if reason:
+            record['reason'] = reason
+        self._append(record)
+
+    def result(self, key, company_name, outcome):
+        """Zaznamená výsledek pro firmu ('downloaded', 'updated', 'not-modified', 'missing',
+        u revalidace existujícího loga také 'unknown' nebo 'failed')"""
+        self._append({'type': 'result', 'key': key, 'company': company_name, 'outcome': outcome})
+
+    def status(self, key, exists, now=None):
+        """Rozhodne, co s firmou v tomto běhu dělat.
+
+        Vrací 'fresh' (přeskočit), 'stale' (revalidovat), 'new', 'changed'
+        (logo zmizelo z disku), 'retry' nebo 'backoff' (zatím přeskočit -
+        u existujícího loga po revalidaci, která nic neověřila).
+        """
+        now = time.time() if now is None else now
+        company = self.companies.get(key)
+
+        if exists:
+            if company is None or not company['success']:
+                return 'fresh'  # Logo dodané ručně nebo staršími skripty
+            if now - company['success'] <= STALE_AFTER:
+                return 'fresh'
+            if now < company['last_stale'] + backoff_delay(company['stale_failures']):
+                return 'backoff'
+            return 'stale'
+
+        if company is None:
+            return 'new'
+        if company['success'] and company['success'] >= company['last_failure']:
+            return 'changed'
+        if now < company['last_failure'] + backoff_delay(company['failures']):
+            return 'backoff'
+        return 'retry'
+
+    def source_allowed(self, key, url, now=None):
+        """Zda zdroj pro danou firmu není v back-off po opakovaných neúspěších"""
+        now = time.time() if now is None else now
+        source = self.sources.get((key, url))
+        if source is None:
+            return True
+        return now >= source['last_failure'] + backoff_delay(source['failures'])
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+            self._compact()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
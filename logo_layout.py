@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rozložení adresáře s logy - zdrojové soubory, podadresáře variant a atlasu
+a parametry variant. Bez PIL a NumPy, aby ho mohly levně importovat
+i skripty, které obrázky nedekódují (manifest, CLI)
+"""
+
+import glob
+import os
+
+# Velikosti variant - 40 px marker a 80 px pro retina displeje
+VARIANT_SIZES = (40, 80)
+VARIANTS_DIRNAME = 'variants'
+ATLAS_DIRNAME = 'atlas'
+SOURCE_PATTERNS = ('*.png', '*.ico', '*.jpg', '*.jpeg')
+# Formáty variant a parametry kódování (sdílí normalize_logos.py i logo_server.py)
+VARIANT_FORMATS = {
+    'png': {'format': 'PNG', 'optimize': True},
+    'webp': {'format': 'WEBP', 'quality': 90, 'method': 6},
+}
+
+def logo_key(filename):
+    """Název loga v atlasu, balíku i manifestu - zdroj .ico/.jpg se po normalizaci publikuje jako .png"""
+    return os.path.splitext(os.path.basename(filename))[0] + '.png'
+
+def find_sources(logos_dir):
+    """Seznam zdrojových log v adresáři (bez vygenerovaných variant)"""
+    paths = set()
+    for pattern in SOURCE_PATTERNS:
+        paths.update(glob.glob(os.path.join(logos_dir, pattern)))
+    return sorted(paths)
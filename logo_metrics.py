@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Měření běhů logo skriptů - čas po fázích (odhad domén, DNS, spojení, přenos,
+validace, dekódování, zmenšení, kódování, zápis) pro každou firmu a zdroj,
+úspěšnost a bajty po zdrojích; export do JSONL a Prometheus textfile
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+
+from logo_store import default_state_dir, write_atomic
+
+METRICS_FILENAME = 'logos-metrics.jsonl'
+PROMETHEUS_FILENAME = 'logos_{script}.prom'
+METRICS_DIRNAME = 'metrics'
+
+# Záznam právě zpracovávané firmy - asyncio.to_thread kontext předává do vláken
+_current = contextvars.ContextVar('logo_metrics_company', default=None)
+
+def default_metrics_dir(logos_dir):
+    """Metriky leží v adresáři stavu mimo public/ - pro node-exporter zadat --metrics-dir
+    na jeho textfile adresář"""
+    return os.path.join(default_state_dir(logos_dir), METRICS_DIRNAME)
+
+class _Stage:
+    """Měření jedné fáze - třída místo @contextmanager kvůli režii"""
+
+    __slots__ = ('metrics', 'stage', 'source', 'start')
+
+    def __init__(self, metrics, stage, source):
+        self.metrics = metrics
+        self.stage = stage
+        self.source = source
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start, self.source)
+
+class _Company:
+    __slots__ = ('metrics', 'record', 'token', 'start')
+
+    def __init__(self, metrics, key, company_name):
+        self.metrics = metrics
+        self.record = {'key': key, 'company': company_name, 'outcome': None, 'stages': {}, 'sources': {}}
+
+    def __enter__(self):
+        self.token = _current.set(self.record)
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = round(time.perf_counter() - self.start, 6)
+        _current.reset(self.token)
+        self.metrics.finish(self.record)
+
+class RunMetrics:
+    """Sběr metrik jednoho běhu skriptu, bezpečný pro vlákna.
+
+    Čas fáze se přičte k celkovému součtu (fáze, zdroj) i k záznamu firmy,
+    jejíž `company()` blok je právě aktivní. Souběžní kandidáti jedné firmy
+    se sčítají, součet fází proto může být delší než čas firmy.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.lock = threading.Lock()
+        self.started = time.time()
+        # (fáze, zdroj) -> [počet, sekundy]
+        self.stages = {}
+        # zdroj -> {'hit': n, 'reject': n, 'error': n, 'bytes': n}
+        self.sources = {}
+        # výsledek -> počet firem
+        self.outcomes = {}
+        self.records = []
+
+    def stage(self, stage, source=None):
+        """Kontextový manažer, který změří dobu fáze"""
+        return _Stage(self, stage, source)
+
+    def company(self, key, company_name=None):
+        """Kontextový manažer pro zpracování jedné firmy, vrací její záznam"""
+        return _Company(self, key, company_name)
+
+    def add_time(self, stage, seconds, source=None):
+        record = _current.get()
+        with self.lock:
+            total = self.stages.setdefault((stage, source or ''), [0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+            if record is not None:
+                record['stages'][stage] = record['stages'].get(stage, 0.0) + seconds
+
+    def source_attempt(self, source, outcome, size=0):
+        """Zaznamená pokus o stažení ze zdroje ('hit', 'reject', 'error',
+        'cancelled' po výhře jiného kandidáta) a přijaté bajty"""
+        record = _current.get()
+        with self.lock:
+            counts = self.sources.setdefault(source, {'hit': 0, 'reject': 0, 'error': 0, 'bytes': 0})
+            counts[outcome] = counts.get(outcome, 0) + 1
+            counts['bytes'] += size
+            if record is not None:
+                record['sources'][source] = outcome
+
+    def outcome(self, outcome):
+        """Nastaví výsledek právě zpracovávané firmy"""
+        record = _current.get()
+        if record is not None:
+            record['outcome'] = outcome
+
+    def finish(self, record):
+        record['stages'] = {k: round(v, 6) for k, v in record['stages'].items()}
+        with self.lock:
+            self.records.append(record)
+            self.outcomes[record['outcome']] = self.outcomes.get(record['outcome'], 0) + 1
+
+    def hit_rates(self):
+        """Podíl úspěšných pokusů po zdrojích"""
+        with self.lock:
+            return {source: counts['hit'] / max(1, counts['hit'] + counts['reject'] + counts['error'])
+                    for source, counts in self.sources.items()}
+
+    def write_jsonl(self, path):
+        """Připojí záznamy firem a souhrn běhu jako JSON řádky"""
+        duration = time.time() - self.started
+        with self.lock:
+            lines = [json.dumps({'type': 'company', 'script': self.script, **record}, ensure_ascii=False)
+                     for record in self.records]
+            lines.append(json.dumps({
+                'type': 'run',
+                'script': self.script,
+                'started': round(self.started, 3),
+                'seconds': round(duration, 3),
+                'outcomes': self.outcomes,
+                'stages': {f"{stage}:{source}" if source else stage: {'count': count, 'seconds': round(seconds, 6)}
+                           for (stage, source), (count, seconds) in sorted(self.stages.items())},
+                'sources': self.sources,
+            }, ensure_ascii=False))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def prometheus_text(self):
+        """Metriky ve formátu Prometheus text exposition"""
+        script = self.script
+        lines = [
+            '# HELP logos_stage_seconds_total Celkový čas strávený ve fázi zpracování log.',
+            '# TYPE logos_stage_seconds_total counter',
+        ]
+        with self.lock:
+            stages = sorted(self.stages.items())
+            sources = sorted(self.sources.items())
+            outcomes = sorted(self.outcomes.items(), key=lambda item: str(item[0]))
+        for (stage, source), (_, seconds) in stages:
+            lines.append(f'logos_stage_seconds_total{{script="{script}",stage="{stage}",source="{source}"}} {seconds:.6f}')
+        lines += ['# HELP logos_stage_calls_total Počet měření fáze zpracování log.',
+                  '# TYPE logos_stage_calls_total counter']
+        for (stage, source), (count, _) in stages:
+            lines.append(f'logos_stage_calls_total{{script="{script}",stage="{stage}",source="{source}"}} {count}')
+        lines += ['# HELP logos_source_attempts_total Pokusy o stažení loga podle zdroje a výsledku.',
+                  '# TYPE logos_source_attempts_total counter']
+        for source, counts in sources:
+            for outcome in ('hit', 'reject', 'error'):
+                lines.append(f'logos_source_attempts_total{{script="{script}",source="{source}",outcome="{outcome}"}} {counts.get(outcome, 0)}')
+        lines += ['# HELP logos_source_bytes_total Bajty přijatých log podle zdroje.',
+                  '# TYPE logos_source_bytes_total counter']
+        for source, counts in sources:
+            lines.append(f'logos_source_bytes_total{{script="{script}",source="{source}"}} {counts["bytes"]}')
+        lines += ['# HELP logos_companies Počet zpracovaných firem podle výsledku.',
+                  '# TYPE logos_companies gauge']
+        for outcome, count in outcomes:
+            lines.append(f'logos_companies{{script="{script}",outcome="{outcome}"}} {count}')
+        lines += ['# HELP logos_run_duration_seconds Doba posledního běhu skriptu.',
+                  '# TYPE logos_run_duration_seconds gauge',
+                  f'logos_run_duration_seconds{{script="{script}"}} {time.time() - self.started:.3f}',
+                  '# HELP logos_run_timestamp_seconds Čas dokončení posledního běhu skriptu.',
+                  '# TYPE logos_run_timestamp_seconds gauge',
+                  f'logos_run_timestamp_seconds{{script="{script}"}} {time.time():.0f}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Zapíše textfile pro node exporter (atomicky, aby nečetl rozepsaný soubor)"""
+        write_atomic(path, self.prometheus_text().encode('utf-8'))
+
+    def export(self, directory):
+        """Zapíše JSONL i Prometheus soubor do adresáře, vrací jejich cesty"""
+        os.makedirs(directory, exist_ok=True)
+        jsonl_path = os.path.join(directory, METRICS_FILENAME)
+        prom_path = os.path.join(directory, PROMETHEUS_FILENAME.format(script=self.script))
+        self.write_jsonl(jsonl_path)
+        self.write_prometheus(prom_path)
+        return jsonl_path, prom_path
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+class NullMetrics:
+    """Metriky vypnuté - stejné rozhraní jako RunMetrics, nic neměří"""
+
+    _stage = _NoStage()
+
+    def stage(self, stage, source=None):
+        return self._stage
+
+    def company(self, key, company_name=None):
+        return self._stage
+
+    def add_time(self, stage, seconds, source=None):
+        pass
+
+    def source_attempt(self, source, outcome, size=0):
+        pass
+
+    def outcome(self, outcome):
+        pass
+
+NO_METRICS = NullMetrics()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Společné generování názvů souborů log z názvu firmy (JavaScript styl) -
+jediná implementace pro všechny skripty a golden vektory pro route.ts
+"""
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+from logo_store import write_atomic
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo-names.golden.json')
+GOLDEN_VERSION = 1
+
+NAME_CACHE_SIZE = 65536
+
+# Názvy, na kterých se jednotlivé implementace v minulosti rozcházely
+GOLDEN_EXTRA = [
+    "EGE, spol. s r.o.",
+    "ČKD Blansko Holding, a.s.",
+    "Dopravní podnik města České Budějovice, a.s.",
+    "ABS Jets, a.s.",
+    "Łódź Logistics Sp. z o.o.",
+    "Straße & Söhne GmbH",
+    "Øresund Æble ApS",
+    "İstanbul Holding A.Ş.",
+    "ΑΒΓ Σύστημα ΟΣ",
+    "Москва-Сити ООО",
+    "東京電力 株式会社",
+    "Café ① № 7 ½",
+    "Firma 🚀 s.r.o.",
+    "  __Mezery  a---pomlčky__  ",
+    "ÅNGSTRÖM ﬁnance",
+    "ǅemal d.o.o.",
+    "",
+    "!!!",
+]
+
+class _TranslateTable(dict):
+    """Tabulka pro str.translate doplňovaná za běhu - každý znak se klasifikuje jen jednou.
+
+    Diakritická znaménka (Mn) se mažou, písmena a číslice (isalnum) zůstávají,
+    vše ostatní se mění na '_'.
+    """
+
+    def __missing__(self, code):
+        char = chr(code)
+        if unicodedata.category(char) == 'Mn':
+            value = None
+        elif char.isalnum():
+            value = char
+        else:
+            value = '_'
+        self[code] = value
+        return value
+
+_TABLE = _TranslateTable()
+for _code in range(0x250):  # ASCII a latinka předem
+    _TABLE[_code]
+del _code
+
+_UNDERSCORES_RE = re.compile(r'_+')
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def sanitize_filename_js_style(company_name):
+    """JavaScript styl generování názvů souborů ("EGE, spol. s r.o." -> "ege_spol_s_r_o.png")"""
+    filename = unicodedata.normalize('NFD', company_name.lower()).translate(_TABLE)
+    filename = _UNDERSCORES_RE.sub('_', filename).strip('_')
+    return filename + '.png'
+
+def golden_vectors(names):
+    """Dvojice vstup -> název souboru pro kontrolu TypeScript implementace"""
+    vectors = []
+    seen = set()
+    for name in names:
+        if name in seen:
+            continue
+        seen.add(name)
+        vectors.append({'input': name, 'filename': sanitize_filename_js_style(name)})
+    return vectors
+
+def write_golden(names, path=GOLDEN_PATH):
+    data = json.dumps({'version': GOLDEN_VERSION, 'vectors': golden_vectors(names)},
+                      ensure_ascii=False, indent=2)
+    write_atomic(path, (data + '\n').encode('utf-8'))
+
+def load_golden(path=GOLDEN_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['vectors']
+
+def main():
+    """Vygeneruje golden vektory z ERP feedu a známých problémových názvů"""
+    from erp_customers import DEFAULT_SOURCE, iter_customer_names
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='URL nebo JSON soubor s projekty z ERP')
+    parser.add_argument('--output', default=GOLDEN_PATH,
+                        help='cílový JSON soubor s golden vektory')
+    args = parser.parse_args()
+
+    names = list(iter_customer_names(args.source)) + GOLDEN_EXTRA
+    write_golden(names, args.output)
+    print(f"✅ Golden vektory ({len(set(names))}) zapsány do {args.output}")
+
+if __name__ == "__main__":
+    main()
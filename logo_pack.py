@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Skript pro zabalení normalizovaných log do jednoho binárního souboru
+(hlavička, tabulka offsetů seřazená podle hashe názvu, bloby RGBA nebo PNG)
+a čtečka, která balík mapuje přes mmap a vrací loga bez kopírování
+"""
+
+import argparse
+import hashlib
+import io
+import mmap
+import os
+import struct
+
+import numpy as np
+from PIL import Image
+
+from logo_layout import VARIANTS_DIRNAME, find_sources, logo_key
+from logo_names import sanitize_filename_js_style
+from logo_store import DEFAULT_LOGOS_DIR, open_atomic
+from normalize_logos import normalize_logo
+
+PACK_MAGIC = b'LOGOPACK'
+PACK_VERSION = 1
+PACK_FILENAME = 'logos-{size}.pack'
+PACK_SIZE = 80
+
+# Druhy blobů
+KIND_RGBA = 0
+KIND_PNG = 1
+
+# Hlavička: magic, verze, velikost loga, počet log, offset tabulky, offset názvů
+HEADER = struct.Struct('<8sHHIQQ')
+# Záznam tabulky: hash názvu, offset a délka blobu, offset a délka názvu, šířka, výška, druh
+ENTRY = struct.Struct('<QQIIHHHBx')
+ENTRY_DTYPE = np.dtype([
+    ('hash', '<u8'), ('offset', '<u8'), ('length', '<u4'), ('name_offset', '<u4'),
+    ('name_length', '<u2'), ('width', '<u2'), ('height', '<u2'), ('kind', 'u1'), ('pad', 'u1'),
+])
+# Bloby zarovnané na 16 bajtů, aby NumPy pohledy byly zarovnané
+ALIGN = 16
+
+assert ENTRY.size == ENTRY_DTYPE.itemsize == 32
+
+def name_hash(filename):
+    """Stabilní 64bitový hash názvu souboru (stejný v zapisovači i čtečce)"""
+    return int.from_bytes(hashlib.blake2b(filename.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def encode_logo(image, kind):
+    """Vrátí (bajty blobu, šířka, výška) pro daný druh"""
+    if kind == KIND_RGBA:
+        return image.tobytes(), image.size[0], image.size[1]
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue(), image.size[0], image.size[1]
+
+def write_pack(path, logos, size=PACK_SIZE, kind=KIND_RGBA):
+    """Zapíše balík atomicky, bloby se streamují - v paměti zůstává jen tabulka.
+
+    `logos` je iterovatelná dvojic (název souboru, obrázek RGBA). Tabulka a
+    názvy leží za bloby, offset tabulky se doplní do hlavičky na konci.
+    Vrací počet zabalených log.
+    """
+    entries = []
+    with open_atomic(path) as f:
+        f.write(bytes(HEADER.size))
+        offset = HEADER.size
+        for filename, image in logos:
+            data, width, height = encode_logo(image, kind)
+            padding = -offset % ALIGN
+            f.write(bytes(padding))
+            offset += padding
+            f.write(data)
+            entries.append((name_hash(filename), filename, offset, len(data), width, height))
+            offset += len(data)
+
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        names = b''.join(entry[1].encode('utf-8') for entry in entries)
+        names_offset = offset
+        f.write(names)
+        offset += len(names)
+
+        padding = -offset % ALIGN
+        f.write(bytes(padding))
+        table_offset = offset + padding
+        name_offset = 0
+        for digest, filename, blob_offset, length, width, height in entries:
+            encoded = filename.encode('utf-8')
+            f.write(ENTRY.pack(digest, blob_offset, length, name_offset, len(encoded), width, height, kind))
+            name_offset += len(encoded)
+
+        f.seek(0)
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, size, len(entries), table_offset, names_offset))
+    return len(entries)
+
+def iter_normalized(logos_dir, size=PACK_SIZE):
+    """Projde zdrojová loga a vrací (název souboru, normalizované logo v dané velikosti)"""
+    for path in find_sources(logos_dir):
+        filename = logo_key(path)
+        try:
+            image = normalize_logo(path).resize((size, size), Image.LANCZOS)
+        except Exception as e:
+            print(f"❌ {os.path.basename(path)}: {e}")
+            continue
+        yield filename, image
+
+def default_pack_path(logos_dir, size=PACK_SIZE):
+    return os.path.join(logos_dir, VARIANTS_DIRNAME, PACK_FILENAME.format(size=size))
+
+class LogoPack:
+    """Čtečka balíku log nad mmap - vyhledání binárním půlením tabulky podle hashe.
+
+    Vrácené memoryview a NumPy pohledy ukazují přímo do mapované paměti;
+    dokud existují, nelze balík zavřít (mmap vyhodí BufferError).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.size, count, table_offset, names_offset = HEADER.unpack_from(self.mm, 0)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} není balík log")
+            if version != PACK_VERSION:
+                raise ValueError(f"Nepodporovaná verze balíku log: {version}")
+            self.table = np.frombuffer(self.mm, dtype=ENTRY_DTYPE, count=count, offset=table_offset)
+        except BaseException:
+            self.mm.close()
+            raise
+        self.hashes = self.table['hash']
+        self.names_offset = names_offset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Pohledy NumPy drží buffer mmapu, uvolnit je před zavřením
+        self.table = self.hashes = None
+        self.mm.close()
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, company_name):
+        return self.find(sanitize_filename_js_style(company_name)) >= 0
+
+    def entry_name(self, index):
+        entry = self.table[index]
+        start = self.names_offset + int(entry['name_offset'])
+        return self.mm[start:start + int(entry['name_length'])].decode('utf-8')
+
+    def filenames(self):
+        """Názvy souborů v pořadí tabulky"""
+        return [self.entry_name(index) for index in range(len(self.table))]
+
+    def find(self, filename):
+        """Index záznamu podle názvu souboru, nebo -1"""
+        digest = np.uint64(name_hash(filename))
+        index = int(np.searchsorted(self.hashes, digest))
+        # Kolize hashů jsou vedle sebe, rozhodne název
+        while index < len(self.hashes) and self.hashes[index] == digest:
+            if self.entry_name(index) == filename:
+                return index
+            index += 1
+        return -1
+
+    def blob_at(self, index):
+        entry = self.table[index]
+        start = int(entry['offset'])
+        return memoryview(self.mm)[start:start + int(entry['length'])]
+
+    def blob(self, filename):
+        """Blob loga podle názvu souboru jako memoryview bez kopírování, nebo None"""
+        index = self.find(filename)
+        return self.blob_at(index) if index >= 0 else None
+
+    def get(self, company_name):
+        """Blob loga podle názvu firmy (RGBA nebo PNG podle druhu balíku), nebo None"""
+        return self.blob(sanitize_filename_js_style(company_name))
+
+    def array_at(self, index):
+        entry = self.table[index]
+        if entry['kind'] != KIND_RGBA:
+            raise ValueError("NumPy pohled je jen pro balík s RGBA bloby")
+        height, width = int(entry['height']), int(entry['width'])
+        return np.frombuffer(self.mm, dtype=np.uint8, count=height * width * 4,
+                             offset=int(entry['offset'])).reshape(height, width, 4)
+
+    def array(self, company_name):
+        """Logo firmy jako NumPy pohled (výška, šířka, 4) jen pro čtení, nebo None"""
+        index = self.find(sanitize_filename_js_style(company_name))
+        return self.array_at(index) if index >= 0 else None
+
+    def image_at(self, index):
+        """Logo jako PIL obrázek RGBA (kopie, PNG se dekóduje)"""
+        entry = self.table[index]
+        if entry['kind'] == KIND_RGBA:
+            return Image.frombytes('RGBA', (int(entry['width']), int(entry['height'])), self.blob_at(index))
+        with Image.open(io.BytesIO(self.blob_at(index))) as image:
+            return image.convert('RGBA')
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=PACK_SIZE,
+                        help='velikost log v balíku v px')
+    parser.add_argument('--png', action='store_true',
+                        help='ukládat PNG místo surových RGBA dat (menší, ale bez NumPy pohledů)')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    logos_dir = args.logos_dir
+    pack_path = default_pack_path(logos_dir, args.size)
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+
+    print(f"📦 Balím normalizovaná loga ({args.size} px, {'PNG' if args.png else 'RGBA'})...")
+
+    count = write_pack(pack_path, iter_normalized(logos_dir, args.size), args.size,
+                       KIND_PNG if args.png else KIND_RGBA)
+
+    print(f"✅ Zabaleno {count} log ({os.path.getsize(pack_path) / 1024:.1f} kB)")
+    print(f"📁 Balík uložen v: {pack_path}")
+
+if __name__ == "__main__":
+    main()
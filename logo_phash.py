@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Perceptuální hashe log (aHash/dHash) - detekce generických placeholderů
+(favicony parkovaných domén apod.) a sloučení téměř shodných log
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import numpy as np
+from PIL import Image
+
+from logo_layout import find_sources
+from logo_render import is_initials_logo
+from logo_store import DEFAULT_LOGOS_DIR, LogoStore, state_path, write_atomic
+
+# Společná mřížka, ze které se průměrem bloků počítá 8x8 (aHash) i 9x8 (dHash)
+GRID_SIZE = (72, 32)
+HASHES_FILENAME = 'logos-phash.json'
+
+PLACEHOLDERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logo-placeholders.json')
+
+# Maximální Hammingova vzdálenost (z 64 bitů) pro "stejný obrázek"
+PLACEHOLDER_DISTANCE = 6
+DUPLICATE_DISTANCE = 2
+
+def to_gray(image):
+    """Obrázek -> šedotónové pole GRID_SIZE (průhlednost složená na bílé pozadí)"""
+    la = np.asarray(image.convert('LA').resize(GRID_SIZE, Image.BOX), dtype=np.float32)
+    alpha = la[:, :, 1] / 255.0
+    return la[:, :, 0] * alpha + 255.0 * (1.0 - alpha)
+
+def load_grays(sources):
+    """Načte obrázky (cesty nebo bajty) do jednoho pole (N, 32, 72).
+
+    Vrací (pole, příznaky vygenerovaných log s iniciálami, indexy úspěšně
+    načtených zdrojů).
+    """
+    grays = []
+    generated = []
+    loaded = []
+    for i, source in enumerate(sources):
+        try:
+            with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+                grays.append(to_gray(image))
+                generated.append(bool(is_initials_logo(np.asarray(image.convert('RGBA'))[None])[0]))
+            loaded.append(i)
+        except Exception:
+            continue
+    if not loaded:
+        return np.empty((0, GRID_SIZE[1], GRID_SIZE[0]), np.float32), np.zeros(0, bool), loaded
+    return np.stack(grays), np.array(generated), loaded
+
+def block_mean(grays, rows, cols):
+    """Zmenšení celé dávky průměrem bloků: (N, 32, 72) -> (N, rows, cols)"""
+    n, height, width = grays.shape
+    return grays.reshape(n, rows, height // rows, cols, width // cols).mean(axis=(2, 4))
+
+def pack_bits(bits):
+    """(N, 8, 8) bool -> (N,) uint64"""
+    return np.packbits(bits.reshape(len(bits), 64), axis=1).view('>u8').ravel().astype(np.uint64)
+
+def average_hashes(grays):
+    """aHash pro celou dávku najednou"""
+    pixels = block_mean(grays, 8, 8)
+    return pack_bits(pixels > pixels.mean(axis=(1, 2), keepdims=True))
+
+def difference_hashes(grays):
+    """dHash pro celou dávku najednou"""
+    pixels = block_mean(grays, 8, 9)
+    return pack_bits(pixels[:, :, 1:] > pixels[:, :, :-1])
+
+def hash_sources(sources):
+    """Spočítá (aHash, dHash, vygenerováno) pro všechny zdroje, vrací pole a indexy načtených"""
+    grays, generated, loaded = load_grays(sources)
+    return average_hashes(grays), difference_hashes(grays), generated, loaded
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def hamming(a, b):
+    """Hammingovy vzdálenosti mezi poli uint64 (s broadcastingem)"""
+    x = np.bitwise_xor(a, b)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    return _POPCOUNT[np.ascontiguousarray(x)[..., None].view(np.uint8)].sum(axis=-1)
+
+class HashCache:
+    """Cache hashů podle SHA-256 obsahu - audit dekóduje jen nová loga"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('hashes', {})
+
+    def hash_paths(self, paths):
+        """(aHash, dHash, vygenerováno, indexy načtených) pro soubory, z cache kde to jde"""
+        digests = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                digests.append(hashlib.sha256(f.read()).hexdigest())
+
+        # Záznamy ze starší verze cache nemají příznak vygenerovaného loga
+        missing = [i for i, digest in enumerate(digests) if len(self.entries.get(digest, ())) != 3]
+        ahashes, dhashes, generated, loaded = hash_sources([paths[i] for i in missing])
+        for k, a, d, g in zip(loaded, ahashes, dhashes, generated):
+            self.entries[digests[missing[k]]] = [f"{int(a):016x}", f"{int(d):016x}", bool(g)]
+
+        loaded = [i for i, digest in enumerate(digests) if len(self.entries.get(digest, ())) == 3]
+        entries = [self.entries[digests[i]] for i in loaded]
+        return (np.array([int(a, 16) for a, _, _ in entries], dtype=np.uint64),
+                np.array([int(d, 16) for _, d, _ in entries], dtype=np.uint64),
+                np.array([g for _, _, g in entries], dtype=bool),
+                loaded)
+
+    def save(self):
+        if not self.path:
+            return
+        data = json.dumps({'hashes': self.entries}, sort_keys=True)
+        write_atomic(self.path, data.encode('utf-8'))
+
+def load_placeholders(path=PLACEHOLDERS_PATH):
+    """Blocklist známých placeholderů: [{name, ahash, dhash}]"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('placeholders', [])
+
+def save_placeholders(placeholders, path=PLACEHOLDERS_PATH):
+    data = json.dumps({'placeholders': placeholders}, ensure_ascii=False, indent=2)
+    write_atomic(path, (data + '\n').encode('utf-8'))
+
+def placeholder_entry(name, source):
+    """Záznam blocklistu {name, ahash, dhash} z cesty nebo obsahu obrázku, nebo None"""
+    ahashes, dhashes, _, loaded = hash_sources([source])
+    if not loaded:
+        return None
+    return {'name': name, 'ahash': f"{int(ahashes[0]):016x}", 'dhash': f"{int(dhashes[0]):016x}"}
+
+def add_placeholders(entries, path=PLACEHOLDERS_PATH):
+    """Přidá (nebo nahradí stejnojmenné) záznamy do blocklistu"""
+    names = {entry['name'] for entry in entries}
+    save_placeholders([p for p in load_placeholders(path) if p['name'] not in names] + list(entries), path)
+
+class PlaceholderDetector:
+    """Kontrola stahovaných log proti blocklistu placeholderů"""
+
+    def __init__(self, placeholders=None, max_distance=PLACEHOLDER_DISTANCE):
+        placeholders = load_placeholders() if placeholders is None else placeholders
+        self.names = [p['name'] for p in placeholders]
+        self.ahashes = np.array([int(p['ahash'], 16) for p in placeholders], dtype=np.uint64)
+        self.dhashes = np.array([int(p['dhash'], 16) for p in placeholders], dtype=np.uint64)
+        self.max_distance = max_distance
+
+    def extend(self, entries):
+        """Doplní placeholdery zjištěné za běhu (např. sondou zdrojů) k blocklistu"""
+        entries = [entry for entry in entries if entry['name'] not in self.names]
+        if not entries:
+            return
+        self.names += [entry['name'] for entry in entries]
+        self.ahashes = np.concatenate([self.ahashes, [np.uint64(int(e['ahash'], 16)) for e in entries]])
+        self.dhashes = np.concatenate([self.dhashes, [np.uint64(int(e['dhash'], 16)) for e in entries]])
+
+    def match(self, ahashes, dhashes):
+        """Pro každý hash vrátí název nejbližšího placeholderu nebo None"""
+        if not self.names or not len(ahashes):
+            return [None] * len(ahashes)
+        distance = np.maximum(hamming(ahashes[:, None], self.ahashes[None, :]),
+                              hamming(dhashes[:, None], self.dhashes[None, :]))
+        best = distance.argmin(axis=1)
+        return [self.names[j] if distance[i, j] <= self.max_distance else None
+                for i, j in enumerate(best)]
+
+    def check(self, data):
+        """Název placeholderu, kterému obsah odpovídá, jinak None (i pro SVG)"""
+        if not self.names:
+            return None
+        ahashes, dhashes, _, loaded = hash_sources([data])
+        if not loaded:
+            return None
+        return self.match(ahashes, dhashes)[0]
+
+def duplicate_groups(ahashes, dhashes, order=None, max_distance=DUPLICATE_DISTANCE, block=1024):
+    """Skupiny indexů téměř shodných obrázků, první index skupiny je kanonický.
+
+    Kanonická loga se vybírají v pořadí `order` (výchozí pořadí indexů) a do
+    skupiny patří jen loga blízká přímo kanonickému - bez tranzitivního
+    řetězení A~B~C, které spojí i loga, jež si podobná nejsou. Matice
+    vzdáleností se počítá po blocích řádků (kvůli paměti).
+    """
+    count = len(ahashes)
+    if count < 2:
+        return []
+    neighbours = []
+    for start in range(0, count, block):
+        rows = slice(start, min(start + block, count))
+        distance = np.maximum(hamming(ahashes[rows, None], ahashes[None, :]),
+                              hamming(dhashes[rows, None], dhashes[None, :]))
+        neighbours.extend(np.flatnonzero(row) for row in distance <= max_distance)
+
+    assigned = np.zeros(count, dtype=bool)
+    groups = []
+    for canonical in (range(count) if order is None else order):
+        if assigned[canonical]:
+            continue
+        members = neighbours[canonical][~assigned[neighbours[canonical]]]
+        assigned[members] = True
+        if len(members) > 1:
+            groups.append([canonical] + [int(i) for i in members if i != canonical])
+    return groups
+
+def find_duplicates(paths, ahashes, dhashes, generated):
+    """Skupiny duplicit mezi staženými logy (indexy do `paths`, kanonické první).
+
+    Vygenerovaná loga s iniciálami se neporovnávají - liší se jen pár pixely
+    textu a hash by z nich udělal jednu skupinu. Kanonická verze je největší
+    soubor (obvykle nejvyšší rozlišení).
+    """
+    candidates = np.flatnonzero(~generated)
+    order = sorted(range(len(candidates)), reverse=True,
+                   key=lambda k: (os.path.getsize(paths[candidates[k]]), os.path.basename(paths[candidates[k]])))
+    groups = duplicate_groups(ahashes[candidates], dhashes[candidates], order)
+    return [[int(candidates[k]) for k in group] for group in groups]
+
+def audit(logos_dir, collapse=False, purge=False):
+    """Najde placeholdery a téměř shodná loga, volitelně je odpublikuje nebo sloučí"""
+    paths = find_sources(logos_dir)
+    cache = HashCache(state_path(logos_dir, HASHES_FILENAME))
+    ahashes, dhashes, generated, loaded = cache.hash_paths(paths)
+    cache.save()
+    paths = [paths[i] for i in loaded]
+    names = [os.path.basename(p) for p in paths]
+    print(f"🔎 Audit {len(paths)} log v {logos_dir}")
+
+    blobs = LogoStore(logos_dir)
+
+    placeholders = PlaceholderDetector().match(ahashes, dhashes)
+    for name, placeholder in zip(names, placeholders):
+        if placeholder:
+            print(f"🚫 {name} - placeholder ({placeholder})")
+            if purge:
+                blobs.unpublish(name)
+
+    groups = find_duplicates(paths, ahashes, dhashes, generated)
+    for group in groups:
+        canonical = group[0]
+        print(f"👯 {', '.join(names[i] for i in group)} -> {names[canonical]}")
+        if collapse:
+            with open(paths[canonical], 'rb') as f:
+                digest = blobs.put(f.read())
+            for i in group:
+                blobs.publish(names[i], digest)
+
+    if collapse or purge:
+        blobs.gc()
+
+    print(f"\n📊 Placeholderů: {sum(1 for p in placeholders if p)}, skupin duplicit: {len(groups)} "
+          f"(vygenerovaných log s iniciálami vynecháno: {int(generated.sum())})")
+
+def main():
+    """Audit adresáře s logy"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--collapse', action='store_true',
+                        help='téměř shodná loga publikovat jako jeden blob')
+    parser.add_argument('--purge', action='store_true',
+                        help='odpublikovat loga, která jsou placeholdery')
+    parser.add_argument('--add-placeholder', nargs=2, metavar=('NAZEV', 'SOUBOR'),
+                        help='přidat obrázek do blocklistu placeholderů')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    if args.add_placeholder:
+        name, path = args.add_placeholder
+        entry = placeholder_entry(name, path)
+        if entry is None:
+            print(f"❌ Nelze načíst obrázek: {path}")
+            return
+        add_placeholders([entry])
+        print(f"✅ Placeholder {name} přidán do {PLACEHOLDERS_PATH}")
+        return
+
+    audit(args.logos_dir, collapse=args.collapse, purge=args.purge)
+
+if __name__ == "__main__":
+    main()
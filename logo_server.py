@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Lokální HTTP služba pro loga v libovolné velikosti - /logos/<název>?w=&fmt=
+zmenší logo na požádání, výsledky drží v LRU cache omezené bajty
+s přelitím na disk, souběžné požadavky na stejnou variantu vykreslí jednou
+"""
+
+import argparse
+import hashlib
+import http.server
+import io
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from PIL import Image
+
+from create_fixed_logos import render_default_logo
+from logo_layout import VARIANT_FORMATS
+from logo_names import sanitize_filename_js_style
+from logo_render import get_initials
+from logo_store import DEFAULT_LOGOS_DIR, state_path, write_atomic
+from normalize_logos import normalize_logo
+
+# Součást ETagu i klíče cache - zvýšit při změně vykreslování, aby klienti nedrželi staré varianty
+RENDER_VERSION = 1
+# Filtr pro zmenšení - patří do otisku vykreslování stejně jako parametry kodéru
+RESAMPLE = Image.LANCZOS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+DEFAULT_WIDTH = 80
+MIN_WIDTH = 8
+MAX_WIDTH = 512
+
+CACHE_BYTES = 64 * 1024 * 1024
+SPILL_BYTES = 512 * 1024 * 1024
+SPILL_DIRNAME = 'logos-resize-cache'
+# Počet dekódovaných zdrojových log držených v paměti
+SOURCE_CACHE_SIZE = 256
+
+CONTENT_TYPES = {'png': 'image/png', 'webp': 'image/webp'}
+
+# URL s ?v=<hash zdroje> se nikdy nemění; bez verze jen krátká cache a revalidace přes ETag
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=300'
+
+def render_fingerprint():
+    """Otisk verze vykreslování a parametrů kodéru (VARIANT_FORMATS, filtr zmenšení).
+
+    Přelitá cache přežívá restart - bez otisku v klíči by se po změně kodéru
+    dál servírovaly varianty vykreslené starým nastavením.
+    """
+    settings = json.dumps([RENDER_VERSION, int(RESAMPLE), VARIANT_FORMATS], sort_keys=True)
+    return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:8]
+
+RENDER_FINGERPRINT = render_fingerprint()
+
+def default_spill_dir(logos_dir):
+    """Přelitá cache leží v adresáři stavu mimo public/ (Next.js ji nesmí servírovat)"""
+    return state_path(logos_dir, SPILL_DIRNAME)
+
+class ByteLRU:
+    """LRU cache bajtových hodnot omezená součtem velikostí.
+
+    Vytlačené položky se zapíšou do `spill_dir` (také omezeného velikostí,
+    nejstarší soubory se mažou) a při dalším přístupu se vrátí do paměti.
+    Klíče musí být použitelné jako názvy souborů. Je-li zadán `prefix`,
+    přelité soubory bez něj (z jiné verze vykreslování) se při startu smažou.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES, spill_dir=None, spill_max_bytes=SPILL_BYTES, prefix=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+        self.bytes = 0
+        # klíč -> velikost souboru, od nejstaršího
+        self.spilled = OrderedDict()
+        self.spilled_bytes = 0
+        self.stats = {'hits': 0, 'spill_hits': 0, 'misses': 0, 'evictions': 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            entries = [entry for entry in os.scandir(spill_dir)
+                       if entry.is_file() and not entry.name.startswith('.tmp-')]
+            if prefix:
+                for entry in [entry for entry in entries if not entry.name.startswith(prefix)]:
+                    os.remove(entry.path)
+                    entries.remove(entry)
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+                self.spilled[entry.name] = entry.stat().st_size
+                self.spilled_bytes += entry.stat().st_size
+
+    def get(self, key):
+        with self.lock:
+            data = self.items.get(key)
+            if data is not None:
+                self.items.move_to_end(key)
+                self.stats['hits'] += 1
+                return data
+            spilled = key in self.spilled
+        if spilled:
+            try:
+                with open(os.path.join(self.spill_dir, key), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self.lock:
+                    self.stats['spill_hits'] += 1
+                self.put(key, data)
+                return data
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return
+            self.items[key] = data
+            self.bytes += len(data)
+            evicted = []
+            while self.bytes > self.max_bytes:
+                old_key, old_data = self.items.popitem(last=False)
+                self.bytes -= len(old_data)
+                self.stats['evictions'] += 1
+                if old_key not in self.spilled:
+                    evicted.append((old_key, old_data))
+        # Zápis na disk mimo zámek
+        for old_key, old_data in evicted:
+            self.spill(old_key, old_data)
+
+    def spill(self, key, data):
+        if not self.spill_dir:
+            return
+        write_atomic(os.path.join(self.spill_dir, key), data)
+        with self.lock:
+            if key in self.spilled:
+                return
+            self.spilled[key] = len(data)
+            self.spilled_bytes += len(data)
+            removed = []
+            while self.spilled_bytes > self.spill_max_bytes and self.spilled:
+                old_key, size = self.spilled.popitem(last=False)
+                self.spilled_bytes -= size
+                removed.append(old_key)
+        for old_key in removed:
+            try:
+                os.remove(os.path.join(self.spill_dir, old_key))
+            except OSError:
+                pass
+
+    def snapshot(self):
+        with self.lock:
+            return {**self.stats, 'items': len(self.items), 'bytes': self.bytes,
+                    'spilled': len(self.spilled), 'spilled_bytes': self.spilled_bytes}
+
+class SingleFlight:
+    """Souběžná volání se stejným klíčem čekají na jeden výpočet"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """Vrátí (výsledek, sdílený) - sdílený je True, když výsledek spočítal jiný požadavek"""
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result(), False
+
+class LogoResizer:
+    """Najde zdroj loga, spočítá jeho verzi a vykreslí variantu přes cache"""
+
+    def __init__(self, logos_dir, cache):
+        self.logos_dir = logos_dir
+        self.cache = cache
+        self.flight = SingleFlight()
+        self.lock = threading.Lock()
+        # cesta -> (mtime_ns, velikost, sha256, dekódované logo nebo None)
+        self.sources = OrderedDict()
+        self.renders = 0
+        self.coalesced = 0
+
+    def resolve(self, name):
+        """Vrátí (cesta ke zdroji, název firmy pro iniciály) - obojí může být None"""
+        name = unquote(name)
+        if not name or '/' in name or '\\' in name or name.startswith('.'):
+            return None, None
+        if name.endswith('.png'):
+            path = os.path.join(self.logos_dir, name)
+            return (path if os.path.isfile(path) else None), None
+        # Název firmy - stejný převod jako route.ts, bez loga se vykreslí iniciály
+        path = os.path.join(self.logos_dir, sanitize_filename_js_style(name))
+        return (path if os.path.isfile(path) else None), name
+
+    def source(self, path):
+        """Záznam zdroje platný pro aktuální obsah souboru (podle mtime a velikosti)"""
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.sources.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self.sources.move_to_end(path)
+                return entry
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        entry = [stat.st_mtime_ns, stat.st_size, digest, None]
+        with self.lock:
+            self.sources[path] = entry
+            while len(self.sources) > SOURCE_CACHE_SIZE:
+                self.sources.popitem(last=False)
+        return entry
+
+    def version(self, path, company_name):
+        """Hash obsahu zdroje, u iniciál hash iniciál"""
+        if path is not None:
+            return self.source(path)[2]
+        return hashlib.sha256(f"initials:{get_initials(company_name)}".encode('utf-8')).hexdigest()
+
+    def render(self, path, company_name, width, fmt):
+        if path is not None:
+            entry = self.source(path)
+            image = entry[3]
+            if image is None:
+                # Zdroj se dekóduje a normalizuje jen jednou pro všechny velikosti
+                image = entry[3] = normalize_logo(path)
+        else:
+            image = render_default_logo(company_name)
+        buffer = io.BytesIO()
+        image.resize((width, width), RESAMPLE).save(buffer, **VARIANT_FORMATS[fmt])
+        with self.lock:
+            self.renders += 1
+        return buffer.getvalue()
+
+    def variant(self, path, company_name, version, width, fmt):
+        """Bajty varianty z cache, nebo jedno vykreslení sdílené souběžnými požadavky"""
+        key = f"{RENDER_FINGERPRINT}-{version[:32]}-{width}.{fmt}"
+        data = self.cache.get(key)
+        if data is None:
+            data, shared = self.flight.do(key, lambda: self.render(path, company_name, width, fmt))
+            if shared:
+                with self.lock:
+                    self.coalesced += 1
+            else:
+                self.cache.put(key, data)
+        return data
+
+class LogoRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        parts = urlsplit(self.path)
+        if parts.path == '/stats':
+            return self.send_body(200, 'application/json', json.dumps(self.server.stats()).encode('utf-8'),
+                                  {'Cache-Control': 'no-store'}, body)
+        if not parts.path.startswith('/logos/'):
+            return self.send_error(404)
+
+        query = parse_qs(parts.query)
+        fmt = query.get('fmt', ['png'])[0]
+        try:
+            width = int(query.get('w', [DEFAULT_WIDTH])[0])
+        except ValueError:
+            return self.send_error(400, 'Invalid width')
+        if not MIN_WIDTH <= width <= MAX_WIDTH:
+            return self.send_error(400, f'Width must be {MIN_WIDTH}-{MAX_WIDTH}')
+        if fmt not in CONTENT_TYPES:
+            return self.send_error(400, 'Unsupported format')
+
+        resizer = self.server.resizer
+        path, company_name = resizer.resolve(parts.path[len('/logos/'):])
+        if path is None and company_name is None:
+            return self.send_error(404)
+
+        try:
+            version = resizer.version(path, company_name)
+        except FileNotFoundError:
+            # Zdroj zmizel mezi resolve a čtením
+            return self.send_error(404)
+        etag = f'"{RENDER_FINGERPRINT}-{version[:32]}-{width}-{fmt}"'
+        requested = query.get('v', [''])[0]
+        headers = {
+            'ETag': etag,
+            'Cache-Control': IMMUTABLE if len(requested) >= 8 and version.startswith(requested) else REVALIDATE,
+        }
+        if etag in (self.headers.get('If-None-Match') or ''):
+            return self.send_body(304, None, b'', headers, False)
+
+        try:
+            data = resizer.variant(path, company_name, version, width, fmt)
+        except FileNotFoundError:
+            return self.send_error(404)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            # Zdroj není čitelný obrázek (např. HTML uložené jako .png) - chyba se necachuje,
+            # opravený soubor má nový hash a vykreslí se při dalším požadavku
+            return self.send_error(422, f'Unreadable logo ({type(e).__name__})')
+        self.send_body(200, CONTENT_TYPES[fmt], data, headers, body)
+
+    def send_body(self, status, content_type, data, headers, body=True):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if status != 304:
+            self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(data)
+
+class LogoServer(http.server.ThreadingHTTPServer):
+    """HTTP služba nad adresářem log"""
+
+    daemon_threads = True
+
+    def __init__(self, address, logos_dir, cache):
+        super().__init__(address, LogoRequestHandler)
+        self.resizer = LogoResizer(logos_dir, cache)
+
+    def stats(self):
+        return {'cache': self.resizer.cache.snapshot(), 'renders': self.resizer.renders,
+                'coalesced': self.resizer.coalesced}
+
+    def handle_error(self, request, client_address):
+        # Prohlížeč zavřel spojení uprostřed odpovědi - netisknout traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-mb', type=int, default=CACHE_BYTES // (1024 * 1024),
+                        help='velikost cache variant v paměti (MB)')
+    parser.add_argument('--spill-mb', type=int, default=SPILL_BYTES // (1024 * 1024),
+                        help='velikost cache variant na disku (MB), 0 vypne přelití')
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    logos_dir = args.logos_dir
+    spill_dir = default_spill_dir(logos_dir) if args.spill_mb else None
+    cache = ByteLRU(args.cache_mb * 1024 * 1024, spill_dir, args.spill_mb * 1024 * 1024,
+                    prefix=f"{RENDER_FINGERPRINT}-")
+
+    server = LogoServer((args.host, args.port), logos_dir, cache)
+    print(f"🌐 Služba log běží na http://{args.host}:{args.port}/logos/<název>?w=40&fmt=webp")
+    print(f"📁 Loga: {logos_dir}" + (f", přelitá cache: {spill_dir}" if spill_dir else ''))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Ukončuji službu log")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Obsahově adresované úložiště log - bloby podle SHA-256, atomické zápisy
+(zápis do dočasného souboru + os.replace) a publikace názvů přes symlinky
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+STORE_DIRNAME = '.store'
+# Bloby jen pro čtení - `cp nove.png logo.png` přes symlink by jinak přepsal
+# sdílený blob a jeho obsah by přestal odpovídat hashi v názvu
+BLOB_MODE = 0o444
+# Adresář s logy, který servíruje Next.js - skripty ho přebírají jako výchozí --logos-dir
+DEFAULT_LOGOS_DIR = os.environ.get('LOGOS_DIR', '/home/oak/firma-portal/public/logos')
+# Interní stav skriptů (metadata, journal, cache, metriky) - nesmí ležet ve webrootu public/
+STATE_DIRNAME = '.logos-state'
+DEFAULT_STATE_DIR = os.environ.get('LOGOS_STATE_DIR')
+
+def default_state_dir(logos_dir):
+    """Adresář interního stavu - $LOGOS_STATE_DIR, jinak `.logos-state` vedle public/
+
+    Pro logos_dir `<projekt>/public/logos` je to `<projekt>/.logos-state`,
+    pro jiný adresář (mimo public) sourozenec adresáře s logy.
+    """
+    if DEFAULT_STATE_DIR:
+        return DEFAULT_STATE_DIR
+    parent = os.path.dirname(os.path.abspath(logos_dir))
+    if os.path.basename(parent) == 'public':
+        parent = os.path.dirname(parent)
+    return os.path.join(parent, STATE_DIRNAME)
+
+def state_path(logos_dir, name):
+    """Cesta k souboru stavu (adresář stavu vytvoří); soubor ze starého umístění
+    vedle adresáře s logy se přesune"""
+    state_dir = default_state_dir(logos_dir)
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, name)
+    legacy = os.path.join(os.path.dirname(os.path.abspath(logos_dir)), name)
+    if not os.path.lexists(path) and os.path.lexists(legacy) and legacy != path:
+        os.replace(legacy, path)
+    return path
+
+@contextmanager
+def open_atomic(path):
+    """Otevře dočasný soubor pro zápis, po úspěšném bloku ho atomicky přejmenuje na `path`"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w+b') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_atomic(path, data):
+    """Zapíše soubor atomicky - čtenář vidí buď starý, nebo celý nový obsah"""
+    with open_atomic(path) as f:
+        f.write(data)
+
+class LogoStore:
+    """Bloby v `<logos_dir>/.store/ab/abcdef...`, loga jako symlinky `<název>.png` na ně"""
+
+    def __init__(self, logos_dir):
+        self.logos_dir = logos_dir
+        self.root = os.path.join(logos_dir, STORE_DIRNAME)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data):
+        """Uloží obsah (pokud ještě není uložen) a vrátí jeho SHA-256"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, data)
+        # I bloby ze starších běhů, které ještě byly zapisovatelné
+        os.chmod(path, BLOB_MODE)
+        return digest
+
+    def publish(self, name, digest):
+        """Jedním krokem přepne `<logos_dir>/<name>` na daný blob"""
+        link_path = os.path.join(self.logos_dir, name)
+        target = os.path.relpath(self.blob_path(digest), self.logos_dir)
+        tmp_link = os.path.join(self.logos_dir, f".tmp-{os.getpid()}-{name}")
+        try:
+            os.symlink(target, tmp_link)
+        except OSError:
+            # Souborový systém bez symlinků (např. Windows) - atomická kopie
+            with open(self.blob_path(digest), 'rb') as f:
+                write_atomic(link_path, f.read())
+            return
+        os.replace(tmp_link, link_path)
+
+    def put_and_publish(self, name, data):
+        """Uloží obsah a publikuje ho pod daným názvem, vrací SHA-256"""
+        digest = self.put(data)
+        self.publish(name, digest)
+        return digest
+
+    def published(self):
+        """Slovník název -> SHA-256 pro všechna loga publikovaná přes symlink"""
+        names = {}
+        for entry in os.scandir(self.logos_dir):
+            if entry.is_symlink():
+                target = os.readlink(entry.path)
+                if target.startswith(STORE_DIRNAME + os.sep):
+                    names[entry.name] = os.path.basename(target)
+        return names
+
+    def unpublish(self, name):
+        path = os.path.join(self.logos_dir, name)
+        if os.path.lexists(path):
+            os.remove(path)
+
+    def copied(self, sizes):
+        """SHA-256 loga publikovaných kopií (publish bez symlinků).
+
+        Hashují se jen běžné soubory s velikostí některého blobu - jiné na
+        blob odkazovat nemohou.
+        """
+        digests = set()
+        for entry in os.scandir(self.logos_dir):
+            if entry.name.startswith('.') or entry.is_symlink() or not entry.is_file():
+                continue
+            if entry.stat().st_size not in sizes:
+                continue
+            with open(entry.path, 'rb') as f:
+                digests.add(hashlib.sha256(f.read()).hexdigest())
+        return digests
+
+    def gc(self):
+        """Smaže bloby, na které už nevede žádný publikovaný název, vrací jejich počet"""
+        if not os.path.isdir(self.root):
+            return 0
+        blobs = [blob for prefix in os.scandir(self.root) if prefix.is_dir()
+                 for blob in os.scandir(prefix.path)]
+        referenced = set(self.published().values())
+        # Kopie místo symlinků - bez nich by gc smazal bloby všech publikovaných log
+        referenced |= self.copied({blob.stat().st_size for blob in blobs if blob.name not in referenced})
+        removed = 0
+        for blob in blobs:
+            if blob.name not in referenced:
+                os.remove(blob.path)
+                removed += 1
+        return removed
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Streamovaná validace stahovaných log - kontrola Content-Type, magic bytes
+v prvním bloku a limit velikosti těla ještě před zápisem na disk
+"""
+
+import io
+
+# Maximální velikost loga - větší odpovědi se zahodí bez dočtení
+MAX_LOGO_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+
+# Content-Type, které u loga určitě nechceme (chybové a přesměrovací stránky)
+REJECTED_CONTENT_TYPES = ('text/html', 'application/json', 'text/plain', 'application/xhtml')
+
+class LogoRejected(Exception):
+    """Odpověď není použitelné logo - `reason` jde do metadat"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+class LogoCancelled(Exception):
+    """Stahování přerušeno, protože jiný kandidát už vyhrál - nejde o chybu zdroje"""
+
+def sniff_image_type(head):
+    """Určí typ obrázku podle magic bytes, vrací 'png', 'ico', 'jpeg', 'svg' nebo None"""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\x00\x00\x01\x00'):
+        return 'ico'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if text.startswith(b'<svg') or (text.startswith(b'<?xml') and b'<svg' in text):
+        return 'svg'
+    return None
+
+def read_logo(response, min_size=500, max_bytes=MAX_LOGO_BYTES, cancelled=None):
+    """Přečte tělo streamované odpovědi (requests, stream=True) a ověří, že jde o obrázek.
+
+    Vrací (obsah, typ), jinak vyhodí LogoRejected. Je-li nastavena událost
+    `cancelled` (threading.Event), čtení skončí před dalším blokem výjimkou
+    LogoCancelled. Odpověď vždy uzavře.
+    """
+    try:
+        if response.status_code != 200:
+            raise LogoRejected(f'status {response.status_code}')
+
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content_type.startswith(REJECTED_CONTENT_TYPES):
+            raise LogoRejected(f'content-type {content_type}')
+
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise LogoRejected(f'content-length {length} > {max_bytes}')
+
+        chunks = []
+        size = 0
+        kind = None
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if cancelled is not None and cancelled.is_set():
+                raise LogoCancelled()
+            if not chunk:
+                continue
+            if kind is None:
+                kind = sniff_image_type(chunk)
+                if kind is None:
+                    raise LogoRejected('unknown magic bytes')
+            size += len(chunk)
+            if size > max_bytes:
+                raise LogoRejected(f'body > {max_bytes} bytes')
+            chunks.append(chunk)
+
+        if size <= min_size:
+            raise LogoRejected(f'body {size} <= {min_size} bytes')
+
+        return b''.join(chunks), kind
+    finally:
+        response.close()
+
+def to_png(content, kind):
+    """Obsah loga jako PNG - loga se publikují jako `<název>.png` a dál je zpracovává Pillow.
+
+    ICO (největší velikost) a JPEG se převedou, SVG se odmítne - Pillow ho
+    nedekóduje a prohlížeč by ho servírovaný jako image/png nevykreslil.
+    """
+    if kind == 'png':
+        return content
+    if kind == 'svg':
+        raise LogoRejected('svg')
+    # Pillow až při převodu - samotná validace zůstává bez závislostí
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert('RGBA')
+    except Exception as e:
+        raise LogoRejected(f'undecodable {kind} ({type(e).__name__})')
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
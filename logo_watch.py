@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Sledování adresáře s logy - po ruční výměně loga přegeneruje jen varianty,
+dlaždici v atlasu a záznam v manifestu dotčené firmy (inotify přes ctypes,
+jinde polling), události se slučují s krátkou prodlevou; ručně nahraná loga
+se převezmou do obsahově adresovaného úložiště
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import re
+import select
+import struct
+import time
+
+from build_logo_atlas import fit_tile, load_atlas, update_atlas, write_atlas
+from build_logo_manifest import load_manifest, update_manifest, write_manifest
+from create_fixed_logos import render_default_logo
+from logo_cache import LogoMetaStore, default_meta_path
+from logo_layout import ATLAS_DIRNAME, SOURCE_PATTERNS, VARIANT_FORMATS, VARIANT_SIZES, VARIANTS_DIRNAME, logo_key
+from logo_store import DEFAULT_LOGOS_DIR, STORE_DIRNAME, LogoStore
+from normalize_logos import load_logo, pad_to_square, save_variants, trim
+
+# Prodleva bez dalších událostí, po které se dávka zpracuje (kopírování, atomické přejmenování)
+DEBOUNCE_SECONDS = 0.2
+POLL_INTERVAL = 1.0
+
+# Konstanty z <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct('iIII')
+
+# Blob v úložišti relativně k adresáři s logy: .store/ab/abcdef...
+BLOB_NAME_RE = re.compile(rf'^{re.escape(STORE_DIRNAME)}/([0-9a-f]{{2}})/\1[0-9a-f]{{62}}$')
+
+def is_source_name(name):
+    """Zdrojové logo (ne dočasný soubor zápisu, ne manifest ani jiná vygenerovaná data)"""
+    return not name.startswith('.') and any(fnmatch.fnmatch(name, pattern) for pattern in SOURCE_PATTERNS)
+
+def is_blob_name(name):
+    return BLOB_NAME_RE.match(name) is not None
+
+def content_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class InotifyWatcher:
+    """Události adresáře přes inotify (Linux), bez závislostí - libc přes ctypes.
+
+    Sleduje i `.store/` - zápis přes symlink (`cp` jako root, kterého nezastaví
+    práva jen pro čtení) mění blob, položka v adresáři s logy zůstává beze změny.
+    """
+
+    def __init__(self, directory):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.directory = directory
+        self.prefixes = {}
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 selhal')
+        if self.add_watch('', WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch selhal pro {directory}')
+        store = os.path.join(directory, STORE_DIRNAME)
+        if os.path.isdir(store):
+            self.watch_store()
+
+    def add_watch(self, prefix, mask):
+        """Přidá sledovaný podadresář (relativně k adresáři s logy), vrací watch descriptor"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(os.path.join(self.directory, prefix)), mask)
+        if wd >= 0:
+            self.prefixes[wd] = prefix
+        return wd
+
+    def watch_store(self, prefix=None):
+        """Sleduje kořen úložiště (nové podadresáře) a zápisy do blobů v podadresářích"""
+        if prefix is None:
+            self.add_watch(STORE_DIRNAME, IN_CREATE)
+            for entry in os.scandir(os.path.join(self.directory, STORE_DIRNAME)):
+                if entry.is_dir(follow_symlinks=False):
+                    self.add_watch(f"{STORE_DIRNAME}/{entry.name}", IN_CLOSE_WRITE)
+        else:
+            self.add_watch(prefix, IN_CLOSE_WRITE)
+
+    def wait(self, timeout=None):
+        """Počká na události, vrací množinu změněných názvů (None = přetečení fronty, změnit vše).
+
+        Události v úložišti mají název relativně k adresáři s logy (.store/ab/abcdef...).
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].split(b'\0', 1)[0]
+            offset += length
+            if not name or wd not in self.prefixes:
+                continue
+            prefix = self.prefixes[wd]
+            name = f"{prefix}/{os.fsdecode(name)}" if prefix else os.fsdecode(name)
+            if mask & IN_ISDIR and mask & IN_CREATE:
+                if name == STORE_DIRNAME:
+                    self.watch_store()
+                elif prefix == STORE_DIRNAME:
+                    self.watch_store(name)
+                continue
+            names.add(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Náhrada inotify - porovnává stat() všech souborů (přes symlinky až na blob)"""
+
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.state = self.scan()
+
+    def scan(self):
+        state = {}
+        for entry in os.scandir(self.directory):
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                continue
+            state[entry.name] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return state
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        state = self.scan()
+        changed = {name for name in state.keys() | self.state.keys() if state.get(name) != self.state.get(name)}
+        self.state = state
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(directory, polling=False, interval=POLL_INTERVAL):
+    """inotify, pokud je k dispozici, jinak polling"""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            # Není Linux nebo došly inotify watche
+            pass
+    return PollingWatcher(directory, interval)
+
+def debounced(watcher, directory, debounce=DEBOUNCE_SECONDS):
+    """Generátor dávek změněných zdrojových log - dávka vznikne po `debounce` s klidu"""
+    pending = set()
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        changed = watcher.wait(timeout)
+        if changed is None:
+            # Přetečení fronty inotify - projít celý adresář
+            changed = set(os.listdir(directory))
+        changed = {name for name in changed if is_source_name(name) or is_blob_name(name)}
+        if changed:
+            pending |= changed
+            deadline = time.monotonic() + debounce
+        elif deadline is not None and time.monotonic() >= deadline:
+            yield sorted(pending)
+            pending = set()
+            deadline = None
+
+class IncrementalRebuilder:
+    """Přegeneruje odvozená data jen pro změněná loga"""
+
+    def __init__(self, logos_dir):
+        self.logos_dir = logos_dir
+        self.variants_dir = os.path.join(logos_dir, VARIANTS_DIRNAME)
+        self.store = LogoStore(logos_dir)
+        # Název -> SHA-256 obsahu při posledním přegenerování (události vlastních zápisů se přeskočí)
+        self.built = {}
+
+    def ingest(self, names):
+        """Převezme ručně nahraná loga do úložiště, vrací názvy, které je třeba přegenerovat.
+
+        Obyčejný soubor (cp --remove-destination, mv, editor) se uloží jako blob
+        a publikuje symlinkem; blob přepsaný přes symlink se uloží pod správným
+        hashem a přepnou se na něj všechny názvy, které ho sdílely.
+        """
+        published = self.store.published()
+        sharing = {}
+        for name, digest in published.items():
+            sharing.setdefault(digest, []).append(name)
+
+        changed = set()
+        for name in names:
+            if is_blob_name(name):
+                digest = os.path.basename(name)
+                changed.update(self.repair(digest, sharing.get(digest, [])))
+                continue
+            path = os.path.join(self.logos_dir, name)
+            if name in published:
+                changed.update(self.repair(published[name], sharing[published[name]]))
+            elif os.path.isfile(path) and not os.path.islink(path):
+                # Bez symlinků (kopie místo odkazu) je publikované logo obyčejný soubor se známým obsahem
+                if content_digest(path) != self.built.get(name):
+                    with open(path, 'rb') as f:
+                        self.store.put_and_publish(name, f.read())
+                    print(f"📥 {name}: převzato do úložiště")
+            changed.add(name)
+
+        # Beze změny obsahu od posledního přegenerování (např. vlastní publikace)
+        return sorted(name for name in changed if self.current_digest(name) != self.built.get(name, ''))
+
+    def repair(self, digest, names):
+        """Blob, jehož obsah už neodpovídá hashi, uloží znovu a přepne na něj názvy"""
+        path = self.store.blob_path(digest)
+        if not os.path.isfile(path) or content_digest(path) == digest:
+            return []
+        with open(path, 'rb') as f:
+            fixed = self.store.put(f.read())
+        for name in names:
+            self.store.publish(name, fixed)
+        os.remove(path)
+        print(f"⚠️  Blob {digest[:12]} přepsán přes symlink ({', '.join(names)}), uložen jako {fixed[:12]}")
+        return names
+
+    def current_digest(self, name):
+        path = os.path.join(self.logos_dir, name)
+        return content_digest(path) if os.path.isfile(path) else None
+
+    def rebuild(self, filenames):
+        """Zpracuje dávku názvů souborů, vrací počet úspěšně zpracovaných"""
+        filenames = self.ingest(filenames)
+        if not filenames:
+            return 0
+        manifest = load_manifest(self.logos_dir)
+        # Firma smazaného loga dostane v atlasu zpět iniciály
+        companies = {}
+        if manifest is not None:
+            for company, filename in manifest['companies'].items():
+                companies.setdefault(filename, company)
+
+        done = []
+        tiles = {}
+        for filename in filenames:
+            started = time.perf_counter()
+            # Stejný klíč jako build_logo_atlas.collect_tiles (zdroj .ico/.jpg je v atlasu jako .png)
+            key = logo_key(filename)
+            try:
+                tiles[key] = self.rebuild_variants(filename, companies.get(key))
+            except Exception as e:
+                print(f"❌ {filename}: {e}")
+                continue
+            done.append(filename)
+            self.built[filename] = self.current_digest(filename)
+            print(f"🔁 {filename}: varianty ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+        if done:
+            self.rebuild_atlas(tiles)
+            if manifest is not None:
+                meta_path = default_meta_path(self.logos_dir)
+                meta_store = LogoMetaStore(meta_path) if os.path.exists(meta_path) else None
+                write_manifest(update_manifest(manifest, self.logos_dir, done, meta_store), self.logos_dir)
+        return len(done)
+
+    def rebuild_variants(self, filename, company_name=None):
+        """Přegeneruje (nebo smaže) varianty jednoho loga, vrací jeho dlaždici do atlasu"""
+        stem = os.path.splitext(filename)[0]
+        path = os.path.join(self.logos_dir, filename)
+        if os.path.isfile(path):
+            image = load_logo(path)
+            os.makedirs(self.variants_dir, exist_ok=True)
+            save_variants(pad_to_square(trim(image)), stem, self.variants_dir)
+            return fit_tile(image)
+
+        for size in VARIANT_SIZES:
+            for ext in VARIANT_FORMATS:
+                variant = os.path.join(self.variants_dir, f"{stem}-{size}.{ext}")
+                if os.path.exists(variant):
+                    os.remove(variant)
+        if company_name is None:
+            return None
+        return fit_tile(render_default_logo(company_name))
+
+    def rebuild_atlas(self, tiles):
+        """Vymění dlaždice v existujícím atlasu (bez atlasu nic nedělá)"""
+        atlas_dir = os.path.join(self.logos_dir, ATLAS_DIRNAME)
+        loaded = load_atlas(atlas_dir)
+        if loaded is None:
+            return
+        atlas, sprites, tile_size = loaded
+        atlas, sprites = update_atlas(atlas, sprites, tiles)
+        write_atlas(atlas, sprites, atlas_dir, tile_size)
+
+def watch(logos_dir, debounce=DEBOUNCE_SECONDS, polling=False, interval=POLL_INTERVAL):
+    """Sleduje adresář, dokud není přerušen (Ctrl+C)"""
+    watcher = open_watcher(logos_dir, polling, interval)
+    rebuilder = IncrementalRebuilder(logos_dir)
+    mode = 'polling' if isinstance(watcher, PollingWatcher) else 'inotify'
+    print(f"👀 Sleduji {logos_dir} ({mode}, prodleva {debounce * 1000:.0f} ms)...")
+    try:
+        for batch in debounced(watcher, logos_dir, debounce):
+            started = time.perf_counter()
+            count = rebuilder.rebuild(batch)
+            if count:
+                print(f"✅ Aktualizováno {count} log za {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n👋 Ukončuji sledování")
+    finally:
+        watcher.close()
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help='prodleva bez změn v sekundách, po které se dávka zpracuje')
+    parser.add_argument('--poll', action='store_true',
+                        help='použít polling místo inotify')
+    args = parser.parse_args()
+
+    watch(args.logos_dir, args.debounce, args.poll)
+
+if __name__ == "__main__":
+    main()
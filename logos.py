@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Jednotný příkaz pro správu log zákazníků - podpříkazy fetch, render,
+normalize, manifest, audit, watch, gps a all (celý řetězec v jednom procesu)
+"""
+
+import argparse
+import time
+
+# Jen lehké moduly - requests, PIL a NumPy importuje až podpříkaz, který je potřebuje
+from erp_customers import DEFAULT_SOURCE
+from logo_store import DEFAULT_LOGOS_DIR
+
+def cmd_fetch(args, client=None, companies=None):
+    from download_real_logos import run
+    run(args.logos_dir, args.source, refresh=args.refresh, metrics_dir=args.metrics_dir,
+        client=client, companies=companies)
+
+def cmd_render(args, companies=None):
+    if args.replace:
+        from create_fixed_logos import run
+        run(args.logos_dir, args.source, jobs=args.jobs, metrics_dir=args.metrics_dir, companies=companies)
+    else:
+        from create_default_logos import run
+        run(args.logos_dir, args.source, jobs=args.jobs, companies=companies)
+
+def cmd_normalize(args):
+    from normalize_logos import run
+    run(args.logos_dir, metrics_dir=args.metrics_dir)
+
+def cmd_manifest(args, companies=None):
+    from build_logo_manifest import run
+    run(args.logos_dir, args.source, companies=companies)
+
+def cmd_audit(args):
+    from logo_phash import audit
+    audit(args.logos_dir, collapse=args.collapse, purge=args.purge)
+
+def cmd_watch(args):
+    from logo_watch import watch
+    watch(args.logos_dir, args.debounce, args.poll)
+
+def cmd_gps(args):
+    from erp_gps import run
+    run(args.logos_dir, args.source)
+
+def cmd_all(args):
+    """Stažení, doplnění iniciál, normalizace a manifest v jednom procesu.
+
+    Seznam firem se z ERP načte jednou přes stejný pool spojení, který pak
+    používá stahování log.
+    """
+    from erp_customers import iter_customer_names
+    from logo_http import LogoHttpClient
+
+    args.replace = False
+    timings = []
+    with LogoHttpClient() as client:
+        started = time.perf_counter()
+        companies = list(iter_customer_names(args.source, client.session))
+        timings.append(('source', time.perf_counter() - started))
+
+        started = time.perf_counter()
+        cmd_fetch(args, client=client, companies=companies)
+        timings.append(('fetch', time.perf_counter() - started))
+
+    for name, step in (('render', lambda: cmd_render(args, companies)),
+                       ('normalize', lambda: cmd_normalize(args)),
+                       ('manifest', lambda: cmd_manifest(args, companies))):
+        print()
+        started = time.perf_counter()
+        step()
+        timings.append((name, time.perf_counter() - started))
+
+    print(f"\n⏱️  {len(companies)} firem: " + ', '.join(f"{name} {seconds:.1f} s" for name, seconds in timings))
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='logos', description=__doc__)
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ERP feed projektů - URL nebo cesta k JSON souboru')
+    parser.add_argument('--metrics-dir',
+                        help='adresář pro metriky (JSONL a Prometheus textfile, výchozí .logos-state/metrics)')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='příkaz')
+
+    fetch = commands.add_parser('fetch', help='stáhnout loga z internetu')
+    fetch.add_argument('--refresh', action='store_true',
+                       help='revalidovat existující loga přes ETag/Last-Modified')
+    fetch.set_defaults(handler=cmd_fetch)
+
+    render = commands.add_parser('render', help='vykreslit loga s iniciálkami pro firmy bez loga')
+    render.add_argument('--jobs', type=int, default=1,
+                        help='počet paralelních procesů pro vykreslování')
+    render.add_argument('--replace', action='store_true',
+                        help='přegenerovat loga všech firem a smazat loga firem mimo seznam')
+    render.set_defaults(handler=cmd_render)
+
+    normalize = commands.add_parser('normalize', help='vytvořit varianty 40/80 px v PNG a WebP')
+    normalize.set_defaults(handler=cmd_normalize)
+
+    manifest = commands.add_parser('manifest', help='vygenerovat manifest log pro mapu')
+    manifest.set_defaults(handler=cmd_manifest)
+
+    audit = commands.add_parser('audit', help='najít placeholdery a duplicitní loga')
+    audit.add_argument('--collapse', action='store_true',
+                       help='téměř shodná loga publikovat jako jeden blob')
+    audit.add_argument('--purge', action='store_true',
+                       help='odpublikovat loga, která jsou placeholdery')
+    audit.set_defaults(handler=cmd_audit)
+
+    watch = commands.add_parser('watch', help='sledovat adresář a přegenerovat jen změněná loga')
+    watch.add_argument('--debounce', type=float, default=0.2,
+                       help='prodleva bez změn v sekundách, po které se dávka zpracuje')
+    watch.add_argument('--poll', action='store_true',
+                       help='použít polling místo inotify')
+    watch.set_defaults(handler=cmd_watch)
+
+    gps = commands.add_parser('gps', help='naparsovat a ověřit GPS souřadnice projektů pro mapu')
+    gps.set_defaults(handler=cmd_gps)
+
+    everything = commands.add_parser('all', help='fetch, render, normalize a manifest v jednom procesu')
+    everything.add_argument('--refresh', action='store_true',
+                            help='revalidovat existující loga přes ETag/Last-Modified')
+    everything.add_argument('--jobs', type=int, default=1,
+                            help='počet paralelních procesů pro vykreslování')
+    everything.set_defaults(handler=cmd_all)
+    return parser
+
+def main(argv=None):
+    """Hlavní funkce"""
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Skript pro normalizaci stažených log na velikost markeru mapy
+(oříznutí, doplnění na čtverec, varianty 40 px a 80 px v PNG a WebP)
+"""
+
+import argparse
+import io
+import os
+from PIL import Image, ImageChops
+
+from logo_metrics import NO_METRICS, RunMetrics, default_metrics_dir
+from logo_layout import VARIANT_FORMATS, VARIANT_SIZES, VARIANTS_DIRNAME, find_sources
+from logo_store import DEFAULT_LOGOS_DIR, write_atomic
+
+
+def load_logo(path):
+    """Načte logo (PNG, ICO, JPEG) jako RGBA - u ICO Pillow vybírá největší velikost"""
+    with Image.open(path) as image:
+        return image.convert('RGBA')
+
+def trim(image):
+    """Ořízne průhledné okraje, u neprůhledných obrázků okraje barvy levého horního rohu"""
+    alpha = image.getchannel('A')
+    if alpha.getextrema()[0] < 255:
+        bbox = alpha.getbbox()
+    else:
+        background = Image.new('RGBA', image.size, image.getpixel((0, 0)))
+        bbox = ImageChops.difference(image, background).convert('L').getbbox()
+    return image.crop(bbox) if bbox else image
+
+def pad_to_square(image):
+    """Doplní obrázek průhledným okrajem na čtverec a vycentruje ho"""
+    width, height = image.size
+    side = max(width, height)
+    square = Image.new('RGBA', (side, side), (255, 255, 255, 0))
+    square.paste(image, ((side - width) // 2, (side - height) // 2))
+    return square
+
+def normalize_logo(path):
+    """Vrátí oříznuté a čtvercové logo připravené na zmenšení"""
+    return pad_to_square(trim(load_logo(path)))
+
+def save_variants(image, stem, variants_dir, sizes=VARIANT_SIZES, metrics=NO_METRICS):
+    """Uloží zmenšené varianty v PNG a WebP, vrací celkovou velikost v bajtech"""
+    total = 0
+    for size in sizes:
+        with metrics.stage('resize'):
+            resized = image.resize((size, size), Image.LANCZOS)
+        for ext, options in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            with metrics.stage('encode', ext):
+                resized.save(buffer, **options)
+            with metrics.stage('write'):
+                write_atomic(os.path.join(variants_dir, f"{stem}-{size}.{ext}"), buffer.getvalue())
+            total += buffer.tell()
+    return total
+
+def run(logos_dir, metrics_dir=None):
+    """Normalizuje všechna zdrojová loga do variant, vrací (normalizované, neúspěšné)"""
+    variants_dir = os.path.join(logos_dir, VARIANTS_DIRNAME)
+    os.makedirs(variants_dir, exist_ok=True)
+
+    sources = find_sources(logos_dir)
+    print(f"🖼️  Normalizuji {len(sources)} log na velikosti {', '.join(f'{s} px' for s in VARIANT_SIZES)}...")
+
+    metrics = RunMetrics('normalize_logos')
+    normalized = 0
+    failed = 0
+    source_bytes = 0
+    variant_bytes = 0
+
+    for path in sources:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        with metrics.company(os.path.basename(path)):
+            try:
+                with metrics.stage('decode'):
+                    image = load_logo(path)
+                with metrics.stage('resize'):
+                    image = pad_to_square(trim(image))
+                variant_bytes += save_variants(image, stem, variants_dir, metrics=metrics)
+                source_bytes += os.path.getsize(path)
+                normalized += 1
+                metrics.outcome('normalized')
+                print(f"✅ {os.path.basename(path)} ({image.size[0]}x{image.size[1]})")
+            except Exception as e:
+                failed += 1
+                metrics.outcome('failed')
+                print(f"❌ {os.path.basename(path)}: {e}")
+    metrics_paths = metrics.export(metrics_dir or default_metrics_dir(logos_dir))
+
+    print(f"\n📊 Statistika:")
+    print(f"✅ Normalizováno: {normalized}")
+    print(f"❌ Neúspěšných: {failed}")
+    print(f"📦 Zdroje: {source_bytes / 1024:.1f} kB, varianty: {variant_bytes / 1024:.1f} kB")
+    print(f"📁 Varianty uloženy v: {variants_dir}")
+    print(f"📏 Metriky: {', '.join(metrics_paths)}")
+    return normalized, failed
+
+def main():
+    """Hlavní funkce"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logos-dir', default=DEFAULT_LOGOS_DIR,
+                        help='adresář s logy (výchozí $LOGOS_DIR nebo cesta na serveru)')
+    args = parser.parse_args()
+
+    run(args.logos_dir)
+
+if __name__ == "__main__":
+    main()
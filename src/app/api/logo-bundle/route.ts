@@ -0,0 +1,80 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { promises as fs } from 'fs'
+import { loadLogoBundle, logoBundlePath, logoBundleVersion } from '@/lib/logo-bundle'
+import { logger } from '@/lib/logger'
+
+// ?v= names a bundle file by its content hash, so that response never changes
+const IMMUTABLE = 'public, max-age=31536000, immutable'
+// Without ?v= the response follows the current index and has to be revalidated
+const REVALIDATE = 'public, no-cache'
+
+// Pre-compressed siblings written by build_logo_bundle.py, in order of preference
+const ENCODINGS: [string, string][] = [['br', '.br'], ['gzip', '.gz']]
+
+function fileExists(filePath: string): Promise<boolean> {
+  return fs.access(filePath).then(() => true, () => false)
+}
+
+// Picks the representation to send: the first accepted encoding that has a pre-compressed file, else identity
+async function chooseEncoding(bundlePath: string, accepted: string): Promise<[string, string] | null> {
+  for (const [encoding, suffix] of ENCODINGS) {
+    if (accepted.includes(encoding) && await fileExists(bundlePath + suffix)) {
+      return [encoding, suffix]
+    }
+  }
+  return null
+}
+
+// If-None-Match may list several tags, weak ones included
+function etagMatches(ifNoneMatch: string | null, etag: string): boolean {
+  if (!ifNoneMatch) {
+    return false
+  }
+  return ifNoneMatch.split(',').some(tag => {
+    const candidate = tag.trim()
+    return candidate === '*' || candidate === etag || candidate === `W/${etag}`
+  })
+}
+
+export async function GET(request: NextRequest) {
+  try {
+    const requested = request.nextUrl.searchParams.get('v')
+    let version = requested
+    if (!version) {
+      const loaded = await loadLogoBundle()
+      if (!loaded) {
+        return NextResponse.json({ error: 'Logo bundle not built' }, { status: 404 })
+      }
+      version = logoBundleVersion(loaded.index)
+    }
+
+    // Older bundles are pruned by build_logo_bundle.py (BUNDLE_KEEP) - a gone version is a 404, not another bundle
+    const bundlePath = logoBundlePath(version)
+    const exists = bundlePath !== null && await fileExists(bundlePath)
+    if (!bundlePath || !exists) {
+      return NextResponse.json({ error: 'Logo bundle version not found' }, { status: 404 })
+    }
+
+    const chosen = await chooseEncoding(bundlePath, request.headers.get('accept-encoding') || '')
+    // Each encoding is a different byte sequence, so it needs its own strong validator
+    const etag = chosen ? `"${version}-${chosen[0]}"` : `"${version}"`
+    const headers: Record<string, string> = {
+      'Cache-Control': requested ? IMMUTABLE : REVALIDATE,
+      'Content-Type': 'application/json; charset=utf-8',
+      ETag: etag,
+      Vary: 'Accept-Encoding'
+    }
+    if (etagMatches(request.headers.get('if-none-match'), etag)) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+
+    if (chosen) {
+      const compressed = await fs.readFile(bundlePath + chosen[1])
+      return new NextResponse(new Uint8Array(compressed), { headers: { ...headers, 'Content-Encoding': chosen[0] } })
+    }
+    return new NextResponse(new Uint8Array(await fs.readFile(bundlePath)), { headers })
+  } catch (error) {
+    logger.error('Error serving logo bundle:', error)
+    return NextResponse.json({ error: 'Failed to load logo bundle' }, { status: 500 })
+  }
+}
@@ -1,33 +1,98 @@
 import { NextResponse } from 'next/server'
 import { promises as fs } from 'fs'
 import path from 'path'
+import { cachedJsonFile } from '@/lib/cached-json'
 import { logger } from '@/lib/logger'
+import { loadGpsTable, resolveGps } from '@/lib/gps'
+import { loadLogoBundle, logoBundleUrl } from '@/lib/logo-bundle'
+import { sanitizeFilename } from '@/lib/logo-names'
 
-// Helper function to generate logo filename (JavaScript style like in Python scripts)
-function sanitizeFilename(companyName: string): string {
-  let filename = companyName.toLowerCase()
-  // Remove diacritics (basic implementation)
-  filename = filename.normalize('NFD').replace(/[\u0300-\u036f]/g, '')
-  // Replace non-alphanumeric with underscore
-  filename = filename.replace(/[^a-z0-9]/g, '_')
-  // Remove multiple underscores
-  filename = filename.replace(/_+/g, '_')
-  // Remove leading/trailing underscores
-  filename = filename.replace(/^_+|_+$/g, '')
-  filename += '.png'
-  
-  return filename
+interface LogoManifestEntry {
+  url: string
+  hash: string
+  width: number
+  height: number
+  bytes: number
+  dataUri?: string
+  // normalize_logos.py variants: size ('40', '80') -> format ('png', 'webp') -> URL
+  variants?: Record<string, Record<string, string>>
+  // Position in the sprite atlas (build_logo_atlas.py): [x, y, w, h]
+  sprite?: LogoSprite
+}
+
+type LogoSprite = [number, number, number, number]
+
+interface LogoAtlas {
+  image: string
+  width: number
+  height: number
+  tileSize: number
+}
+
+interface LogoManifest {
+  version: number
+  generatedAt: string
+  logos: Record<string, LogoManifestEntry>
+  companies: Record<string, string>
+  atlas?: LogoAtlas
+}
+
+const LOGO_MANIFEST_VERSION = 1
+
+// Logo manifest generated by build_logo_manifest.py, re-read when it is rebuilt (e.g. by logos watch)
+const loadLogoManifest = cachedJsonFile<LogoManifest>(
+  path.join(process.cwd(), 'public', 'logos', 'manifest.json'),
+  content => {
+    const manifest = JSON.parse(content) as LogoManifest
+    if (manifest.version !== LOGO_MANIFEST_VERSION) {
+      logger.warn(`Nepodporovaná verze manifestu log: ${manifest.version}`)
+      return null
+    }
+    return manifest
+  }
+)
+
+interface DownloadedLogo {
+  src: string
+  srcSet?: string
+  sprite?: LogoSprite
+}
+
+// Marker-sized variant (40 px, 80 px for 2x screens), WebP preferred over PNG
+function variantUrl(entry: LogoManifestEntry, size: number): string | undefined {
+  const formats = entry.variants?.[String(size)]
+  return formats?.webp ?? formats?.png
+}
+
+function manifestLogo(manifest: LogoManifest, companyName: string): DownloadedLogo | null {
+  const filename = manifest.companies[companyName] ?? sanitizeFilename(companyName)
+  const entry = manifest.logos[filename]
+  if (!entry) {
+    return null
+  }
+  const small = variantUrl(entry, 40)
+  const large = variantUrl(entry, 80)
+  return {
+    src: small ?? entry.dataUri ?? entry.url,
+    srcSet: small && large ? `${small} 1x, ${large} 2x` : undefined,
+    sprite: manifest.atlas ? entry.sprite : undefined
+  }
 }
 
 // Check if downloaded logo exists in public/logos directory
-async function getDownloadedLogoPath(companyName: string): Promise<string | null> {
+async function getDownloadedLogo(companyName: string, manifest: LogoManifest | null): Promise<DownloadedLogo | null> {
+  if (manifest) {
+    return manifestLogo(manifest, companyName)
+  }
+
+  // No manifest yet - fall back to probing the filesystem
   try {
     const filename = sanitizeFilename(companyName)
     const logoPath = path.join(process.cwd(), 'public', 'logos', filename)
     
     // Check if file exists
     await fs.access(logoPath)
-    return `/logos/${filename}`
+    return { src: `/logos/${filename}` }
   } catch {
     return null
   }
@@ -64,9 +129,11 @@ interface MapCompany {
   jiraKey?: string
   customerName: string
   logoBase64?: string
+  logoSrcSet?: string
+  logoSprite?: LogoSprite
 }
 
-// Simple logo generator as base64
+// Simple logo generator as base64 (fallback when build_logo_bundle.py has not run)
 function generateLogoBase64(customerName: string): string {
   // Get initials
   const words = customerName.split(' ')
@@ -116,7 +183,7 @@ export async function GET() {
         projekt: project.projekt || '',
         nazev: project.nazev || '',
         jira_klic: project.jira_klic || '',
-        nazev_par: project.nazev_par || '',
+        nazev_par: (project.nazev_par || '').trim(), // Klíč jako v erp_customers.py (tabulka GPS, balíček log)
         gps: project.gps || '',
         logo: project.logo || '' // Přidáno pro skutečná loga z ERP
       }))
@@ -155,33 +222,50 @@ export async function GET() {
       ]
     }
 
+    // Předpočítaný balíček data URI (build_logo_bundle.py) - bez kódování při každém požadavku
+    const logoBundle = await loadLogoBundle()
+    // Souřadnice ověřené dávkově přes erp_gps.py (DMS, prohozené a nesmyslné hodnoty)
+    const gpsTable = await loadGpsTable()
+    // URL variant a pozice v atlasu log (build_logo_manifest.py)
+    const logoManifest = await loadLogoManifest()
+
     // Převod projektů na formát pro mapu (asynchronní kvůli kontrole log)
     const companies: MapCompany[] = await Promise.all(projects.map(async (project: ProjectData, index: number) => {
       // Parsování GPS souřadnic
       let latitude = 50.0755 // Default Praha
       let longitude = 14.4378
       
-      if (project.gps && project.gps.includes(',')) {
-        const [lat, lng] = project.gps.split(',').map(coord => parseFloat(coord.trim()))
-        if (!isNaN(lat) && !isNaN(lng)) {
-          latitude = lat
-          longitude = lng
-        }
+      // Neplatná GPS projektu - souřadnice z ostatních projektů zákazníka
+      const coordinates = (project.gps ? resolveGps(gpsTable, project.gps) : null)
+        ?? gpsTable?.customers[project.nazev_par]
+      if (coordinates) {
+        [latitude, longitude] = coordinates
       }
       
-      // Three-tier logo priority system
-      let logoBase64: string
+      // Four-tier logo priority system
+      let logoBase64: string | undefined
+      let logoSrcSet: string | undefined
+      let logoSprite: LogoSprite | undefined
+      
+      // Priority 2: Precomputed bundle (tiny real logo or SVG initials) is not inlined per project -
+      // the client loads it once from metadata.logoBundle (immutable URL) and fills in logoBase64
+      const bundled = logoBundle !== null && project.nazev_par in logoBundle.bundle.companies
       
       if (project.logo) {
         // Priority 1: ERP logo (base64 from project.logo field)
         logoBase64 = `data:image/png;base64,${project.logo}`
       } else {
-        // Priority 2: Check for downloaded logo
-        const downloadedLogoPath = await getDownloadedLogoPath(project.nazev_par)
-        if (downloadedLogoPath) {
-          logoBase64 = downloadedLogoPath
+        // Marker icon from the shared atlas image (one request for all markers) when it has the logo
+        logoSprite = logoManifest ? manifestLogo(logoManifest, project.nazev_par)?.sprite : undefined
+      }
+      if (!project.logo && !bundled) {
+        // Priority 3: Check for downloaded logo (40/80 px variant when normalize_logos.py has run)
+        const downloadedLogo = await getDownloadedLogo(project.nazev_par, logoManifest)
+        if (downloadedLogo) {
+          logoBase64 = downloadedLogo.src
+          logoSrcSet = downloadedLogo.srcSet
         } else {
-          // Priority 3: Generated logo (SVG with initials)
+          // Priority 4: Generated logo (SVG with initials)
           logoBase64 = generateLogoBase64(project.nazev_par)
         }
       }
@@ -207,7 +291,9 @@ export async function GET() {
         projectId: project.projekt,
         jiraKey: project.jira_klic,
         customerName: project.nazev_par,
-        logoBase64
+        logoBase64,
+        logoSrcSet,
+        logoSprite
       }
     }))
 
@@ -235,7 +321,9 @@ export async function GET() {
         industries,
         employeeStats,
         projectCount,
-        databaseCount
+        databaseCount,
+        logoBundle: logoBundle ? logoBundleUrl(logoBundle.index) : null,
+        logoAtlas: logoManifest?.atlas ?? null
       }
     }
     
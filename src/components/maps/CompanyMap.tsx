@@ -1,8 +1,17 @@
 'use client'
 
-import { useState, useEffect, useRef } from 'react'
+import { useState, useEffect, useMemo, useRef } from 'react'
 import dynamic from 'next/dynamic'
 import { logger } from '@/lib/logger'
+import {
+  clusterCompanies,
+  clusterZoom,
+  loadMapClusterIndex,
+  loadMapClusters,
+  MapCluster,
+  MapClusterCompany,
+  MapClusterIndex
+} from '@/lib/map-clusters'
 
 // Dynamically import react-leaflet components to avoid SSR issues
 const MapContainer = dynamic(() => import('react-leaflet').then(mod => mod.MapContainer), { ssr: false })
@@ -31,10 +40,25 @@ interface Company {
   jiraKey?: string
   customerName?: string
   logoBase64?: string
+  // 1x/2x marker variants (normalize_logos.py)
+  logoSrcSet?: string
+  // [x, y, w, h] in the shared logo atlas (build_logo_atlas.py)
+  logoSprite?: [number, number, number, number]
 }
 
+interface LogoAtlas {
+  image: string
+  width: number
+  height: number
+  tileSize: number
+}
+
+// Below this many markers the map draws every company, above it uses precomputed clusters
+const CLUSTER_MIN_COMPANIES = 100
+
 interface CompanyMapProps {
   companies: Company[]
+  logoAtlas?: LogoAtlas | null
   height?: string
   showControls?: boolean
   className?: string
@@ -42,11 +66,78 @@ interface CompanyMapProps {
   onMapReady?: (map: any) => void
 }
 
-export default function CompanyMap({ companies, height = '400px', showControls = true, className = '', onLocationClick, onMapReady }: CompanyMapProps) {
+export default function CompanyMap({ companies, logoAtlas = null, height = '400px', showControls = true, className = '', onLocationClick, onMapReady }: CompanyMapProps) {
   const [isClient, setIsClient] = useState(false)
   const [mapComponents, setMapComponents] = useState<any>(null)
   const mapRef = useRef<any>(null)
   const containerId = useRef(`map-container-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`).current
+  const [clusterIndex, setClusterIndex] = useState<MapClusterIndex | null>(null)
+  const [precomputedClusters, setPrecomputedClusters] = useState<MapCluster[] | null>(null)
+  const [zoomLevel, setZoomLevel] = useState(10)
+  const clustered = companies.length >= CLUSTER_MIN_COMPANIES
+
+  // Projects grouped by customer - a single-company cluster expands to its projects
+  const companiesByCustomer = useMemo(() => {
+    const byCustomer = new Map<string, Company[]>()
+    for (const company of companies) {
+      const key = company.customerName || company.name
+      const group = byCustomer.get(key)
+      if (group) {
+        group.push(company)
+      } else {
+        byCustomer.set(key, [company])
+      }
+    }
+    return byCustomer
+  }, [companies])
+
+  // Precomputed clusters cover all ERP customers (those without GPS at the same default position
+  // as map-data) - usable only while the map shows exactly those customers, a filtered
+  // (industry, search) list is clustered here instead
+  const precomputedUsable = useMemo(() => {
+    if (!clusterIndex || clusterIndex.companies.length !== companiesByCustomer.size) {
+      return false
+    }
+    return clusterIndex.companies.every(([name]) => companiesByCustomer.has(name))
+  }, [clusterIndex, companiesByCustomer])
+
+  const visibleCustomers = useMemo<MapClusterCompany[]>(
+    () => [...companiesByCustomer].map(([name, [first]]): MapClusterCompany =>
+      [name, first.latitude, first.longitude, first.logoBase64 ?? null]),
+    [companiesByCustomer]
+  )
+
+  const clusters = useMemo(() => {
+    if (!clustered) {
+      return null
+    }
+    if (precomputedUsable) {
+      return precomputedClusters ? { clusters: precomputedClusters, members: clusterIndex!.companies } : null
+    }
+    const zoom = clusterIndex ? clusterZoom(clusterIndex, zoomLevel) : zoomLevel
+    return { clusters: clusterCompanies(visibleCustomers, zoom), members: visibleCustomers }
+  }, [clustered, precomputedUsable, precomputedClusters, clusterIndex, visibleCustomers, zoomLevel])
+
+  useEffect(() => {
+    loadMapClusterIndex().then(setClusterIndex)
+  }, [])
+
+  useEffect(() => {
+    if (!clustered || !precomputedUsable || !clusterIndex) {
+      return
+    }
+    let cancelled = false
+    loadMapClusters(clusterIndex, zoomLevel)
+      .then(loaded => {
+        if (!cancelled) {
+          setPrecomputedClusters(loaded)
+        }
+      })
+      .catch(error => logger.error('Error loading map clusters:', error))
+    return () => {
+      cancelled = true
+    }
+  }, [clustered, precomputedUsable, clusterIndex, zoomLevel])
 
   useEffect(() => {
     setIsClient(true)
@@ -120,10 +211,24 @@ export default function CompanyMap({ companies, height = '400px', showControls =
   const center = bounds ? bounds.getCenter() : [50.0755, 14.4378]
   const zoom = bounds ? 10 : 10
 
+  // Sprite from the atlas scaled to fit the marker - every marker shares one image request
+  const spriteHtml = (atlas: LogoAtlas, [x, y, w, h]: [number, number, number, number], size: number) => {
+    const scale = size / Math.max(w, h)
+    return `<div style="
+      width: ${w * scale}px;
+      height: ${h * scale}px;
+      background-image: url('${atlas.image}');
+      background-position: -${x * scale}px -${y * scale}px;
+      background-size: ${atlas.width * scale}px ${atlas.height * scale}px;
+      background-repeat: no-repeat;
+    "></div>`
+  }
+
   // Custom icons using customer logos
   const createCustomIcon = (company: Company, DivIcon: any) => {
     // Use logoBase64 from API if available, otherwise generate fallback
     const logoUrl = company.logoBase64 || `/logos/default.png`
+    const sprite = logoAtlas && company.logoSprite ? spriteHtml(logoAtlas, company.logoSprite, 36) : null
     
     // Create custom DivIcon with base64 logo
     return new DivIcon({
@@ -140,9 +245,10 @@ export default function CompanyMap({ companies, height = '400px', showControls =
           overflow: hidden;
           box-shadow: 0 2px 4px rgba(0,0,0,0.2);
         ">
-          ${company.logoBase64 ? 
+          ${sprite ?? (company.logoBase64 ? 
             `<img 
               src="${logoUrl}" 
+              ${company.logoSrcSet ? `srcset="${company.logoSrcSet}"` : ''}
               style="
                 width: 36px; 
                 height: 36px; 
@@ -154,7 +260,7 @@ export default function CompanyMap({ companies, height = '400px', showControls =
               font-size: 16px; 
               font-weight: bold; 
               color: #3b82f6;
-            ">${company.customerName?.slice(0, 2).toUpperCase() || '📍'}</div>`
+            ">${company.customerName?.slice(0, 2).toUpperCase() || '📍'}</div>`)
           }
         </div>
       `,
@@ -168,6 +274,77 @@ export default function CompanyMap({ companies, height = '400px', showControls =
     })
   }
 
+  // Cluster icon with the representative logo and the member count
+  const createClusterIcon = (cluster: MapCluster, members: MapClusterCompany[], DivIcon: any) => {
+    const [, , count, representative] = cluster
+    const [name, , , logo] = members[representative]
+    const size = count < 10 ? 40 : count < 100 ? 48 : 56
+    return new DivIcon({
+      html: `
+        <div style="
+          position: relative;
+          width: ${size}px;
+          height: ${size}px;
+          border-radius: 50%;
+          background: white;
+          border: 3px solid #3b82f6;
+          display: flex;
+          align-items: center;
+          justify-content: center;
+          overflow: hidden;
+          box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+        ">
+          ${logo ?
+            `<img src="${logo}" loading="lazy" style="width: ${size - 10}px; height: ${size - 10}px; border-radius: 50%; object-fit: cover; opacity: 0.5;" />` :
+            `<div style="font-size: 12px; font-weight: bold; color: #3b82f6; opacity: 0.5;">${name.slice(0, 2).toUpperCase()}</div>`
+          }
+          <div style="
+            position: absolute;
+            inset: 0;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 14px;
+            font-weight: bold;
+            color: #1e3a8a;
+          ">${count}</div>
+        </div>
+      `,
+      className: 'custom-marker-logo',
+      iconSize: [size, size],
+      iconAnchor: [size / 2, size / 2]
+    })
+  }
+
+  const renderCompanyMarker = (company: Company) => (
+    <Marker
+      key={company.id}
+      position={[company.latitude, company.longitude]}
+      icon={createCustomIcon(company, DivIcon)}
+    >
+      <Popup>
+        <CompanyPopup company={company} />
+      </Popup>
+    </Marker>
+  )
+
+  const renderCluster = (cluster: MapCluster, members: MapClusterCompany[]) => {
+    const [lat, lng, count, representative, south, west, north, east] = cluster
+    if (count === 1) {
+      return companiesByCustomer.get(members[representative][0])?.map(renderCompanyMarker) ?? null
+    }
+    return (
+      <Marker
+        key={`cluster-${lat}-${lng}-${count}`}
+        position={[lat, lng]}
+        icon={createClusterIcon(cluster, members, DivIcon)}
+        eventHandlers={{
+          click: () => mapRef.current?.fitBounds([[south, west], [north, east]], { padding: [50, 50] })
+        }}
+      />
+    )
+  }
+
   return (
     <div className={className} style={{ height }}>
       <MapContainer
@@ -176,6 +353,12 @@ export default function CompanyMap({ companies, height = '400px', showControls =
         zoom={zoom}
         style={{ height: '100%', width: '100%' }}
         ref={(map) => {
+          if (map && mapRef.current !== map) {
+            // Clusters follow the zoom level
+            mapRef.current = map
+            setZoomLevel((map as any).getZoom())
+            ;(map as any).on('zoomend', () => setZoomLevel((map as any).getZoom()))
+          }
           if (map && onMapReady) {
             // console.log('MapContainer ref set:', map)
             try {
@@ -204,87 +387,85 @@ export default function CompanyMap({ companies, height = '400px', showControls =
           url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
         />
         
-        {companies.map((company) => (
-          <Marker
-            key={company.id}
-            position={[company.latitude, company.longitude]}
-            icon={createCustomIcon(company, DivIcon)}
-          >
-            <Popup>
-              <div className="p-2">
-                <h3 className="font-semibold text-lg mb-2">{company.name}</h3>
-                <p className="text-sm text-gray-600 mb-1">
-                  📍 {company.address}, {company.city}, {company.country}
-                </p>
-                
-                {company.employees && (
-                  <p className="text-sm mb-1">
-                    👥 {company.employees} zaměstnanců
-                  </p>
-                )}
-                
-                {company.industry && (
-                  <p className="text-sm mb-1">
-                    🏭 {company.industry}
-                  </p>
-                )}
-                
-                {company.foundedYear && (
-                  <p className="text-sm mb-1">
-                    📅 Založeno {company.foundedYear}
-                  </p>
-                )}
-                
-                {company.isProject && (
-                  <div className="mt-2">
-                    <span className="inline-block bg-blue-100 text-green-800 text-xs px-2 py-1 rounded">
-                      🗂️ Projekt
-                    </span>
-                  </div>
-                )}
-                
-                {company.customerName && company.isProject && (
-                  <p className="text-sm mt-1">
-                    🏢 Zákazník: {company.customerName}
-                  </p>
-                )}
-                
-                {company.jiraKey && (
-                  <p className="text-sm mt-1">
-                    🔑 JIRA: {company.jiraKey}
-                  </p>
-                )}
-                
-                {company.phone && (
-                  <p className="text-sm mt-1">
-                    📞 {company.phone}
-                  </p>
-                )}
-                
-                {company.email && (
-                  <p className="text-sm mt-1">
-                    📧 {company.email}
-                  </p>
-                )}
-                
-                {company.website && (
-                  <p className="text-sm mt-1">
-                    🌐 <a href={company.website} target="_blank" rel="noopener noreferrer" className="text-green-400 hover:underline">
-                      {company.website}
-                    </a>
-                  </p>
-                )}
-                
-                {company.description && (
-                  <p className="text-sm mt-2 text-gray-700">
-                    {company.description}
-                  </p>
-                )}
-              </div>
-            </Popup>
-          </Marker>
-        ))}
+        {clusters
+          ? clusters.clusters.map(cluster => renderCluster(cluster, clusters.members))
+          : companies.map(renderCompanyMarker)}
       </MapContainer>
     </div>
   )
 }
+
+function CompanyPopup({ company }: { company: Company }) {
+  return (
+    <div className="p-2">
+      <h3 className="font-semibold text-lg mb-2">{company.name}</h3>
+      <p className="text-sm text-gray-600 mb-1">
+        📍 {company.address}, {company.city}, {company.country}
+      </p>
+
+      {company.employees && (
+        <p className="text-sm mb-1">
+          👥 {company.employees} zaměstnanců
+        </p>
+      )}
+
+      {company.industry && (
+        <p className="text-sm mb-1">
+          🏭 {company.industry}
+        </p>
+      )}
+
+      {company.foundedYear && (
+        <p className="text-sm mb-1">
+          📅 Založeno {company.foundedYear}
+        </p>
+      )}
+
+      {company.isProject && (
+        <div className="mt-2">
+          <span className="inline-block bg-blue-100 text-green-800 text-xs px-2 py-1 rounded">
+            🗂️ Projekt
+          </span>
+        </div>
+      )}
+
+      {company.customerName && company.isProject && (
+        <p className="text-sm mt-1">
+          🏢 Zákazník: {company.customerName}
+        </p>
+      )}
+
+      {company.jiraKey && (
+        <p className="text-sm mt-1">
+          🔑 JIRA: {company.jiraKey}
+        </p>
+      )}
+
+      {company.phone && (
+        <p className="text-sm mt-1">
+          📞 {company.phone}
+        </p>
+      )}
+
+      {company.email && (
+        <p className="text-sm mt-1">
+          📧 {company.email}
+        </p>
+      )}
+
+      {company.website && (
+        <p className="text-sm mt-1">
+          🌐 <a href={company.website} target="_blank" rel="noopener noreferrer" className="text-green-400 hover:underline">
+            {company.website}
+          </a>
+        </p>
+      )}
+
+      {company.description && (
+        <p className="text-sm mt-2 text-gray-700">
+          {company.description}
+        </p>
+      )}
+    </div>
+  )
+}
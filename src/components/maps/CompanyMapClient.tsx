@@ -24,6 +24,16 @@ interface Company {
   projectId?: string
   jiraKey?: string
   customerName?: string
+  logoBase64?: string
+  logoSrcSet?: string
+  logoSprite?: [number, number, number, number]
+}
+
+interface LogoAtlas {
+  image: string
+  width: number
+  height: number
+  tileSize: number
 }
 
 interface MapData {
@@ -41,6 +51,21 @@ interface MapData {
     }
     projectCount?: number
     databaseCount?: number
+    logoBundle?: string | null
+    logoAtlas?: LogoAtlas | null
+  }
+}
+
+// Company -> data URI bundle referenced by map-data (immutable URL, cached by the browser)
+async function fetchLogoBundle(url: string | null | undefined): Promise<Record<string, string>> {
+  if (!url) {
+    return {}
+  }
+  try {
+    const response = await fetch(url)
+    return response.ok ? ((await response.json()).companies ?? {}) : {}
+  } catch {
+    return {}
   }
 }
 
@@ -113,7 +138,14 @@ export default function CompanyMapClient() {
         if (!response.ok) {
           throw new Error('Failed to fetch map data')
         }
-        const mapData = await response.json()
+        const mapData: MapData = await response.json()
+        // Logos from the precomputed bundle are not inlined in map-data
+        const bundledLogos = await fetchLogoBundle(mapData.metadata.logoBundle)
+        mapData.companies = mapData.companies.map(company =>
+          company.logoBase64 || !company.customerName
+            ? company
+            : { ...company, logoBase64: bundledLogos[company.customerName] }
+        )
         setData(mapData)
       } catch (err) {
         setError(err instanceof Error ? err.message : 'An error occurred')
@@ -239,6 +271,7 @@ export default function CompanyMapClient() {
 
         <CompanyMap
           companies={filteredCompanies}
+          logoAtlas={data.metadata.logoAtlas}
           height="600px"
           showControls={true}
           className="mb-6"
@@ -0,0 +1,36 @@
+import { promises as fs } from 'fs'
+
+// JSON files written by the Python logo tooling. Parsed once and re-read when the file
+// changes (atomic rewrites get a new inode and mtime). Failures are not cached, so a file
+// that is missing on the first request is picked up as soon as it appears.
+export function cachedJsonFile<T>(
+  filePath: string,
+  parse: (content: string) => T | null | Promise<T | null>
+): () => Promise<T | null> {
+  let cached: { key: string; promise: Promise<T | null> } | null = null
+
+  return async () => {
+    let key: string
+    try {
+      const stat = await fs.stat(filePath)
+      key = `${stat.ino}:${stat.mtimeMs}:${stat.size}`
+    } catch {
+      cached = null
+      return null
+    }
+
+    if (!cached || cached.key !== key) {
+      const entry = {
+        key,
+        promise: fs.readFile(filePath, 'utf-8').then(parse).catch(() => null)
+      }
+      cached = entry
+      entry.promise.then(value => {
+        if (value === null && cached === entry) {
+          cached = null
+        }
+      })
+    }
+    return cached.promise
+  }
+}
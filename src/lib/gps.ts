@@ -0,0 +1,77 @@
+import { createHash } from 'crypto'
+import path from 'path'
+import { cachedJsonFile } from '@/lib/cached-json'
+import { logger } from '@/lib/logger'
+
+// Coordinates pre-validated by erp_gps.py, keyed by a hash of the raw ERP gps string
+
+export type GpsCoordinates = [number, number]
+
+export interface GpsTable {
+  version: number
+  parser: number
+  generatedAt: string
+  // hash -> [lat, lng], or the reason the string was rejected ('empty', 'malformed', 'range', 'swapped')
+  entries: Record<string, GpsCoordinates | string>
+  // Most frequent valid coordinates across each customer's projects
+  customers: Record<string, GpsCoordinates>
+}
+
+export const GPS_TABLE_VERSION = 1
+
+// Raw string -> coordinates for the current table, so a repeated string is hashed once
+const MAX_RESOLVED_ENTRIES = 65536
+const resolved = new Map<string, GpsCoordinates | null>()
+let resolvedTable: GpsTable | null = null
+
+// Re-read whenever erp_gps.py (or build_map_clusters.py) rewrites the table, same as the logo manifest
+export const loadGpsTable = cachedJsonFile<GpsTable>(
+  path.join(process.cwd(), 'public', 'gps-coordinates.json'),
+  content => {
+    const table = JSON.parse(content) as GpsTable
+    if (table.version !== GPS_TABLE_VERSION) {
+      logger.warn(`Nepodporovaná verze tabulky GPS: ${table.version}`)
+      return null
+    }
+    return table
+  }
+)
+
+// Same key as gps_hash() in erp_gps.py
+export function gpsHash(raw: string): string {
+  return createHash('sha256').update(raw, 'utf8').digest('hex').slice(0, 16)
+}
+
+// Plain 'lat,lng' for strings the table has not seen yet (projects added since the last erp_gps.py run)
+function parseDecimalGps(raw: string): GpsCoordinates | null {
+  const parts = raw.split(',')
+  if (parts.length !== 2) {
+    return null
+  }
+  const [lat, lng] = parts.map(part => parseFloat(part.trim()))
+  if (!Number.isFinite(lat) || !Number.isFinite(lng)) {
+    return null
+  }
+  if (Math.abs(lat) > 90 || Math.abs(lng) > 180 || (lat === 0 && lng === 0)) {
+    return null
+  }
+  return [lat, lng]
+}
+
+export function resolveGps(table: GpsTable | null, raw: string): GpsCoordinates | null {
+  if (table !== resolvedTable) {
+    resolved.clear()
+    resolvedTable = table
+  }
+  const cached = resolved.get(raw)
+  if (cached !== undefined) {
+    return cached
+  }
+  const entry = table?.entries[gpsHash(raw)]
+  const coordinates = entry === undefined ? parseDecimalGps(raw) : typeof entry === 'string' ? null : entry
+  if (resolved.size >= MAX_RESOLVED_ENTRIES) {
+    resolved.clear()
+  }
+  resolved.set(raw, coordinates)
+  return coordinates
+}
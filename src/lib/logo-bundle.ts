@@ -0,0 +1,55 @@
+import { promises as fs } from 'fs'
+import path from 'path'
+import { cachedJsonFile } from '@/lib/cached-json'
+import { logger } from '@/lib/logger'
+
+// Company -> data URI bundle generated by build_logo_bundle.py
+
+export interface LogoBundleIndex {
+  version: number
+  generatedAt: string
+  hash: string
+  file: string
+  bytes: number
+  encodings: Record<string, number>
+  companies: number
+}
+
+export interface LogoBundle {
+  version: number
+  companies: Record<string, string>
+}
+
+export const LOGO_BUNDLE_VERSION = 1
+
+export const LOGOS_DIR = path.join(process.cwd(), 'public', 'logos')
+
+// Bundle files are named bundle.<first 12 hex chars of the content hash>.json
+const BUNDLE_VERSION_PATTERN = /^[0-9a-f]{12}$/
+
+// Re-read when build_logo_bundle.py writes a new index, same as the logo manifest
+export const loadLogoBundle = cachedJsonFile<{ index: LogoBundleIndex; bundle: LogoBundle }>(
+  path.join(LOGOS_DIR, 'bundle-index.json'),
+  async content => {
+    const index = JSON.parse(content) as LogoBundleIndex
+    if (index.version !== LOGO_BUNDLE_VERSION) {
+      logger.warn(`Nepodporovaná verze balíčku log: ${index.version}`)
+      return null
+    }
+    const bundle = JSON.parse(await fs.readFile(path.join(LOGOS_DIR, index.file), 'utf-8')) as LogoBundle
+    return { index, bundle }
+  }
+)
+
+export function logoBundleVersion(index: LogoBundleIndex): string {
+  return index.hash.slice(0, 12)
+}
+
+export function logoBundleUrl(index: LogoBundleIndex): string {
+  return `/api/logo-bundle?v=${logoBundleVersion(index)}`
+}
+
+// Path of the bundle with the given version, or null for a malformed version
+export function logoBundlePath(version: string): string | null {
+  return BUNDLE_VERSION_PATTERN.test(version) ? path.join(LOGOS_DIR, `bundle.${version}.json`) : null
+}
@@ -0,0 +1,30 @@
+// Logo filename generation - must match logo_names.py exactly.
+// Conformance is checked against logo-names.golden.json (npm run check:logo-names).
+
+// Python: unicodedata.category(c) == 'Mn' and c.isalnum()
+const COMBINING_MARKS = new RegExp('\\p{Mn}', 'gu')
+const NON_ALPHANUMERIC = new RegExp('[^\\p{L}\\p{N}]', 'gu')
+
+const CACHE_LIMIT = 65536
+const cache = new Map<string, string>()
+
+export function sanitizeFilename(companyName: string): string {
+  const cached = cache.get(companyName)
+  if (cached !== undefined) {
+    return cached
+  }
+
+  const filename = companyName
+    .toLowerCase()
+    .normalize('NFD')
+    .replace(COMBINING_MARKS, '')
+    .replace(NON_ALPHANUMERIC, '_')
+    .replace(/_+/g, '_')
+    .replace(/^_+|_+$/g, '') + '.png'
+
+  if (cache.size >= CACHE_LIMIT) {
+    cache.clear()
+  }
+  cache.set(companyName, filename)
+  return filename
+}
@@ -0,0 +1,104 @@
+// Marker clusters precomputed per zoom level by build_map_clusters.py
+
+// [customer name, latitude, longitude, logo URL or null]
+export type MapClusterCompany = [string, number, number, string | null]
+
+export interface MapClusterIndex {
+  version: number
+  generatedAt: string
+  hash: string
+  minZoom: number
+  maxZoom: number
+  cellSize: number
+  // Customers without valid GPS, included at the default position like in map-data
+  invalid: number
+  companies: MapClusterCompany[]
+  zooms: Record<string, string>
+}
+
+// [lat, lng, count, representative company index] + [south, west, north, east] when count > 1
+export type MapCluster = [number, number, number, number, number?, number?, number?, number?]
+
+export const MAP_CLUSTERS_VERSION = 1
+
+export const MAP_CLUSTERS_INDEX_URL = '/map-clusters/index.json'
+
+// Same grid as build_map_clusters.py (256 px tiles, 64 px cells)
+const TILE_BITS = 8
+const CELL_BITS = 6
+const MAX_LATITUDE = 85.05112878
+
+// Loaded once per page, like the logo manifest on the server
+let clusterIndexPromise: Promise<MapClusterIndex | null> | null = null
+const clusterZoomPromises = new Map<string, Promise<MapCluster[]>>()
+
+export function loadMapClusterIndex(): Promise<MapClusterIndex | null> {
+  if (!clusterIndexPromise) {
+    clusterIndexPromise = fetch(MAP_CLUSTERS_INDEX_URL)
+      .then(response => (response.ok ? response.json() : null))
+      .then((index: MapClusterIndex | null) => (index && index.version === MAP_CLUSTERS_VERSION ? index : null))
+      .catch(() => null)
+  }
+  return clusterIndexPromise
+}
+
+export function clusterZoom(index: MapClusterIndex, zoom: number): number {
+  return Math.min(index.maxZoom, Math.max(index.minZoom, Math.round(zoom)))
+}
+
+export function loadMapClusters(index: MapClusterIndex, zoom: number): Promise<MapCluster[]> {
+  const url = index.zooms[String(clusterZoom(index, zoom))]
+  let promise = clusterZoomPromises.get(url)
+  if (!promise) {
+    promise = fetch(url)
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`Failed to load map clusters: ${response.status}`)
+        }
+        return response.json()
+      })
+      .then(document => document.clusters as MapCluster[])
+    // A failed zoom level may be retried on the next zoom change
+    promise.catch(() => clusterZoomPromises.delete(url))
+    clusterZoomPromises.set(url, promise)
+  }
+  return promise
+}
+
+function cellKey(lat: number, lng: number, zoom: number): string {
+  const sinLat = Math.sin((Math.max(-MAX_LATITUDE, Math.min(MAX_LATITUDE, lat)) * Math.PI) / 180)
+  const x = (lng + 180) / 360
+  const y = 0.5 - Math.log((1 + sinLat) / (1 - sinLat)) / (4 * Math.PI)
+  const n = 2 ** (zoom + TILE_BITS - CELL_BITS)
+  return `${Math.min(Math.floor(x * n), n - 1)}/${Math.min(Math.floor(y * n), n - 1)}`
+}
+
+// Clusters for any (e.g. filtered) set of companies at one zoom level, same grid and
+// representative choice as the precomputed files - O(n), cheap enough per zoom change
+export function clusterCompanies(companies: MapClusterCompany[], zoom: number): MapCluster[] {
+  const cells = new Map<string, number[]>()
+  companies.forEach(([, lat, lng, logo], index) => {
+    const key = cellKey(lat, lng, Math.round(zoom))
+    const cell = cells.get(key)
+    if (!cell) {
+      cells.set(key, [1, lat, lng, lat, lng, lat, lng, index])
+      return
+    }
+    cell[0] += 1
+    cell[1] += lat
+    cell[2] += lng
+    cell[3] = Math.min(cell[3], lat)
+    cell[4] = Math.min(cell[4], lng)
+    cell[5] = Math.max(cell[5], lat)
+    cell[6] = Math.max(cell[6], lng)
+    // A company with a logo represents the cluster, otherwise the first one
+    if (logo && !companies[cell[7]][3]) {
+      cell[7] = index
+    }
+  })
+  return [...cells.values()].map(([count, sumLat, sumLng, south, west, north, east, representative]): MapCluster =>
+    count === 1
+      ? [sumLat, sumLng, 1, representative]
+      : [sumLat / count, sumLng / count, count, representative, south, west, north, east]
+  )
+}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Testy souběžného stahování kandidátů (download_real_logos) bez sítě
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from download_real_logos import CLEARBIT_URL, DUCKDUCKGO_URL, FAVICON_URL, FetchContext, \
+    download_logo_from_various_sources, fetch_candidate
+from logo_cache import LogoMetaStore
+from logo_store import LogoStore
+
+DOMAIN = 'example.cz'
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 2000
+
+class FakeResponse:
+    def __init__(self, status_code=200, chunks=(PNG,), headers=None):
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'image/png', **(headers or {})}
+        self.chunks = chunks
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        yield from self.chunks
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    """Odpovědi podle URL - hodnota je odpověď nebo funkce, která ji vrátí"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, stream=False, headers=None):
+        self.requested.append(url)
+        response = self.responses.get(url, FakeResponse(404))
+        return response() if callable(response) else response
+
+class FakeResolver:
+    def __init__(self):
+        self.confirmed = []
+
+    def domains_for(self, company_name):
+        return [DOMAIN]
+
+    def confirm(self, company_name, domain):
+        self.confirmed.append(domain)
+
+def make_context(directory, client):
+    return FetchContext(client, LogoMetaStore(os.path.join(directory, 'meta.json')),
+                        LogoStore(directory), FakeResolver(), max_concurrency=4)
+
+def download(ctx, directory):
+    async def main():
+        return await download_logo_from_various_sources(ctx, 'Example s.r.o.', os.path.join(directory, 'example.png'))
+    return asyncio.run(main())
+
+def test_first_valid_candidate_in_priority_order_wins():
+    favicon = b'\x89PNG\r\n\x1a\n' + b'\1' * 2000
+    with tempfile.TemporaryDirectory() as directory:
+        client = FakeClient({
+            CLEARBIT_URL.format(domain=DOMAIN): FakeResponse(200, (b'<html>',), {'Content-Type': 'text/html'}),
+            FAVICON_URL.format(domain=DOMAIN): FakeResponse(200, (favicon,)),
+            DUCKDUCKGO_URL.format(domain=DOMAIN): FakeResponse(200, (PNG,)),
+        })
+        ctx = make_context(directory, client)
+        assert download(ctx, directory)
+        with open(os.path.join(directory, 'example.png'), 'rb') as f:
+            assert f.read() == favicon
+        assert ctx.store.get('example.png')['url'] == FAVICON_URL.format(domain=DOMAIN)
+        assert ctx.resolver.confirmed == [DOMAIN]
+
+def test_no_valid_candidate():
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = make_context(directory, FakeClient({}))
+        assert not download(ctx, directory)
+        assert not os.path.exists(os.path.join(directory, 'example.png'))
+
+def test_winner_cancels_body_still_streaming():
+    streaming = threading.Event()
+    slow = FakeResponse()
+    yielded = []
+
+    def slow_chunks():
+        yield PNG[:16]
+        streaming.set()
+        for _ in range(500):
+            yielded.append(1)
+            time.sleep(0.01)
+            yield b'\0' * 16
+
+    def clearbit():
+        # Vítěz odpoví, až když nižší priorita stahuje tělo
+        streaming.wait(5)
+        return FakeResponse()
+
+    slow.chunks = slow_chunks()
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = make_context(directory, FakeClient({
+            CLEARBIT_URL.format(domain=DOMAIN): clearbit,
+            DUCKDUCKGO_URL.format(domain=DOMAIN): slow,
+        }))
+        started = time.perf_counter()
+        assert download(ctx, directory)
+        assert time.perf_counter() - started < 3
+        assert slow.closed
+        assert len(yielded) < 500
+
+def test_cancelled_candidate_is_not_requested():
+    cancelled = threading.Event()
+    cancelled.set()
+    with tempfile.TemporaryDirectory() as directory:
+        client = FakeClient({})
+        ctx = make_context(directory, client)
+        assert fetch_candidate(ctx, 'example.png', 'Clearbit', CLEARBIT_URL.format(domain=DOMAIN), 1000, cancelled) is None
+        assert client.requested == []
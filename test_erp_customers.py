@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# Testy streamovaného parsování ERP feedu (erp_customers)
+
+import json
+
+from erp_customers import iter_json_array
+
+DOCUMENT = '[1, 1500.0, -2.5e3, 1E2, "a,]", true, null, {"nazev_par": "Žďas, a.s.", "gps": [49.1, 16.6]}, [0.5]]'
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_numbers_split_at_chunk_boundary():
+    data = DOCUMENT.encode('utf-8')
+    for size in range(1, len(data) + 1):
+        assert list(iter_json_array(chunked(data, size))) == json.loads(DOCUMENT), size
+
+def test_bom_and_whitespace():
+    data = '﻿ \r\n[ 1 ,\n2 ]\n'.encode('utf-8')
+    assert list(iter_json_array(chunked(data, 1))) == [1, 2]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Testy dávkového parsování GPS souřadnic z ERP (erp_gps)
+
+import numpy as np
+
+from erp_gps import STATUSES, gps_hash, load_table, parse_batch, update_table
+
+# řetězec -> (stav, šířka, délka)
+CASES = {
+    '50.0755,14.4378': ('ok', 50.0755, 14.4378),
+    '50,0755; 14,4378': ('ok', 50.0755, 14.4378),
+    '50°4\'31.8"N 14°26\'16.1"E': ('ok', 50.0755, 14.437806),
+    'E 14 26.3, N 50 4.5': ('ok', 50.075, 14.438333),
+    '33°52\'S 151°12\'E': ('ok', -33.866667, 151.2),
+    '40.7128 N, 74.006 W': ('ok', 40.7128, -74.006),
+    '50,14': ('ok', 50.0, 14.0),
+    '14.4378, 50.0755': ('swapped', None, None),
+    '95.0, 200.0': ('range', None, None),
+    '': ('empty', None, None),
+    '0,0': ('empty', None, None),
+    'abc': ('malformed', None, None),
+    '50.1 14.4 3.2': ('malformed', None, None),
+    '50°70\'0"N 14°0\'0"E': ('malformed', None, None),
+    'N 50.1 N 14.4': ('malformed', None, None),
+}
+
+def test_parse_batch():
+    raws = list(CASES)
+    lat, lng, status = parse_batch(raws)
+    for raw, la, ln, st in zip(raws, lat, lng, status):
+        expected, expected_lat, expected_lng = CASES[raw]
+        assert STATUSES[st] == expected, raw
+        if expected_lat is not None:
+            assert np.isclose(la, expected_lat, atol=1e-6) and np.isclose(ln, expected_lng, atol=1e-6), raw
+
+def test_parse_empty_batch():
+    assert [len(column) for column in parse_batch([])] == [0, 0, 0]
+
+def test_update_table_reuses_parsed_entries():
+    projects = [
+        {'nazev_par': 'Alfa s.r.o.', 'gps': '50.0755,14.4378'},
+        {'nazev_par': 'Alfa s.r.o.', 'gps': '50.0755,14.4378'},
+        {'nazev_par': 'Alfa s.r.o.', 'gps': '49.1951,16.6068'},
+        {'nazev_par': 'Beta a.s.', 'gps': 'abc'},
+    ]
+    table, stats = update_table(load_table('/nonexistent/gps-coordinates.json'), projects)
+    assert stats['parsed'] == 3 and stats['conflicts'] == 1
+    # Nejčastější platné souřadnice zákazníka, bez platné GPS se zákazník nevypíše
+    assert table['customers'] == {'Alfa s.r.o.': [50.0755, 14.4378]}
+    assert table['entries'][gps_hash('abc')] == 'malformed'
+
+    table, stats = update_table(table, projects[:2] + [{'nazev_par': 'Beta a.s.', 'gps': '49.8,18.2'}])
+    assert stats['parsed'] == 1 and stats['reused'] == 1
+    assert set(table['entries']) == {gps_hash('50.0755,14.4378'), gps_hash('49.8,18.2')}
+    assert table['customers']['Beta a.s.'] == [49.8, 18.2]
@@ -1,46 +1,23 @@
 #!/usr/bin/env python3
-# Testovací skript pro generování názvů souborů
+# Testy generování názvů souborů log (logo_names)
 
-def sanitize_filename_js_style(company_name):
-    """JavaScript styl generování názvů souborů"""
-    import unicodedata
-    
-    filename = company_name.lower()
-    filename = unicodedata.normalize('NFD', filename)  # Normalize diacritics
-    filename = ''.join(c for c in filename if unicodedata.category(c) != 'Mn')  # Remove diacritic marks
-    filename = ''.join(c if c.isalnum() else '_' for c in filename)  # Replace non-alnum with _
-    filename = '_'.join(filter(None, filename.split('_')))  # Remove multiple underscores
-    filename = filename.strip('_')  # Remove leading/trailing underscores
-    filename += '.png'
-    
-    return filename
+from logo_names import load_golden, sanitize_filename_js_style
 
-# Testovací data
-test_companies = [
-    "EGE, spol. s r.o.",
-    "ČKD Blansko Holding, a.s.",
-    "Dopravní podnik města České Budějovice, a.s.",
-    "ABS Jets, a.s."
-]
+# Testovací data - firma -> název souboru
+test_companies = {
+    "EGE, spol. s r.o.": "ege_spol_s_r_o.png",
+    "ČKD Blansko Holding, a.s.": "ckd_blansko_holding_a_s.png",
+    "Dopravní podnik města České Budějovice, a.s.": "dopravni_podnik_mesta_ceske_budejovice_a_s.png",
+    "ABS Jets, a.s.": "abs_jets_a_s.png",
+}
 
-print("🧪 Testování generování názvů souborů:")
-print("-" * 50)
+def test_company_filenames():
+    for company, filename in test_companies.items():
+        assert sanitize_filename_js_style(company) == filename, company
 
-for company in test_companies:
-    filename = sanitize_filename_js_style(company)
-    print(f"Company: {company}")
-    print(f"Filename: {filename}")
-    print()
-
-# Zkontrolovat zda soubory existují
-import os
-logos_dir = '/home/oak/firma-portal/public/logos'
-
-print("📁 Kontrola existujících souborů:")
-print("-" * 50)
-
-for company in test_companies:
-    filename = sanitize_filename_js_style(company)
-    filepath = os.path.join(logos_dir, filename)
-    exists = "✅" if os.path.exists(filepath) else "❌"
-    print(f"{exists} {filename}")
+def test_golden_vectors():
+    # Golden vektory sdílené s route.ts (logo-names.golden.json)
+    golden = load_golden()
+    assert golden
+    for vector in golden:
+        assert sanitize_filename_js_style(vector['input']) == vector['filename'], vector['input']
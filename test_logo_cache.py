@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Testy podmíněné revalidace uložených log (logo_cache) bez sítě
+
+import os
+import tempfile
+
+from logo_cache import LogoMetaStore, conditional_headers, refresh_logo
+from logo_store import LogoStore
+
+URL = 'https://logo.clearbit.com/example.cz'
+OLD = b'\x89PNG\r\n\x1a\n' + b'\0' * 1000
+NEW = b'\x89PNG\r\n\x1a\n' + b'\1' * 1000
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'image/png', **(headers or {})}
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append((url, headers))
+        return self.response
+
+def stored_logo(directory, validators):
+    """Metadata a blob loga, jako by ho dříve stáhl download_real_logos"""
+    store = LogoMetaStore(os.path.join(directory, 'meta.json'))
+    blobs = LogoStore(directory)
+    blobs.put_and_publish('example.png', OLD)
+    store.record('example.png', 'Example s.r.o.', URL, FakeResponse(200, headers=validators))
+    return store, blobs
+
+def read(directory):
+    with open(os.path.join(directory, 'example.png'), 'rb') as f:
+        return f.read()
+
+def test_conditional_headers_from_validators():
+    assert conditional_headers({'etag': '"v1"', 'last_modified': 'Tue, 01 Sep 2026 10:00:00 GMT'}) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Tue, 01 Sep 2026 10:00:00 GMT',
+    }
+    assert conditional_headers({'etag': None, 'last_modified': None}) == {}
+
+def test_not_modified_keeps_logo():
+    with tempfile.TemporaryDirectory() as directory:
+        store, blobs = stored_logo(directory, {'ETag': '"v1"'})
+        client = FakeClient(FakeResponse(304))
+        assert refresh_logo(client, store, blobs, 'example.png') == 'not-modified'
+        assert client.requests == [(URL, {'If-None-Match': '"v1"'})]
+        assert client.response.closed
+        assert read(directory) == OLD
+
+def test_changed_logo_is_replaced_with_new_validators():
+    with tempfile.TemporaryDirectory() as directory:
+        store, blobs = stored_logo(directory, {'Last-Modified': 'Tue, 01 Sep 2026 10:00:00 GMT'})
+        client = FakeClient(FakeResponse(200, NEW, {'ETag': '"v2"'}))
+        assert refresh_logo(client, store, blobs, 'example.png') == 'updated'
+        assert client.requests[0][1] == {'If-Modified-Since': 'Tue, 01 Sep 2026 10:00:00 GMT'}
+        assert read(directory) == NEW
+        assert store.get('example.png')['etag'] == '"v2"'
+        assert store.get('example.png')['last_modified'] is None
+
+def test_rejected_response_keeps_logo():
+    with tempfile.TemporaryDirectory() as directory:
+        store, blobs = stored_logo(directory, {'ETag': '"v1"'})
+        client = FakeClient(FakeResponse(200, b'<html>', {'Content-Type': 'text/html'}))
+        assert refresh_logo(client, store, blobs, 'example.png') == 'failed'
+        assert read(directory) == OLD
+        assert URL in store.rejects['example.png']
+
+def test_logo_without_metadata_is_unknown():
+    with tempfile.TemporaryDirectory() as directory:
+        client = FakeClient(FakeResponse(304))
+        store = LogoMetaStore(os.path.join(directory, 'meta.json'))
+        assert refresh_logo(client, store, LogoStore(directory), 'example.png') == 'unknown'
+        assert client.requests == []
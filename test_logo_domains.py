@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Testy odhadu domén (logo_domains) - DNS přes stub, bez sítě
+
+import os
+import tempfile
+
+from logo_domains import DomainResolver, domain_candidates, strip_legal_form
+
+LEGAL_FORMS = {
+    "Atlas": "atlas",
+    "Zinc": "zinc",
+    "Elvos": "elvos",
+    "Hollas s.r.o.": "hollas",
+    "Kospa a.s.": "kospa",
+    "EGE, spol. s r.o.": "ege",
+    "ATALIAN SK s. r. o.": "atalian sk",
+    "ABS Jets, a.s.": "abs jets",
+    "Falcon Security GmbH": "falcon security",
+}
+
+class StubResolver:
+    """Místo DNS množina živých hostů, zaznamenává dotazy"""
+
+    def __init__(self, alive):
+        self.alive = set(alive)
+        self.queries = []
+
+    def __call__(self, hostname):
+        self.queries.append(hostname)
+        return hostname in self.alive
+
+def test_strip_legal_form():
+    for name, expected in LEGAL_FORMS.items():
+        assert strip_legal_form(name) == expected, name
+
+def test_candidates_keep_whole_name():
+    assert domain_candidates("Atlas")[:2] == ['atlas.cz', 'atlas.sk']
+    assert domain_candidates("Hollas s.r.o.")[0] == 'hollas.cz'
+    assert domain_candidates("Kospa a.s.")[0] == 'kospa.cz'
+    assert domain_candidates("ATALIAN SK s. r. o.")[0] == 'ataliansk.sk'
+
+def test_resolver_prunes_dead_domains():
+    stub = StubResolver({'zinc.sk', 'zinc.com'})
+    resolver = DomainResolver(resolver=stub)
+    try:
+        assert resolver.domains_for("Zinc") == ['zinc.sk', 'zinc.com']
+        assert set(stub.queries) == set(domain_candidates("Zinc"))
+    finally:
+        resolver.close()
+
+def test_confirmed_domain_is_ranked_first_not_pinned():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos-domains.json')
+        stub = StubResolver({'elvos.cz', 'elvos.com'})
+        resolver = DomainResolver(path, resolver=stub)
+        assert resolver.domains_for("Elvos") == ['elvos.cz', 'elvos.com']
+        resolver.confirm("Elvos", 'elvos.com')
+        resolver.save()
+        resolver.close()
+
+        # Další běh: z cache bez DNS, potvrzená doména první, ostatní zůstávají
+        stub = StubResolver({'elvos.cz', 'elvos.com'})
+        resolver = DomainResolver(path, resolver=stub)
+        assert resolver.domains_for("Elvos") == ['elvos.com', 'elvos.cz']
+        assert stub.queries == []
+
+        # Po TTL se znovu ověří i potvrzená doména - zaniklá se zapomene
+        resolver.entries["Elvos"]['resolved_at'] = 0
+        stub.alive = {'elvos.cz'}
+        assert resolver.domains_for("Elvos") == ['elvos.cz']
+        assert 'confirmed' not in resolver.entries["Elvos"]
+        resolver.close()
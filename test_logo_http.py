@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Testy rate limiteru pro jednotlivé hosty (logo_http) - hodiny i síť jsou nahrazené
+
+import logo_http
+from logo_http import DEFAULT_HOST_RATE, DEFAULT_RATE_LIMITS, LogoHttpClient, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def install_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(logo_http.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(logo_http.time, 'sleep', clock.sleep)
+    return clock
+
+def test_bucket_allows_burst_then_paces(monkeypatch):
+    clock = install_clock(monkeypatch)
+    bucket = TokenBucket(rate=4, capacity=2)
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    # Další rezervace čekají vždy o 1/rate déle
+    assert bucket.reserve() == 0.25
+    assert bucket.reserve() == 0.5
+    clock.now += 1.0
+    assert bucket.reserve() == 0.0
+
+def test_bucket_refill_is_capped(monkeypatch):
+    clock = install_clock(monkeypatch)
+    bucket = TokenBucket(rate=10, capacity=3)
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0
+
+def test_hosts_have_separate_budgets(monkeypatch):
+    clock = install_clock(monkeypatch)
+    client = LogoHttpClient(rate_limits={'slow.example': (1.0, 1)})
+    requested = []
+    monkeypatch.setattr(client.session, 'get', lambda url, **kwargs: requested.append(url))
+    try:
+        client.get('https://slow.example/a.png')
+        client.get('https://slow.example/b.png')
+        assert clock.slept == [1.0]
+        # Vyčerpaný host nebrzdí ostatní
+        for _ in range(DEFAULT_RATE_LIMITS['logo.clearbit.com'][1]):
+            client.get('https://logo.clearbit.com/example.cz')
+        assert clock.slept == [1.0]
+        assert len(requested) == 2 + DEFAULT_RATE_LIMITS['logo.clearbit.com'][1]
+    finally:
+        client.close()
+
+def test_bucket_limits_by_host():
+    with LogoHttpClient() as client:
+        assert client.bucket('logo.clearbit.com').rate == DEFAULT_RATE_LIMITS['logo.clearbit.com'][0]
+        assert client.bucket('unknown.example').capacity == DEFAULT_HOST_RATE[1]
+        assert client.bucket('unknown.example') is client.bucket('unknown.example')
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# Testy journalu stahování (logo_journal)
+
+import os
+import tempfile
+import time
+
+from logo_journal import BACKOFF_BASE, STALE_AFTER, LogoJournal
+
+def test_compacts_on_load_and_close():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos-journal.jsonl')
+        with LogoJournal(path) as journal:
+            for _ in range(5):
+                journal.attempt('a.png', 'Clearbit', 'https://a', 'error')
+                journal.attempt('a.png', 'Favicon', 'https://b', 'hit')
+                journal.result('a.png', 'A', 'downloaded')
+        with open(path, encoding='utf-8') as f:
+            # Firma a jeden zdroj s neúspěchy, zdroj bez neúspěchů vypadne
+            assert len(f.readlines()) == 2
+
+        with LogoJournal(path) as journal:
+            assert journal.sources[('a.png', 'https://a')]['failures'] == 5
+            assert ('a.png', 'https://b') not in journal.sources
+            assert journal.companies['a.png']['success'] > 0
+
+def test_unknown_revalidation_backs_off():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos-journal.jsonl')
+        with LogoJournal(path) as journal:
+            journal.result('a.png', 'A', 'downloaded')
+            stale = time.time() + STALE_AFTER + 1
+            assert journal.status('a.png', True, now=stale) == 'stale'
+            journal.result('a.png', 'A', 'unknown')
+
+        with LogoJournal(path) as journal:
+            last = journal.companies['a.png']['last_stale']
+            assert journal.status('a.png', True, now=last + STALE_AFTER + 1) == 'stale'
+            # Revalidace, která nic neověřila, se neopakuje v každém běhu
+            journal.companies['a.png']['success'] = last - STALE_AFTER - 1
+            assert journal.status('a.png', True, now=last + 1) == 'backoff'
+            assert journal.status('a.png', True, now=last + BACKOFF_BASE + 1) == 'stale'
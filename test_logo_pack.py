@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Testy binárního balíku log nad mmap (logo_pack)
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from logo_names import sanitize_filename_js_style
+from logo_pack import ALIGN, KIND_PNG, KIND_RGBA, LogoPack, write_pack
+
+COMPANIES = ['Alfa s.r.o.', 'Žďas, a.s.', 'Beta Group']
+
+def logos():
+    """Různé obrázky podle firmy, aby záměna záznamů neprošla"""
+    for i, company in enumerate(COMPANIES):
+        pixels = np.full((8, 8, 4), (i * 40, 255 - i * 40, i, 255), dtype=np.uint8)
+        pixels[0, i] = (1, 2, 3, 4)
+        yield sanitize_filename_js_style(company), Image.fromarray(pixels)
+
+def test_rgba_roundtrip():
+    expected = dict(logos())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos.pack')
+        assert write_pack(path, logos(), size=8, kind=KIND_RGBA) == len(COMPANIES)
+        with LogoPack(path) as pack:
+            assert len(pack) == len(COMPANIES)
+            assert sorted(pack.filenames()) == sorted(expected)
+            for company in COMPANIES:
+                filename = sanitize_filename_js_style(company)
+                assert company in pack
+                array = pack.array(company)
+                assert np.array_equal(array, np.asarray(expected[filename]))
+                assert not array.flags.writeable
+                assert int(pack.table[pack.find(filename)]['offset']) % ALIGN == 0
+                del array
+            assert pack.get('Neznámá firma') is None
+            assert 'Neznámá firma' not in pack
+
+def test_png_roundtrip():
+    expected = dict(logos())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos.pack')
+        write_pack(path, logos(), size=8, kind=KIND_PNG)
+        with LogoPack(path) as pack:
+            for index, filename in enumerate(pack.filenames()):
+                assert bytes(pack.blob_at(index)).startswith(b'\x89PNG')
+                assert pack.image_at(index).tobytes() == expected[filename].tobytes()
+            with pytest.raises(ValueError):
+                pack.array(COMPANIES[0])
+
+def test_rejects_other_files():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'logos.pack')
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n' + bytes(64))
+        with pytest.raises(ValueError):
+            LogoPack(path)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# Testy auditu duplicit (logo_phash)
+
+import os
+import tempfile
+
+import numpy as np
+
+from erp_customers import iter_customer_names
+from logo_names import sanitize_filename_js_style
+from logo_phash import HashCache, duplicate_groups, find_duplicates
+from logo_render import render_many
+
+SAMPLE_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'erp-projects.sample.json')
+
+def render_sample(directory):
+    """Vykreslí loga s iniciálami pro všechny firmy ze vzorového feedu, vrací cesty"""
+    paths = []
+    for company, data, error in render_many(iter_customer_names(SAMPLE_SOURCE)):
+        assert error is None, error
+        path = os.path.join(directory, sanitize_filename_js_style(company))
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+def test_distinct_initials_never_group():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = render_sample(directory)
+        ahashes, dhashes, generated, loaded = HashCache(None).hash_paths(paths)
+        assert len(loaded) == len(paths)
+        assert generated.all()
+        assert find_duplicates(paths, ahashes, dhashes, generated) == []
+
+def test_groups_are_not_transitive():
+    # a~b a b~c, ale a a c jsou od sebe 4 bity - c nesmí skončit ve skupině a
+    a, b, c = np.uint64(0), np.uint64(0b11), np.uint64(0b1111)
+    hashes = np.array([a, b, c], dtype=np.uint64)
+    assert duplicate_groups(hashes, hashes, max_distance=2) == [[0, 1]]
+    assert duplicate_groups(hashes, hashes, order=[1, 0, 2], max_distance=2) == [[1, 0, 2]]
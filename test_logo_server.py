@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Testy HTTP služby pro změnu velikosti log (logo_server) - server běží na náhodném portu
+
+import http.client
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from PIL import Image
+
+from logo_server import ByteLRU, LogoServer
+
+@contextmanager
+def running_server(logos_dir):
+    server = LogoServer(('127.0.0.1', 0), logos_dir, ByteLRU())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def request(server, path, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+    try:
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+def write_logo(logos_dir, name, color=(200, 30, 30, 255)):
+    Image.new('RGBA', (64, 32), color).save(os.path.join(logos_dir, name))
+
+def test_variant_and_revalidation():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        write_logo(logos_dir, 'alfa_s_r_o.png')
+        with running_server(logos_dir) as server:
+            status, headers, body = request(server, '/logos/alfa_s_r_o.png?w=40&fmt=webp')
+            assert status == 200 and headers['Content-Type'] == 'image/webp'
+            assert body.startswith(b'RIFF')
+            status, _, _ = request(server, '/logos/alfa_s_r_o.png?w=40&fmt=webp', {'If-None-Match': headers['ETag']})
+            assert status == 304
+            # Bez loga se vykreslí iniciály podle názvu firmy
+            status, _, body = request(server, '/logos/Beta%20Group')
+            assert status == 200 and body.startswith(b'\x89PNG')
+
+def test_bad_requests():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        write_logo(logos_dir, 'alfa_s_r_o.png')
+        with running_server(logos_dir) as server:
+            assert request(server, '/logos/alfa_s_r_o.png?w=abc')[0] == 400
+            assert request(server, '/logos/alfa_s_r_o.png?w=4')[0] == 400
+            assert request(server, '/logos/alfa_s_r_o.png?w=4096')[0] == 400
+            assert request(server, '/logos/alfa_s_r_o.png?fmt=gif')[0] == 400
+            assert request(server, '/logos/chybi.png')[0] == 404
+            assert request(server, '/logos/..%2Fsecret.png')[0] == 404
+            assert request(server, '/logos/.store')[0] == 404
+            assert request(server, '/jinde/alfa_s_r_o.png')[0] == 404
+
+def test_unreadable_source_is_not_cached():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        path = os.path.join(logos_dir, 'alfa_s_r_o.png')
+        with open(path, 'wb') as f:
+            f.write(b'<html>Not found</html>')
+        with running_server(logos_dir) as server:
+            status, headers, _ = request(server, '/logos/alfa_s_r_o.png')
+            assert status == 422
+            assert 'ETag' not in headers and 'Cache-Control' not in headers
+            # Opravené logo se vykreslí hned, chyba nezůstala v cache
+            write_logo(logos_dir, 'alfa_s_r_o.png')
+            status, _, body = request(server, '/logos/alfa_s_r_o.png')
+            assert status == 200 and body.startswith(b'\x89PNG')
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Testy obsahově adresovaného úložiště log (logo_store)
+
+import os
+import stat
+import tempfile
+
+import logo_store
+from logo_store import BLOB_MODE, STATE_DIRNAME, LogoStore, state_path
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_put_deduplicates_read_only_blobs():
+    with tempfile.TemporaryDirectory() as directory:
+        store = LogoStore(directory)
+        digest = store.put(b'logo')
+        assert store.put(b'logo') == digest
+        assert os.listdir(os.path.join(store.root, digest[:2])) == [digest]
+        assert stat.S_IMODE(os.stat(store.blob_path(digest)).st_mode) == BLOB_MODE
+
+def test_publish_switches_symlink():
+    with tempfile.TemporaryDirectory() as directory:
+        store = LogoStore(directory)
+        first = store.put_and_publish('a.png', b'first')
+        second = store.put_and_publish('a.png', b'second')
+        path = os.path.join(directory, 'a.png')
+        assert os.path.islink(path)
+        assert read(path) == b'second'
+        assert store.published() == {'a.png': second}
+        # Dočasné odkazy po sobě nenechá, starý blob uklidí gc
+        assert not [name for name in os.listdir(directory) if name.startswith('.tmp-')]
+        assert store.gc() == 1
+        assert not os.path.exists(store.blob_path(first))
+        assert read(path) == b'second'
+
+def test_publish_falls_back_to_copy_without_symlinks(monkeypatch):
+    def no_symlinks(*args, **kwargs):
+        raise OSError('symlinks not supported')
+
+    monkeypatch.setattr(logo_store.os, 'symlink', no_symlinks)
+    with tempfile.TemporaryDirectory() as directory:
+        store = LogoStore(directory)
+        digest = store.put_and_publish('a.png', b'logo')
+        store.put(b'orphan')
+        path = os.path.join(directory, 'a.png')
+        assert os.path.isfile(path) and not os.path.islink(path)
+        assert read(path) == b'logo'
+        assert store.published() == {}
+        assert store.copied({len(b'logo')}) == {digest}
+        # Publikovaná kopie drží svůj blob, smaže se jen sirotek
+        assert store.gc() == 1
+        assert os.path.exists(store.blob_path(digest))
+
+def test_state_path_outside_public(monkeypatch):
+    monkeypatch.setattr(logo_store, 'DEFAULT_STATE_DIR', None)
+    with tempfile.TemporaryDirectory() as project:
+        logos_dir = os.path.join(project, 'public', 'logos')
+        os.makedirs(logos_dir)
+        legacy = os.path.join(project, 'public', 'logos-meta.json')
+        with open(legacy, 'w') as f:
+            f.write('{}')
+        path = state_path(logos_dir, 'logos-meta.json')
+        assert path == os.path.join(project, STATE_DIRNAME, 'logos-meta.json')
+        # Soubor ze starého umístění ve webrootu se přesune
+        assert os.path.exists(path) and not os.path.exists(legacy)
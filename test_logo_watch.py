@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Testy průběžného přegenerování log (logo_watch) - bez skutečného čekání na události
+
+import os
+import tempfile
+
+from PIL import Image
+
+from build_logo_atlas import build_atlas, fit_tile, load_atlas, write_atlas
+from logo_layout import ATLAS_DIRNAME, VARIANT_FORMATS, VARIANT_SIZES, VARIANTS_DIRNAME
+from logo_watch import IncrementalRebuilder, PollingWatcher, debounced
+
+RED = (220, 20, 20, 255)
+BLUE = (20, 20, 220, 255)
+
+class ScriptedWatcher:
+    """Vrací připravené výsledky wait(), pak už jen klid"""
+
+    def __init__(self, events):
+        self.events = list(events)
+
+    def wait(self, timeout=None):
+        return self.events.pop(0) if self.events else set()
+
+def atlas_pixel(logos_dir, name):
+    atlas, sprites, _ = load_atlas(os.path.join(logos_dir, ATLAS_DIRNAME))
+    sprite = sprites[name]
+    return atlas.getpixel((sprite['x'] + sprite['w'] // 2, sprite['y'] + sprite['h'] // 2))
+
+def test_debounced_batches_only_sources():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        watcher = ScriptedWatcher([{'a.png', '.tmp-1-a.png'}, {'b.ico', 'logos-manifest.json'}])
+        assert next(debounced(watcher, logos_dir, debounce=0)) == ['a.png', 'b.ico']
+
+def test_queue_overflow_rescans_directory():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        for name in ('a.png', 'b.jpg', 'notes.txt'):
+            open(os.path.join(logos_dir, name), 'wb').close()
+        assert next(debounced(ScriptedWatcher([None]), logos_dir, debounce=0)) == ['a.png', 'b.jpg']
+
+def test_polling_watcher_sees_new_file():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        watcher = PollingWatcher(logos_dir, interval=0.01)
+        Image.new('RGBA', (8, 8), RED).save(os.path.join(logos_dir, 'a.png'))
+        assert watcher.wait() == {'a.png'}
+        assert watcher.wait() == set()
+
+def test_ico_source_replaces_its_atlas_tile():
+    with tempfile.TemporaryDirectory() as logos_dir:
+        atlas, sprites = build_atlas({'acme.png': fit_tile(Image.new('RGBA', (32, 32), RED))})
+        os.makedirs(os.path.join(logos_dir, ATLAS_DIRNAME))
+        write_atlas(atlas, sprites, os.path.join(logos_dir, ATLAS_DIRNAME))
+        Image.new('RGBA', (32, 32), BLUE).save(os.path.join(logos_dir, 'acme.ico'))
+
+        rebuilder = IncrementalRebuilder(logos_dir)
+        assert rebuilder.rebuild(['acme.ico']) == 1
+        # Ruční nahrání se převezme do úložiště a publikuje symlinkem
+        assert os.path.islink(os.path.join(logos_dir, 'acme.ico'))
+        # Stejný klíč jako úplné sestavení atlasu - dlaždice se vymění, nepřibude druhá
+        assert sorted(load_atlas(os.path.join(logos_dir, ATLAS_DIRNAME))[1]) == ['acme.png']
+        assert atlas_pixel(logos_dir, 'acme.png') == BLUE
+        variants = [os.path.join(logos_dir, VARIANTS_DIRNAME, f"acme-{size}.{ext}")
+                    for size in VARIANT_SIZES for ext in VARIANT_FORMATS]
+        assert all(os.path.exists(path) for path in variants)
+        # Událost vlastního zápisu nic nepřegeneruje
+        assert rebuilder.rebuild(['acme.ico']) == 0
+
+        os.remove(os.path.join(logos_dir, 'acme.ico'))
+        assert rebuilder.rebuild(['acme.ico']) == 1
+        assert not any(os.path.exists(path) for path in variants)
+        assert load_atlas(os.path.join(logos_dir, ATLAS_DIRNAME))[1] == {}